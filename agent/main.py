@@ -1,19 +1,41 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import Optional
 import os
+import json
 import asyncio
 import logging
 from dotenv import load_dotenv
-from models.schemas import AnalyzeRequest, AnalyzeResponse, HealthResponse, ChatRequest, ChatResponse, LiveCommentaryRequest, LiveCommentaryResponse
+from models.schemas import AnalyzeRequest, AnalyzeResponse, HealthResponse, ChatRequest, ChatResponse, LiveCommentaryRequest, LiveCommentaryResponse, PreAnalysisJobRequest
 from services.caption_extractor import YouTubeCaptionExtractor
+from services.event_timeline import EVENT_TYPES
 from services.analogy_generator import AnalogyGenerator
+from services.analogy_batcher import AnalogyBatcher
 from services.cache_manager import CacheManager
 from services.vision_analyzer import VisionAnalyzer
-from services.youtube_extractor import YouTubeFrameExtractor
+from services.youtube_extractor import YouTubeFrameExtractor, SEEK_EXACT, SEEK_MODES
 from services.chat_service import ChatService
 from services.video_metadata import VideoMetadataExtractor
-from services.commentary_orchestrator import CommentaryOrchestrator
+from services.commentary_orchestrator import CommentaryOrchestrator, LIVE_SEEK_MODE
+from services.analysis_pipeline import AnalysisPipeline
+from services.live_session import LiveSessionManager
+from services.live_broadcast import LiveBroadcaster
+from services.prefetch_scheduler import PrefetchScheduler
+from services.pre_analysis_jobs import PreAnalysisJobManager
+from services.analysis_store import get_analysis_store
+from services.live_ingest import get_live_ingest
+from services.proxy_store import get_proxy_store
+from services.video_source import get_video_library
+from services.audio_excitement import get_excitement_detector
+from services.transcription_pipeline import get_transcription_pipeline
+from services.priority_scheduler import current_priority, LIVE, get_all_stats as get_scheduler_stats
+from services.admission_controller import AdmissionController, TIER_VISION, TIER_CACHED
+from services.quality_profiles import PROFILES, current_profile, get_profile, deployment_profile
+from services.circuit_breaker import get_all_states
+from services.deadline import Deadline
+from services.llm_response_cache import get_llm_cache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -42,24 +64,94 @@ api_key = os.getenv("ANTHROPIC_API_KEY") if ai_provider == "anthropic" else os.g
 
 caption_extractor = YouTubeCaptionExtractor()
 analogy_generator = AnalogyGenerator(api_key=api_key)
+analogy_batcher = AnalogyBatcher(analogy_generator)
 vision_analyzer = VisionAnalyzer(api_key=api_key, use_enhanced=True)
 frame_extractor = YouTubeFrameExtractor()
 cache = CacheManager()
+analysis_store = get_analysis_store()
+live_ingest = get_live_ingest()
+proxy_store = get_proxy_store()
+video_library = get_video_library()
+excitement_detector = get_excitement_detector()
+admission = AdmissionController()
 chat_service = ChatService()
 metadata_extractor = VideoMetadataExtractor()
-commentary_orchestrator = CommentaryOrchestrator()
+commentary_orchestrator = CommentaryOrchestrator(cache=cache, store=analysis_store)
+live_broadcaster = LiveBroadcaster(commentary_orchestrator)
+live_sessions = LiveSessionManager(live_broadcaster)
+analysis_pipeline = AnalysisPipeline(
+    frame_extractor=frame_extractor,
+    vision_analyzer=vision_analyzer,
+    caption_extractor=caption_extractor,
+    analogy_generator=analogy_generator,
+    api_key=api_key,
+    analogy_batcher=analogy_batcher,
+    store=analysis_store
+)
+prefetcher = PrefetchScheduler(cache, analysis_pipeline, commentary_orchestrator, excitement_detector)
+pre_analysis = PreAnalysisJobManager(
+    frame_extractor=frame_extractor,
+    vision_analyzer=vision_analyzer,
+    analysis_pipeline=analysis_pipeline,
+    store=analysis_store,
+    commentary_enhancer=commentary_orchestrator.commentary_enhancer
+)
+
+
+@app.on_event("startup")
+async def start_background_workers():
+    await pre_analysis.start()
+    await live_ingest.start()
+    await proxy_store.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await pre_analysis.stop()
+    await live_ingest.stop()
+    await proxy_store.stop()
+    await excitement_detector.stop()
+    await asyncio.get_running_loop().run_in_executor(None, analysis_store.close)
+
+
+def _use_profile(name: Optional[str]):
+    if name is None:
+        return
+    if name not in PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown quality profile '{name}' (expected one of: {', '.join(PROFILES)})")
+    current_profile.set(name)
+
+
+def _seek_mode(name: Optional[str], default: str) -> str:
+    if name is None:
+        return default
+    if name not in SEEK_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown seek mode '{name}' (expected one of: {', '.join(SEEK_MODES)})")
+    return name
+
+
+def _client_id(http_request: Request, x_client_id: Optional[str]) -> str:
+    if x_client_id:
+        return x_client_id
+    return http_request.client.host if http_request.client else "anonymous"
 
 
 @app.post("/api/analyze", response_model=AnalyzeResponse)
-async def analyze_video(request: AnalyzeRequest):
+async def analyze_video(
+    request: AnalyzeRequest,
+    http_request: Request,
+    x_deadline_ms: Optional[float] = Header(default=None),
+    x_client_id: Optional[str] = Header(default=None)
+):
+    deadline = Deadline.from_request(header_ms=x_deadline_ms, field_ms=request.deadlineMs)
+    _use_profile(request.profile)
+    seek_mode = _seek_mode(request.seekMode, SEEK_EXACT)
+    prefetcher.record(_client_id(http_request, x_client_id), request.videoId, request.timestamp, kind="analyze")
     try:
         base_timestamp = int(request.timestamp)
         cache_keys = [
-            f"{request.videoId}:{base_timestamp}",
-            f"{request.videoId}:{base_timestamp - 1}",
-            f"{request.videoId}:{base_timestamp + 1}",
-            f"{request.videoId}:{base_timestamp - 2}",
-            f"{request.videoId}:{base_timestamp + 2}",
+            AnalysisPipeline.cache_key(request.videoId, base_timestamp + offset)
+            for offset in (0, -1, 1, -2, 2)
         ]
         
         for cache_key in cache_keys:
@@ -69,119 +161,63 @@ async def analyze_video(request: AnalyzeRequest):
                 cached['timestamp'] = request.timestamp
                 cached_dict = {k: v for k, v in cached.items() if k != 'cached'}
                 cached_dict['cached'] = True
+                cached_dict['tier'] = TIER_CACHED
                 return AnalyzeResponse(**cached_dict)
         
-        print(f"Analyzing {request.videoId} at {request.timestamp}s")
+        stored = analysis_store.nearest(request.videoId, request.timestamp, require="analogy", max_distance=2)
+        if stored:
+            print(f"Analysis store hit for {request.videoId} at {stored['second']}s")
+            response_data = {
+                "originalCommentary": stored["commentary"],
+                "nflAnalogy": stored["analogy"],
+                "source": stored["source"],
+                "tier": TIER_CACHED,
+                "timestamp": request.timestamp,
+                "events": analysis_pipeline.nearby_events(request.videoId, request.timestamp),
+                "cached": True
+            }
+            cache.set(AnalysisPipeline.cache_key(request.videoId, base_timestamp), response_data, expire=600)
+            return AnalyzeResponse(**response_data)
         
-        print(f"[STEP 1] Extracting frame from video at {request.timestamp}s...")
-        frame_base64 = None
-        frame_extraction_error = None
-        try:
-            frame_base64 = await asyncio.wait_for(
-                frame_extractor.extract_frame(request.videoId, request.timestamp),
-                timeout=5.0
-            )
-            if frame_base64:
-                print(f"[STEP 1] ✓ Frame extracted successfully (size: {len(frame_base64)} chars)")
-            else:
-                print("[STEP 1] ✗ Frame extraction returned None")
-        except asyncio.TimeoutError:
-            frame_extraction_error = "Timeout after 5 seconds"
-            print(f"[STEP 1] ✗ Frame extraction timed out: {frame_extraction_error}")
-        except Exception as e:
-            frame_extraction_error = str(e)
-            print(f"[STEP 1] ✗ Frame extraction error: {frame_extraction_error}")
-            import traceback
-            traceback.print_exc()
-        
-        commentary = None
-        vision_analysis_error = None
-        if frame_base64:
-            if not (vision_analyzer.azure_client or vision_analyzer.claude_client):
-                print("[STEP 2] ✗ Vision analyzer not initialized (no API key)")
-                vision_analysis_error = "Vision analyzer not initialized - ANTHROPIC_API_KEY not set"
-            else:
-                print("[STEP 2] Analyzing frame with vision AI...")
-                try:
-                    commentary = await asyncio.wait_for(
-                        vision_analyzer.analyze_frame(frame_base64),
-                        timeout=5.0
+        excitement_detector.ensure(request.videoId)
+        calm = excitement_detector.is_calm(request.videoId, request.timestamp - 1, request.timestamp + 1)
+        async with admission.admit(calm=calm) as tier:
+            if tier == TIER_CACHED:
+                stored = analysis_store.nearest(request.videoId, request.timestamp, max_distance=admission.stale_radius)
+                if stored:
+                    print(f"[ADMISSION] Overloaded - serving stored analysis from {stored['second']}s")
+                    return AnalyzeResponse(
+                        originalCommentary=stored["commentary"],
+                        nflAnalogy=stored["analogy"] or analogy_generator._generate_stub_analogy(stored["commentary"]),
+                        source=stored["source"],
+                        tier=TIER_CACHED,
+                        profile=get_profile().name,
+                        timestamp=request.timestamp,
+                        events=analysis_pipeline.nearby_events(request.videoId, request.timestamp),
+                        cached=True
                     )
-                    if commentary:
-                        print(f"[STEP 2] ✓ Generated commentary from vision: {commentary[:50]}...")
-                    else:
-                        print("[STEP 2] ✗ Vision analysis returned empty commentary")
-                except asyncio.TimeoutError:
-                    vision_analysis_error = "Timeout after 5 seconds"
-                    print(f"[STEP 2] ✗ Vision analysis timed out: {vision_analysis_error}")
-                except Exception as e:
-                    vision_analysis_error = str(e)
-                    print(f"[STEP 2] ✗ Vision analysis error: {vision_analysis_error}")
-                    import traceback
-                    traceback.print_exc()
-        else:
-            print("[STEP 2] ⏭ Skipping vision analysis - no frame available")
-            vision_analysis_error = frame_extraction_error or "Frame extraction failed"
-        
-        if not commentary:
-            print(f"[STEP 3] Vision analysis failed ({vision_analysis_error}), trying caption extraction...")
-            try:
-                commentary = await asyncio.wait_for(
-                    caption_extractor.get_caption_at_timestamp(
-                        request.videoId,
-                        request.timestamp
-                    ),
-                    timeout=10.0
-                )
-                if commentary:
-                    print(f"[STEP 3] ✓ Found caption: {commentary[:50]}...")
-                else:
-                    print("[STEP 3] ✗ No captions available")
-            except asyncio.TimeoutError:
-                print("[STEP 3] ✗ Caption extraction timed out")
-            except Exception as e:
-                print(f"[STEP 3] ✗ Caption extraction error: {e}")
-                import traceback
-                traceback.print_exc()
-        
-        if not commentary:
-            print("[STEP 4] Using stub commentary as final fallback")
-            import random
-            stubs = [
-                "Players are moving into position, creating space for a potential attack.",
-                "The team is building up play from the back, looking for passing options.",
-                "A counter-attack is developing with players sprinting forward.",
-                "Defensive shape is compact, denying space in the central areas.",
-                "The ball is in the final third, with attackers looking for an opening."
-            ]
-            commentary = random.choice(stubs)
-            print(f"[STEP 4] ✓ Using stub commentary: {commentary}")
-        
-        print("[STEP 5] Generating NFL analogy...")
-        if not api_key:
-            print("[STEP 5] Using stub analogy (no API key)")
-            analogy = analogy_generator._generate_stub_analogy(commentary)
-        else:
-            print("[STEP 5] Using AI to generate analogy...")
-            try:
-                analogy = await analogy_generator.generate(commentary)
-                print(f"[STEP 5] ✓ Generated analogy: {analogy[:50]}...")
-            except Exception as e:
-                print(f"[STEP 5] ✗ Analogy generation error: {e}, using stub")
-                analogy = analogy_generator._generate_stub_analogy(commentary)
+            
+            print(f"Analyzing {request.videoId} at {request.timestamp}s (tier {tier}, deadline budget {deadline.budget:.1f}s)")
+            
+            result = await analysis_pipeline.analyze(request.videoId, request.timestamp, deadline, tier=tier, seek_mode=seek_mode)
         
         response_data = {
-            "originalCommentary": commentary,
-            "nflAnalogy": analogy,
+            "originalCommentary": result["originalCommentary"],
+            "nflAnalogy": result["nflAnalogy"],
+            "source": result["source"],
+            "tier": result["tier"],
+            "profile": get_profile().name,
             "timestamp": request.timestamp,
+            "frameTimestamp": result.get("frameTimestamp"),
+            "frameClock": result.get("frameClock"),
+            "events": result.get("events"),
             "cached": False
         }
         
-        primary_cache_key = f"{request.videoId}:{base_timestamp}"
-        cache.set(primary_cache_key, response_data, expire=600)
+        primary_cache_key = AnalysisPipeline.cache_key(request.videoId, base_timestamp)
+        cache.set(primary_cache_key, response_data, expire=600 if result["tier"] == TIER_VISION else 30)
         
-        print(f"[COMPLETE] Analysis complete: {commentary[:50]}...")
-        print(f"[SUMMARY] Commentary source: {'Vision AI' if frame_base64 and (vision_analyzer.azure_client or vision_analyzer.claude_client) else 'Captions' if commentary and not any(phrase in commentary for phrase in ['Players are moving', 'The team is building']) else 'Stub'}")
+        print(f"[COMPLETE] Analysis complete in {deadline.elapsed():.2f}s (tier: {result['tier']}, source: {result['source']})")
         return AnalyzeResponse(**response_data)
         
     except HTTPException:
@@ -205,6 +241,17 @@ async def get_captions(video_id: str):
         return {"captions": [], "videoId": video_id, "error": str(e)}
 
 
+@app.get("/api/transcript/{video_id:path}")
+async def get_transcript(video_id: str, start: float = 0.0, end: float = 60.0, language: str = "en-US"):
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be greater than start")
+    pipeline = get_transcription_pipeline()
+    if not pipeline.audio_extractor.azure_speech_key:
+        return {"videoId": video_id, "available": False, "segments": []}
+    segments = await pipeline.transcribe(video_id, start, end, language=language)
+    return {"videoId": video_id, "available": True, "segments": segments}
+
+
 @app.get("/api/video-metadata/{video_id:path}")
 async def get_video_metadata(video_id: str):
     try:
@@ -229,7 +276,7 @@ async def generate_analogy_from_text(request: dict):
             analogy = analogy_generator._generate_stub_analogy(commentary)
         else:
             try:
-                analogy = await analogy_generator.generate(commentary)
+                analogy = await analogy_batcher.generate(commentary)
             except Exception as e:
                 print(f"[ANALOGY] Error generating analogy: {e}, using stub")
                 analogy = analogy_generator._generate_stub_analogy(commentary)
@@ -242,32 +289,54 @@ async def generate_analogy_from_text(request: dict):
         return {"nflAnalogy": "This is like a well-designed offensive scheme — every player has a role, creating space and options."}
 
 
+async def _prepare_chat_context(request: ChatRequest):
+    if request.context:
+        print(f"[CHAT] Context provided - commentary: {request.context.get('commentary', 'N/A')[:60]}...")
+        print(f"[CHAT] Context provided - nflAnalogy: {request.context.get('nflAnalogy', 'N/A')[:60]}...")
+    
+    video_metadata = request.videoMetadata
+    if not video_metadata:
+        print(f"[CHAT] Fetching video metadata...")
+        video_metadata = await metadata_extractor.get_metadata(request.videoId)
+        if video_metadata:
+            print(f"[CHAT] Got metadata: {video_metadata.get('title', 'N/A')[:50]}...")
+    
+    excitement_detector.ensure(request.videoId)
+    
+    caption_text = None
+    try:
+        caption_text = await caption_extractor.get_caption_at_timestamp(request.videoId, request.timestamp)
+        if caption_text:
+            print(f"[CHAT] Got caption at {request.timestamp}s: {caption_text[:60]}...")
+    except Exception as e:
+        print(f"[CHAT] Could not get caption: {e}")
+    
+    enhanced_context = request.context.copy() if request.context else {}
+    if caption_text:
+        enhanced_context['caption'] = caption_text
+    
+    if caption_text:
+        analysis_store.upsert(request.videoId, int(request.timestamp), caption=caption_text)
+    
+    stored = analysis_store.nearest(request.videoId, request.timestamp, max_distance=3)
+    if stored and stored["source"] == "vision":
+        print(f"[CHAT] Using stored analysis from {stored['second']}s")
+        enhanced_context['commentary'] = stored["commentary"]
+        if stored["analogy"]:
+            enhanced_context['nflAnalogy'] = stored["analogy"]
+    
+    return video_metadata, enhanced_context
+
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     try:
         print(f"Chat request for {request.videoId} at {request.timestamp}s: {request.userMessage[:50]}...")
-        if request.context:
-            print(f"[CHAT] Context provided - commentary: {request.context.get('commentary', 'N/A')[:60]}...")
-            print(f"[CHAT] Context provided - nflAnalogy: {request.context.get('nflAnalogy', 'N/A')[:60]}...")
+        event = await chat_service.resolve_event_query(request.userMessage, request.videoId, caption_extractor, request.timestamp)
+        if event:
+            return ChatResponse(response=event["reply"], timestamp=event["timestamp"], matches=event["matches"])
         
-        video_metadata = request.videoMetadata
-        if not video_metadata:
-            print(f"[CHAT] Fetching video metadata...")
-            video_metadata = await metadata_extractor.get_metadata(request.videoId)
-            if video_metadata:
-                print(f"[CHAT] Got metadata: {video_metadata.get('title', 'N/A')[:50]}...")
-        
-        caption_text = None
-        try:
-            caption_text = await caption_extractor.get_caption_at_timestamp(request.videoId, request.timestamp)
-            if caption_text:
-                print(f"[CHAT] Got caption at {request.timestamp}s: {caption_text[:60]}...")
-        except Exception as e:
-            print(f"[CHAT] Could not get caption: {e}")
-        
-        enhanced_context = request.context.copy() if request.context else {}
-        if caption_text:
-            enhanced_context['caption'] = caption_text
+        video_metadata, enhanced_context = await _prepare_chat_context(request)
         
         response_text = await chat_service.chat(
             user_message=request.userMessage,
@@ -277,7 +346,8 @@ async def chat(request: ChatRequest):
             video_metadata=video_metadata,
             caption_extractor=caption_extractor,
             frame_extractor=frame_extractor,
-            vision_analyzer=vision_analyzer
+            vision_analyzer=vision_analyzer,
+            excitement_detector=excitement_detector
         )
         
         return ChatResponse(
@@ -292,16 +362,73 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    print(f"Streaming chat request for {request.videoId} at {request.timestamp}s: {request.userMessage[:50]}...")
+    
+    async def event_stream():
+        try:
+            resolved = await chat_service.resolve_event_query(request.userMessage, request.videoId, caption_extractor, request.timestamp)
+            if resolved:
+                yield f"event: token\ndata: {json.dumps({'content': resolved['reply']})}\n\n"
+                yield f"event: done\ndata: {json.dumps({'response': resolved['reply'], 'timestamp': resolved['timestamp'], 'matches': resolved['matches']})}\n\n"
+                return
+            
+            video_metadata, enhanced_context = await _prepare_chat_context(request)
+            async for event in chat_service.chat_stream(
+                user_message=request.userMessage,
+                video_id=request.videoId,
+                current_time=request.timestamp,
+                context=enhanced_context,
+                video_metadata=video_metadata,
+                caption_extractor=caption_extractor,
+                frame_extractor=frame_extractor,
+                vision_analyzer=vision_analyzer,
+                excitement_detector=excitement_detector
+            ):
+                name = event.pop("event")
+                yield f"event: {name}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            print(f"Streaming chat error: {e}")
+            import traceback
+            traceback.print_exc()
+            yield f"event: error\ndata: {json.dumps({'detail': f'Chat failed: {str(e)}'})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/api/live-commentary", response_model=LiveCommentaryResponse)
-async def generate_live_commentary(request: LiveCommentaryRequest):
+async def generate_live_commentary(
+    request: LiveCommentaryRequest,
+    http_request: Request,
+    x_client_id: Optional[str] = Header(default=None)
+):
+    _use_profile(request.profile)
+    seek_mode = _seek_mode(request.seekMode, LIVE_SEEK_MODE)
+    window_size = request.windowSize or get_profile().window_size
+    client_id = _client_id(http_request, x_client_id)
+    prefetcher.record(
+        client_id,
+        request.videoId,
+        request.timestamp,
+        kind="live",
+        window_size=window_size
+    )
+    current_priority.set(LIVE)
     try:
         logger = logging.getLogger(__name__)
         logger.info(f"[LIVE COMMENTARY] Generating commentary for {request.videoId} at {request.timestamp}s")
         
-        result = await commentary_orchestrator.generate_live_commentary(
-            video_url=request.videoId,
-            current_time=request.timestamp,
-            window_size=request.windowSize
+        result = await live_broadcaster.generate(
+            request.videoId,
+            request.timestamp,
+            window_size,
+            live_broadcaster.client_deduplicator(client_id, request.videoId),
+            seek_mode
         )
         
         logger.info(f"[LIVE COMMENTARY] Result: commentary={result.get('commentary') is not None}, skipped={result.get('skipped', False)}")
@@ -318,6 +445,135 @@ async def generate_live_commentary(request: LiveCommentaryRequest):
         raise HTTPException(status_code=500, detail=f"Commentary generation failed: {str(e)}")
 
 
+@app.get("/api/analysis/{video_id:path}")
+async def get_analysis_timeline(video_id: str, start: float = 0.0, end: float = 86400.0):
+    return {"videoId": video_id, "timeline": analysis_store.range(video_id, start, end)}
+
+
+@app.get("/api/excitement/{video_id:path}")
+async def get_excitement_curve(video_id: str, start: float = 0.0, end: float = 86400.0):
+    excitement_detector.ensure(video_id)
+    curve = excitement_detector.curve(video_id)
+    if curve is None:
+        return {"videoId": video_id, "threshold": excitement_detector.threshold, "complete": False, "curve": []}
+    return {
+        "videoId": video_id,
+        "threshold": excitement_detector.threshold,
+        "complete": curve.complete,
+        "curve": [{"second": second, "excitement": round(score, 3)} for second, score in curve.points(start, end)]
+    }
+
+
+@app.get("/api/events/{video_id:path}")
+async def get_event_timeline(video_id: str, kind: Optional[str] = Query(default=None, alias="type"), start: float = 0.0, end: float = 86400.0):
+    if kind is not None and kind not in EVENT_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown event type '{kind}' (expected one of: {', '.join(EVENT_TYPES)})")
+    timeline = await caption_extractor.get_event_timeline(video_id)
+    if timeline is None:
+        return {"videoId": video_id, "available": False, "counts": {}, "events": []}
+    return {
+        "videoId": video_id,
+        "available": True,
+        "counts": timeline.counts(),
+        "events": timeline.between(start, end, kind=kind)
+    }
+
+
+@app.get("/api/library")
+async def list_local_videos():
+    videos = await asyncio.get_running_loop().run_in_executor(None, video_library.list_videos)
+    return {"videos": videos}
+
+
+@app.get("/api/quality-profiles")
+async def list_quality_profiles():
+    return {
+        "deployment": deployment_profile(),
+        "profiles": {name: profile.to_dict() for name, profile in PROFILES.items()}
+    }
+
+
+@app.post("/api/jobs")
+async def submit_pre_analysis_job(request: PreAnalysisJobRequest):
+    job = await pre_analysis.submit(
+        video_id=request.videoId,
+        start_time=request.startTime,
+        end_time=request.endTime,
+        cadence=request.cadence,
+        vision_cadence=request.visionCadence
+    )
+    return job.to_dict()
+
+
+@app.get("/api/jobs")
+async def list_pre_analysis_jobs():
+    return {"jobs": pre_analysis.list_jobs()}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_pre_analysis_job(job_id: str):
+    job = pre_analysis.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_pre_analysis_job(job_id: str):
+    job = pre_analysis.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.websocket("/ws/live-commentary")
+async def live_commentary_socket(websocket: WebSocket, videoId: str, windowSize: Optional[float] = None, startTime: float = 0.0, profile: Optional[str] = None, seekMode: Optional[str] = None):
+    await websocket.accept()
+    logger = logging.getLogger(__name__)
+    send_lock = asyncio.Lock()
+    
+    async def send(message):
+        async with send_lock:
+            await websocket.send_json(message)
+    
+    session = live_sessions.open_session(
+        videoId,
+        send,
+        window_size=windowSize,
+        profile=profile if profile in PROFILES else None,
+        seek_mode=seekMode if seekMode in SEEK_MODES else None
+    )
+    session.seek(startTime, playing=False)
+    session.start()
+    await send({"type": "session", "sessionId": session.session_id, "videoId": videoId})
+    
+    try:
+        while True:
+            message = await websocket.receive_json()
+            msg_type = message.get("type")
+            time_value = message.get("time")
+            position = float(time_value) if time_value is not None else None
+            
+            if msg_type == "position" and position is not None:
+                session.update_position(position, playing=message.get("playing", True))
+            elif msg_type == "seek" and position is not None:
+                session.seek(position)
+            elif msg_type == "pause":
+                session.pause(position)
+            elif msg_type == "play":
+                session.resume(position)
+            elif msg_type == "close":
+                break
+            else:
+                await send({"type": "error", "error": f"Unknown message: {message}"})
+    except WebSocketDisconnect:
+        logger.info(f"[LIVE SOCKET] Client disconnected from session {session.session_id[:8]}")
+    except Exception as e:
+        logger.error(f"[LIVE SOCKET] Error: {e}", exc_info=True)
+    finally:
+        await live_sessions.close_session(session)
+
+
 @app.get("/health")
 async def health_check():
     api_key_set = bool(os.getenv("ANTHROPIC_API_KEY"))
@@ -331,6 +587,22 @@ async def health_check():
         "has_api_key": api_key_set,
         "has_vision": vision_enabled,
         "has_gemini": gemini_enabled,
+        "circuit_breakers": get_all_states(),
+        "llm_cache": get_llm_cache().stats(),
+        "analogy_batching": analogy_batcher.stats(),
+        "live_sessions": live_sessions.stats(),
+        "live_broadcast": live_broadcaster.stats(),
+        "frame_window": commentary_orchestrator.frame_service.stats(),
+        "live_ingest": live_ingest.stats(),
+        "proxies": proxy_store.stats(),
+        "local_library": video_library.stats(),
+        "audio_excitement": excitement_detector.stats(),
+        "transcription": get_transcription_pipeline().stats(),
+        "prefetch": prefetcher.stats(),
+        "pre_analysis": pre_analysis.stats(),
+        "analysis_store": analysis_store.stats(),
+        "scheduler": get_scheduler_stats(),
+        "admission": admission.stats(),
         "port": int(os.getenv("PORT", 8000)),
         "message": "Vision analysis enabled" if vision_enabled else "Vision analysis disabled - set ANTHROPIC_API_KEY in .env to enable"
     }
@@ -344,7 +616,14 @@ async def root():
         "endpoints": {
             "analyze": "/api/analyze",
             "chat": "/api/chat",
+            "chat-stream": "/api/chat/stream",
             "live-commentary": "/api/live-commentary",
+            "live-commentary-socket": "/ws/live-commentary",
+            "jobs": "/api/jobs",
+            "quality-profiles": "/api/quality-profiles",
+            "analysis-timeline": "/api/analysis/{videoId}",
+            "excitement-curve": "/api/excitement/{videoId}",
+            "event-timeline": "/api/events/{videoId}",
             "health": "/health",
             "docs": "/docs"
         },
@@ -1,10 +1,13 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 class AnalyzeRequest(BaseModel):
     videoId: str = Field(..., description="Video URL (any site) or YouTube video ID (for backward compatibility)")
     timestamp: float = Field(..., description="Current video timestamp in seconds")
+    deadlineMs: Optional[float] = Field(default=None, description="Total time budget for the request in milliseconds (X-Deadline-Ms header takes precedence)")
+    profile: Optional[str] = Field(default=None, description="Quality profile: realtime, balanced or quality (defaults to the deployment profile)")
+    seekMode: Optional[str] = Field(default=None, description="Frame seek mode: exact (default) or fast, which snaps to a nearby keyframe or decoded frame")
 
 
 class FieldDiagram(BaseModel):
@@ -19,6 +22,12 @@ class AnalyzeResponse(BaseModel):
     nflAnalogy: str = Field(..., description="NFL analogy explanation")
     timestamp: float = Field(..., description="Timestamp used for analysis")
     cached: bool = Field(default=False, description="Whether result was from cache")
+    source: Optional[str] = Field(default=None, description="Commentary source: vision, captions, detections or stub")
+    tier: Optional[str] = Field(default=None, description="Degradation tier the request was served at: vision, detections, captions or cached")
+    profile: Optional[str] = Field(default=None, description="Quality profile the request ran with")
+    frameTimestamp: Optional[float] = Field(default=None, description="Timestamp of the frame actually analyzed, which may differ from the requested one in fast seek mode")
+    frameClock: Optional[str] = Field(default=None, description="What frameTimestamp counts from: video (position in the video) or live (seconds since the live ingest worker connected; the frame is the newest one buffered, not one at the requested time)")
+    events: Optional[List[Dict[str, Any]]] = Field(default=None, description="Match events classified from the commentary shortly before and after the timestamp")
 
 
 class ChatRequest(BaseModel):
@@ -32,6 +41,7 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     response: str = Field(..., description="AI-generated response")
     timestamp: float = Field(..., description="Timestamp used for the response")
+    matches: Optional[List[Dict[str, Any]]] = Field(default=None, description="Caption moments matching an event question such as 'when was the first goal', in order")
 
 
 class HealthResponse(BaseModel):
@@ -43,7 +53,9 @@ class HealthResponse(BaseModel):
 class LiveCommentaryRequest(BaseModel):
     videoId: str = Field(..., description="Video URL or YouTube video ID")
     timestamp: float = Field(..., description="Current video timestamp in seconds")
-    windowSize: Optional[float] = Field(default=5.0, description="Size of frame window in seconds")
+    windowSize: Optional[float] = Field(default=None, description="Size of frame window in seconds (defaults to the quality profile's window)")
+    profile: Optional[str] = Field(default=None, description="Quality profile: realtime, balanced or quality (defaults to the deployment profile)")
+    seekMode: Optional[str] = Field(default=None, description="Frame seek mode: fast (default for live commentary) or exact")
 
 
 class LiveCommentaryResponse(BaseModel):
@@ -52,3 +64,11 @@ class LiveCommentaryResponse(BaseModel):
     timestamp: float = Field(..., description="Timestamp used for commentary")
     skipped: bool = Field(default=False, description="Whether commentary was skipped due to similarity")
     error: Optional[str] = Field(None, description="Error message if generation failed")
+
+
+class PreAnalysisJobRequest(BaseModel):
+    videoId: str = Field(..., description="Video URL or YouTube video ID to pre-analyze")
+    startTime: float = Field(default=0.0, description="Where to start walking the video, in seconds")
+    endTime: Optional[float] = Field(default=None, description="Where to stop, in seconds (defaults to the video duration)")
+    cadence: Optional[float] = Field(default=None, description="Seconds between detection/pose samples")
+    visionCadence: Optional[float] = Field(default=None, description="Seconds between vision LLM samples")
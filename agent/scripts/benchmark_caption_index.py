@@ -0,0 +1,78 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.caption_index import CaptionIndex, parse_event_query
+from services.event_timeline import EventTimeline
+
+FILLER = [
+    "they keep the ball well in midfield",
+    "a long ball forward but it's overhit",
+    "patient build-up from the back here",
+    "the full back pushes on down the left",
+    "pressing high up the pitch now",
+    "that's a tidy little exchange of passes",
+]
+
+EVENTS = [
+    (600, "Silva strikes from the edge of the box and it's a great save"),
+    (1325, "GOAL! Silva scores with a header from the corner"),
+    (1331, "what a goal that is, he's off celebrating with the fans"),
+    (2240, "that's a yellow card, he's booked for the late challenge"),
+    (2900, "penalty! the referee points to the spot"),
+    (2935, "and Ramos sends the keeper the wrong way, it's in the back of the net"),
+    (3600, "substitution for the visitors, number nine is replaced"),
+    (4810, "Silva again, scored! that's his second of the night"),
+]
+
+QUERIES = [
+    "when was the first goal",
+    "when did Silva score his second",
+    "show me the penalty",
+    "when was the yellow card",
+    "what minute was the substitution",
+    "when did the keeper make a great save",
+    "when did Ramos score",
+]
+
+
+def synthetic_captions(seconds, seed):
+    rng = random.Random(seed)
+    captions = [{"start": float(t), "duration": 3.0, "text": rng.choice(FILLER)} for t in range(0, seconds, 4)]
+    captions += [{"start": float(t), "duration": 3.0, "text": text} for t, text in EVENTS]
+    return captions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time caption index and event timeline builds and event lookups on a synthetic 90 minute commentary")
+    parser.add_argument("--seconds", type=int, default=5400)
+    parser.add_argument("--repeat", type=int, default=2000, help="Lookups per query")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    captions = synthetic_captions(args.seconds, args.seed)
+    index = CaptionIndex(captions)
+    print(f"Indexed {len(index)} cues into {len(index.postings)} terms in {index.build_ms:.1f}ms")
+    timeline = EventTimeline.build(captions)
+    print(f"Classified {timeline.cues} cues into {len(timeline)} events {timeline.counts()} in {timeline.build_ms:.1f}ms")
+
+    for query in QUERIES:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            terms, ordinal = parse_event_query(query)
+            occurrences = index.find(terms)
+        elapsed_us = (time.perf_counter() - started) / args.repeat * 1e6
+        answer = "no match"
+        if occurrences:
+            in_range = ordinal is not None and -len(occurrences) <= ordinal < len(occurrences)
+            chosen = occurrences[ordinal if in_range else 0]
+            answer = f"{int(chosen['timestamp'] // 60)}:{int(chosen['timestamp'] % 60):02d} of {len(occurrences)}"
+        print(f"{query:<42} {str(terms):<28} {answer:<10} {elapsed_us:7.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import os
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.commentary_deduplicator import CommentaryDeduplicator
+
+
+PLAYERS = ["Saka", "Rice", "Odegaard", "Salah", "Haaland", "De Bruyne", "Kane", "Son", "Fernandes", "Palmer"]
+TEMPLATES = [
+    "{p} picks it up in midfield and drives forward at the defence",
+    "{p} shoots from the edge of the box and the keeper palms it away",
+    "What a ball from {p}, curled in behind the full back",
+    "{p} goes down under the challenge but the referee waves play on",
+    "Corner to the attacking side after {p} forces a deflection",
+    "{p} with a clever turn, leaves his marker for dead",
+    "The keeper comes out to claim it ahead of {p}",
+    "{p} slides in and wins the ball back cleanly",
+]
+FILLERS = ["", " - brilliant!", " here", " once again", " and the crowd are on their feet", " as the pressure builds"]
+
+
+def reference_should_skip(history, new_commentary, threshold):
+    if not new_commentary or not new_commentary.strip():
+        return True
+    new_lower = new_commentary.lower().strip()
+    for old_commentary in history:
+        if SequenceMatcher(None, new_lower, old_commentary.lower().strip()).ratio() >= threshold:
+            return True
+    return False
+
+
+def mutate(text, rng):
+    words = text.split()
+    roll = rng.random()
+    if roll < 0.3 and len(words) > 3:
+        words[rng.randrange(len(words))] = rng.choice(["really", "quickly", "now", "again"])
+    elif roll < 0.5 and len(words) > 3:
+        del words[rng.randrange(len(words))]
+    elif roll < 0.7:
+        return text.rstrip(".!") + rng.choice(FILLERS)
+    return " ".join(words)
+
+
+def corpus(size, rng, repeat=1):
+    lines = []
+    for _ in range(size):
+        if lines and rng.random() < 0.45:
+            base = rng.choice(lines[-10:])
+            lines.append(mutate(base, rng))
+        else:
+            line = rng.choice(TEMPLATES).format(p=rng.choice(PLAYERS)) + rng.choice(FILLERS)
+            lines.append(" ".join([line] * repeat))
+    return lines
+
+
+def parity(lines, threshold, shingle_threshold, max_history):
+    deduplicator = CommentaryDeduplicator(similarity_threshold=shingle_threshold, max_history=max_history)
+    history = []
+    agree = false_skip = missed_skip = 0
+    for i, line in enumerate(lines):
+        expected = reference_should_skip(history, line, threshold)
+        actual = deduplicator.should_skip(line)
+        if expected == actual:
+            agree += 1
+        elif actual:
+            false_skip += 1
+        else:
+            missed_skip += 1
+        if not expected:
+            history.append(line)
+            history = history[-max_history:]
+            deduplicator.add_commentary(line, float(i))
+    return agree, false_skip, missed_skip
+
+
+def time_checks(lines, max_history, check):
+    history = lines[:max_history]
+    probes = lines[max_history:]
+    started = time.perf_counter()
+    for line in probes:
+        check(history, line)
+    return (time.perf_counter() - started) / max(1, len(probes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare shingle-based deduplication against the SequenceMatcher baseline")
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.85, help="SequenceMatcher ratio used by the old deduplicator")
+    parser.add_argument("--shingle-threshold", type=float, default=None, help="Dice threshold for the shingle deduplicator (default: DEDUP_SIMILARITY_THRESHOLD)")
+    parser.add_argument("--history", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lines = corpus(args.lines, rng)
+    agree, false_skip, missed_skip = parity(lines, args.threshold, args.shingle_threshold, args.history)
+    shingle_threshold = CommentaryDeduplicator(similarity_threshold=args.shingle_threshold).threshold
+    print(f"Parity over {len(lines)} lines (SequenceMatcher >= {args.threshold} vs shingle Dice >= {shingle_threshold}):")
+    print(f"  agreement {agree / len(lines):.2%}  extra skips {false_skip}  missed skips {missed_skip}")
+
+    print()
+    print(f"{'text x':>6} {'chars':>6} {'SequenceMatcher us':>19} {'shingles us':>12} {'speedup':>8}")
+    for repeat in (1, 4, 16):
+        sample = corpus(400, random.Random(args.seed), repeat=repeat)
+        chars = sum(len(line) for line in sample) // len(sample)
+
+        def reference(history, line):
+            reference_should_skip(history, line, args.threshold)
+
+        deduplicator = CommentaryDeduplicator(similarity_threshold=args.shingle_threshold, max_history=args.history)
+        for i, line in enumerate(sample[:args.history]):
+            deduplicator.add_commentary(line, float(i))
+
+        def shingled(history, line):
+            deduplicator.should_skip(line)
+
+        baseline = time_checks(sample, args.history, reference)
+        candidate = time_checks(sample, args.history, shingled)
+        print(f"{repeat:>6} {chars:>6} {baseline * 1e6:>19.1f} {candidate * 1e6:>12.1f} {baseline / candidate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from dotenv import load_dotenv
+from services.quality_profiles import PROFILES, current_profile
+from services.youtube_extractor import YouTubeFrameExtractor
+from services.video_source import get_video_library
+from services.pose_estimator import PoseEstimator
+from utils.image_processor import compress_image
+
+try:
+    from services.object_detector import ObjectDetector
+except ImportError as e:
+    ObjectDetector = None
+    print(f"Object detection unavailable ({e}) - skipping the detect stage")
+
+
+def summarize(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.mean(ordered) * 1000, 1),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+    }
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def open_source(video: str):
+    local_source = get_video_library().resolve(video)
+    if local_source is not None:
+        return cv2.VideoCapture(local_source.path)
+    if os.path.exists(video):
+        return cv2.VideoCapture(video)
+    stream_url = YouTubeFrameExtractor().resolve_stream_url(video)
+    if not stream_url:
+        raise SystemExit(f"Could not resolve a stream for {video}")
+    return cv2.VideoCapture(stream_url)
+
+
+def benchmark_profile(profile, video, timestamps, detector, pose_estimator, vision_analyzer):
+    stages = {name: [] for name in ("decode", "encode", "compress", "detect", "pose", "vision", "total")}
+    payload_bytes = []
+    cap = open_source(video)
+    try:
+        for timestamp in timestamps:
+            frame_started = time.perf_counter()
+
+            cap.set(cv2.CAP_PROP_POS_MSEC, timestamp * 1000)
+            success, frame = cap.read()
+            stages["decode"].append(time.perf_counter() - frame_started)
+            if not success or frame is None:
+                print(f"  [{profile.name}] no frame at {timestamp:.1f}s - skipping")
+                continue
+
+            frame_base64, elapsed = timed(
+                YouTubeFrameExtractor.encode_frame, frame, profile.frame_max_size, profile.frame_jpeg_quality
+            )
+            stages["encode"].append(elapsed)
+
+            compressed, elapsed = timed(
+                compress_image, frame_base64, profile.azure_image_size, profile.azure_image_quality
+            )
+            stages["compress"].append(elapsed)
+            payload_bytes.append(len(compressed) * 3 / 4)
+
+            if detector is not None and detector.initialized:
+                _, elapsed = timed(detector.detect_objects, frame_base64, 0.25, profile.yolo_model)
+                stages["detect"].append(elapsed)
+            if pose_estimator.initialized:
+                _, elapsed = timed(pose_estimator.estimate_pose, frame_base64, profile.pose_complexity)
+                stages["pose"].append(elapsed)
+
+            if vision_analyzer is not None:
+                token = current_profile.set(profile.name)
+                try:
+                    started = time.perf_counter()
+                    asyncio.run(vision_analyzer.analyze_frame(frame_base64))
+                    stages["vision"].append(time.perf_counter() - started)
+                finally:
+                    current_profile.reset(token)
+
+            stages["total"].append(time.perf_counter() - frame_started)
+    finally:
+        cap.release()
+
+    total = stages["total"]
+    return {
+        "profile": profile.name,
+        "frames": len(total),
+        "stages": {name: summarize(samples) for name, samples in stages.items() if samples},
+        "throughput_fps": round(len(total) / sum(total), 2) if total else 0.0,
+        "mean_payload_kb": round(statistics.mean(payload_bytes) / 1024, 1) if payload_bytes else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the latency/throughput envelope of each quality profile")
+    parser.add_argument("video", help="Local video file, local:<name> library video, video URL or YouTube video ID")
+    parser.add_argument("--start", type=float, default=30.0, help="First timestamp to sample (seconds)")
+    parser.add_argument("--samples", type=int, default=20, help="Frames to sample per profile")
+    parser.add_argument("--spacing", type=float, default=7.0, help="Seconds between sampled frames")
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="Comma-separated profiles to run")
+    parser.add_argument("--with-vision", action="store_true", help="Also time the vision LLM call (costs API credits)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+
+    load_dotenv()
+    timestamps = [args.start + i * args.spacing for i in range(args.samples)]
+    detector = ObjectDetector() if ObjectDetector is not None else None
+    pose_estimator = PoseEstimator()
+    vision_analyzer = None
+    if args.with_vision:
+        from services.vision_analyzer import VisionAnalyzer
+        vision_analyzer = VisionAnalyzer(use_enhanced=False)
+
+    results = []
+    for name in args.profiles.split(","):
+        profile = PROFILES[name.strip()]
+        print(f"Benchmarking {profile.name} over {len(timestamps)} frames...")
+        if detector is not None and detector.initialized:
+            warmup = YouTubeFrameExtractor.encode_frame(np.zeros((64, 64, 3), dtype=np.uint8))
+            detector.detect_objects(warmup, 0.25, profile.yolo_model)
+        results.append(benchmark_profile(profile, args.video, timestamps, detector, pose_estimator, vision_analyzer))
+
+    print()
+    print(f"{'profile':<10} {'frames':>6} {'fps':>7} {'total p50':>10} {'total p95':>10} {'detect p50':>11} {'pose p50':>9} {'payload':>9}")
+    for result in results:
+        stages = result["stages"]
+        total = stages.get("total") or {}
+        detect = stages.get("detect") or {}
+        pose = stages.get("pose") or {}
+        print(
+            f"{result['profile']:<10} {result['frames']:>6} {result['throughput_fps']:>7} "
+            f"{total.get('p50_ms', '-'):>10} {total.get('p95_ms', '-'):>10} "
+            f"{detect.get('p50_ms', '-'):>11} {pose.get('p50_ms', '-'):>9} "
+            f"{str(result['mean_payload_kb']) + 'KB':>9}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
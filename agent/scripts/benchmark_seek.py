@@ -0,0 +1,94 @@
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.video_source import LocalVideoSource
+from services.youtube_extractor import YouTubeFrameExtractor, FAST_SEEK_TOLERANCE
+
+
+def generate_video(path, seconds, gop):
+    subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-y", "-f", "lavfi", "-i", f"testsrc=duration={seconds}:size=1280x720:rate=25",
+         "-c:v", "libx264", "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0", "-pix_fmt", "yuv420p", path],
+        check=True
+    )
+
+
+def summarize(name, latencies, errors):
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    mean_ms = sum(latencies) / len(latencies) * 1000
+    mean_error = sum(errors) / len(errors)
+    print(f"{name:<28} mean {mean_ms:8.1f}ms  p95 {p95 * 1000:8.1f}ms  mean |actual - requested| {mean_error:5.2f}s  max {max(errors):5.2f}s")
+
+
+def run(name, read, timestamps):
+    latencies, errors = [], []
+    for t in timestamps:
+        started = time.perf_counter()
+        frame, actual = read(t)
+        latencies.append(time.perf_counter() - started)
+        if frame is None:
+            print(f"FAIL: {name} returned no frame at {t:.2f}s")
+            sys.exit(1)
+        errors.append(abs(actual - t))
+    summarize(name, latencies, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare exact and fast (keyframe) seek latency on a long-GOP video")
+    parser.add_argument("video", nargs="?", help="Video to seek in (default: generate a 120s test clip with a 10s GOP)")
+    parser.add_argument("--samples", type=int, default=40, help="Random timestamps to seek to")
+    parser.add_argument("--tolerance", type=float, default=FAST_SEEK_TOLERANCE, help="Fast seek tolerance in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if shutil.which("ffmpeg") is None:
+        print("ffmpeg is required for this benchmark")
+        sys.exit(1)
+
+    workdir = tempfile.mkdtemp(prefix="seek-bench-")
+    try:
+        path = args.video
+        if path is None:
+            path = os.path.join(workdir, "long_gop.mp4")
+            generate_video(path, 120, 250)
+
+        source = LocalVideoSource("bench", path)
+        duration = source.duration or 120
+        print(f"{path}: {duration:.0f}s, {len(source.keyframes)} keyframes ({source.index['method']}), tolerance {args.tolerance:g}s")
+
+        rng = random.Random(args.seed)
+        timestamps = [rng.uniform(0, duration - 1) for _ in range(args.samples)]
+        extractor = YouTubeFrameExtractor()
+
+        def reopen():
+            source.close()
+            source._last = None
+
+        def local_exact(t):
+            reopen()
+            return source.read_frame(t)
+
+        def local_fast(t):
+            reopen()
+            return source.read_frame(t, args.tolerance)
+
+        run("local exact", local_exact, timestamps)
+        run("local fast", local_fast, timestamps)
+        run("stream exact (OpenCV)", lambda t: (extractor._read_frame_sync(path, t), t), timestamps)
+        run("stream fast (ffmpeg)", lambda t: extractor._read_keyframe_sync(path, t), timestamps)
+        print(f"Fast seeks that snapped to a keyframe: {source.snapped}/{len(timestamps)}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
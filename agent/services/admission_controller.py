@@ -0,0 +1,108 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any
+import logging
+import math
+import os
+import time
+from services.priority_scheduler import total_waiting
+from services.quality_profiles import current_profile
+
+logger = logging.getLogger(__name__)
+
+
+TIER_VISION = "vision"
+TIER_DETECTIONS = "detections"
+TIER_CAPTIONS = "captions"
+TIER_CACHED = "cached"
+
+TIERS = [TIER_VISION, TIER_DETECTIONS, TIER_CAPTIONS, TIER_CACHED]
+
+
+class AdmissionController:
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        max_queue_depth: Optional[int] = None,
+        latency_target: Optional[float] = None,
+        latency_window: Optional[float] = None
+    ):
+        self.max_in_flight = max_in_flight or int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "8"))
+        self.max_queue_depth = max_queue_depth or int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "16"))
+        self.latency_target = latency_target or float(os.getenv("ADMISSION_LATENCY_TARGET_SECONDS", "6.0"))
+        self.latency_window = latency_window or float(os.getenv("ADMISSION_LATENCY_WINDOW_SECONDS", "30"))
+        self.step = float(os.getenv("ADMISSION_TIER_STEP", "0.5"))
+        self.stale_radius = float(os.getenv("ADMISSION_STALE_RADIUS_SECONDS", "10"))
+        self.downshift_pressure = float(os.getenv("ADMISSION_PROFILE_DOWNSHIFT_PRESSURE", "0.75"))
+        self.downshift_profile = os.getenv("ADMISSION_DOWNSHIFT_PROFILE", "realtime")
+        self.calm_pressure = float(os.getenv("ADMISSION_CALM_PRESSURE", "0.5"))
+        self.enabled = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() != "false"
+
+        self.in_flight = 0
+        self.latencies = deque(maxlen=200)
+        self.tier_counts: Dict[str, int] = {tier: 0 for tier in TIERS}
+        self.last_tier = TIER_VISION
+        self.downshifts = 0
+        self.calm_skips = 0
+
+    def recent_latency(self) -> float:
+        cutoff = time.monotonic() - self.latency_window
+        while self.latencies and self.latencies[0][0] < cutoff:
+            self.latencies.popleft()
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(latency for _, latency in self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+
+    def pressure(self) -> float:
+        return max(
+            self.in_flight / self.max_in_flight,
+            total_waiting() / self.max_queue_depth,
+            self.recent_latency() / self.latency_target
+        )
+
+    def choose_tier(self, calm: bool = False) -> str:
+        if not self.enabled:
+            return TIER_VISION
+        pressure = self.pressure()
+        if pressure <= 1.0:
+            if calm and pressure > self.calm_pressure:
+                return TIER_DETECTIONS
+            return TIER_VISION
+        index = min(len(TIERS) - 1, max(1, math.ceil((pressure - 1.0) / self.step)))
+        return TIERS[index]
+
+    @asynccontextmanager
+    async def admit(self, calm: bool = False):
+        tier = self.choose_tier(calm)
+        if calm and tier != self.choose_tier():
+            self.calm_skips += 1
+        if tier != self.last_tier:
+            logger.info(f"[ADMISSION] Tier {self.last_tier} -> {tier} (pressure {self.pressure():.2f}, in-flight {self.in_flight}, queued {total_waiting()})")
+            self.last_tier = tier
+        if self.enabled and current_profile.get() is None and self.pressure() > self.downshift_pressure:
+            current_profile.set(self.downshift_profile)
+            self.downshifts += 1
+        self.tier_counts[tier] += 1
+        self.in_flight += 1
+        started = time.monotonic()
+        try:
+            yield tier
+        finally:
+            self.in_flight -= 1
+            finished = time.monotonic()
+            self.latencies.append((finished, finished - started))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "in_flight": self.in_flight,
+            "queued": total_waiting(),
+            "p90_latency": round(self.recent_latency(), 3),
+            "pressure": round(self.pressure(), 3),
+            "current_tier": self.choose_tier(),
+            "tier_counts": dict(self.tier_counts),
+            "profile_downshifts": self.downshifts,
+            "calm_vision_skips": self.calm_skips,
+        }
@@ -0,0 +1,102 @@
+from typing import Optional, List, Tuple, Dict, Any
+import asyncio
+import logging
+import os
+from services.analogy_generator import AnalogyGenerator
+from services.deadline import Deadline
+
+logger = logging.getLogger(__name__)
+
+
+class AnalogyBatcher:
+
+    def __init__(
+        self,
+        generator: AnalogyGenerator,
+        window_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None
+    ):
+        self.generator = generator
+        self.window = (window_ms if window_ms is not None else float(os.getenv("ANALOGY_BATCH_WINDOW_MS", "20"))) / 1000.0
+        self.max_batch_size = max_batch_size or int(os.getenv("ANALOGY_BATCH_MAX_SIZE", "8"))
+        self.pending: List[Tuple[str, asyncio.Future]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.batches_sent = 0
+        self.items_batched = 0
+        self.batch_fallbacks = 0
+
+    async def generate(self, commentary: str, deadline: Optional[Deadline] = None) -> str:
+        if self.window <= 0 or not self.generator.client:
+            return await self.generator.generate(commentary, deadline=deadline)
+
+        cache = self.generator.response_cache
+        cached = cache.get(cache.make_key(self.generator.MODEL, self.generator.PROMPT_VERSION, commentary, "nfl"))
+        if cached:
+            return cached
+
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self.pending.append((commentary, future))
+
+        if len(self.pending) >= self.max_batch_size:
+            self._flush_now()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.window, self._flush_now)
+
+        try:
+            if deadline is not None:
+                return await asyncio.wait_for(asyncio.shield(future), timeout=deadline.remaining())
+            return await future
+        except asyncio.TimeoutError:
+            logger.info("[ANALOGY BATCH] Deadline reached before batch returned - using stub")
+            return self.generator._generate_stub_analogy(commentary)
+
+    def _flush_now(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if not self.pending:
+            return
+        batch = self.pending
+        self.pending = []
+        asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        unique: Dict[str, List[asyncio.Future]] = {}
+        for commentary, future in batch:
+            unique.setdefault(commentary, []).append(future)
+        texts = list(unique.keys())
+
+        try:
+            results = None
+            if len(texts) > 1:
+                self.batches_sent += 1
+                self.items_batched += len(texts)
+                logger.info(f"[ANALOGY BATCH] Sending {len(texts)} commentaries in one call ({len(batch)} waiters)")
+                results = await self.generator.generate_batch(texts)
+                if results is None:
+                    self.batch_fallbacks += 1
+                    logger.warning("[ANALOGY BATCH] Batched call failed - falling back to individual calls")
+
+            if results is None:
+                results = await asyncio.gather(*[self.generator.generate(text) for text in texts])
+
+            for text, result in zip(texts, results):
+                for future in unique[text]:
+                    if not future.done():
+                        future.set_result(result)
+        except Exception as e:
+            logger.error(f"[ANALOGY BATCH] Error: {e}")
+            for text, futures in unique.items():
+                for future in futures:
+                    if not future.done():
+                        future.set_result(self.generator._generate_stub_analogy(text))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "batches_sent": self.batches_sent,
+            "items_batched": self.items_batched,
+            "batch_fallbacks": self.batch_fallbacks,
+        }
@@ -1,15 +1,25 @@
 
 import anthropic
+import asyncio
+import json
 import os
-from typing import Optional
+from typing import Optional, List
+from services.circuit_breaker import get_breaker
+from services.deadline import Deadline, stage_timeout
+from services.llm_response_cache import get_llm_cache
+from services.priority_scheduler import get_scheduler
 
 
 class AnalogyGenerator:
     
+    MODEL = "claude-3-haiku-20240307"
+    PROMPT_VERSION = "analogy-v1"
     
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         self.client = None
+        self.breaker = get_breaker("anthropic")
+        self.response_cache = get_llm_cache()
         
         if self.api_key:
             try:
@@ -18,27 +28,106 @@ class AnalogyGenerator:
                 print(f"Warning: Could not initialize Anthropic client: {e}")
                 self.client = None
     
-    async def generate(self, commentary: str) -> str:
+    async def generate(self, commentary: str, deadline: Optional[Deadline] = None) -> str:
         
         if not self.client:
             return self._generate_stub_analogy(commentary)
         
+        cache_key = self.response_cache.make_key(self.MODEL, self.PROMPT_VERSION, commentary, "nfl")
+        cached = self.response_cache.get(cache_key)
+        if cached:
+            return cached
+        
+        if deadline is not None and not deadline.can_run():
+            print("Deadline exhausted - using stub analogy")
+            return self._generate_stub_analogy(commentary)
+        
+        if not self.breaker.allow_request():
+            print("Anthropic circuit open - using stub analogy")
+            return self._generate_stub_analogy(commentary)
+        
         try:
-            message = self.client.messages.create(
-                model="claude-3-haiku-20240307",
+            message = await get_scheduler("llm").run(lambda: self.client.messages.create(
+                model=self.MODEL,
                 max_tokens=150,
+                timeout=stage_timeout(deadline, 600.0),
                 messages=[{
                     "role": "user",
                     "content": f
                 }]
-            )
+            ))
             
-            return message.content[0].text.strip()
+            self.breaker.record_success()
+            analogy = message.content[0].text.strip()
+            self.response_cache.set(cache_key, analogy)
+            return analogy
             
         except Exception as e:
+            if deadline is None or not deadline.expired():
+                self.breaker.record_failure()
             print(f"Analogy generation error: {e}")
             return self._generate_stub_analogy(commentary)
     
+    async def generate_batch(self, commentaries: List[str]) -> Optional[List[str]]:
+        
+        if not self.client or not commentaries:
+            return None
+        
+        if not self.breaker.allow_request():
+            print("Anthropic circuit open - skipping batched analogy call")
+            return None
+        
+        numbered = "\n".join(f"{i + 1}. {text}" for i, text in enumerate(commentaries))
+        prompt = (
+            "You explain soccer to American football fans. For each numbered soccer "
+            "commentary below, write a one or two sentence NFL analogy that explains "
+            "the tactical idea.\n\n"
+            f"{numbered}\n\n"
+            f"Respond with ONLY a JSON array of exactly {len(commentaries)} strings, "
+            "in the same order as the commentaries."
+        )
+        
+        try:
+            message = await get_scheduler("llm").run(
+                lambda: self.client.messages.create(
+                    model=self.MODEL,
+                    max_tokens=150 * len(commentaries),
+                    timeout=30.0,
+                    messages=[{
+                        "role": "user",
+                        "content": prompt
+                    }]
+                )
+            )
+            self.breaker.record_success()
+        except Exception as e:
+            self.breaker.record_failure()
+            print(f"Batched analogy generation error: {e}")
+            return None
+        
+        text = message.content[0].text.strip()
+        try:
+            analogies = json.loads(text[text.index("["):text.rindex("]") + 1])
+        except ValueError as e:
+            print(f"Batched analogy response was not a JSON array: {e}")
+            return None
+        
+        if (
+            not isinstance(analogies, list) or
+            len(analogies) != len(commentaries) or
+            not all(isinstance(a, str) and a.strip() for a in analogies)
+        ):
+            print(f"Batched analogy response had {len(analogies) if isinstance(analogies, list) else 'no'} items, expected {len(commentaries)}")
+            return None
+        
+        analogies = [a.strip() for a in analogies]
+        for commentary, analogy in zip(commentaries, analogies):
+            self.response_cache.set(
+                self.response_cache.make_key(self.MODEL, self.PROMPT_VERSION, commentary, "nfl"),
+                analogy
+            )
+        return analogies
+    
     def _generate_stub_analogy(self, commentary: str) -> str:
         
         import random
@@ -0,0 +1,243 @@
+from typing import Optional, Dict, Any, List, Tuple
+import asyncio
+import logging
+import random
+from services.deadline import Deadline
+from services.sources import SOURCE_QUALITY
+from services.admission_controller import TIER_VISION, TIER_DETECTIONS, TIER_CACHED
+from services.youtube_extractor import SEEK_EXACT
+
+logger = logging.getLogger(__name__)
+
+
+STUB_COMMENTARIES = [
+    "Players are moving into position, creating space for a potential attack.",
+    "The team is building up play from the back, looking for passing options.",
+    "A counter-attack is developing with players sprinting forward.",
+    "Defensive shape is compact, denying space in the central areas.",
+    "The ball is in the final third, with attackers looking for an opening."
+]
+
+
+class AnalysisPipeline:
+
+    SOURCE_QUALITY = SOURCE_QUALITY
+
+    FRAME_TIMEOUT = 5.0
+    VISION_TIMEOUT = 5.0
+    CAPTION_TIMEOUT = 10.0
+    ANALOGY_RESERVE = 1.5
+    EVENTS_BEFORE = 30.0
+    EVENTS_AFTER = 10.0
+
+    def __init__(self, frame_extractor, vision_analyzer, caption_extractor, analogy_generator, api_key: Optional[str] = None, analogy_batcher=None, store=None):
+        self.frame_extractor = frame_extractor
+        self.vision_analyzer = vision_analyzer
+        self.caption_extractor = caption_extractor
+        self.analogy_generator = analogy_generator
+        self.analogy_batcher = analogy_batcher
+        self.api_key = api_key
+        self.store = store
+
+    @staticmethod
+    def cache_key(video_id: str, second: int) -> str:
+        return f"{video_id}:{second}"
+
+    def nearby_events(self, video_id: str, timestamp: float) -> Optional[List[Dict[str, Any]]]:
+        timeline = self.caption_extractor.event_timeline(video_id)
+        if timeline is None:
+            return None
+        return timeline.between(timestamp - self.EVENTS_BEFORE, timestamp + self.EVENTS_AFTER)
+
+    async def analyze(self, video_id: str, timestamp: float, deadline: Deadline, tier: str = TIER_VISION, seek_mode: str = SEEK_EXACT) -> Dict[str, Any]:
+        commentary, source, finished = None, None, {}
+        frame_info: Dict[str, float] = {}
+        if tier != TIER_CACHED:
+            commentary, source, finished = await self._race_sources(video_id, timestamp, deadline, tier, seek_mode, frame_info)
+
+        if not commentary:
+            commentary = random.choice(STUB_COMMENTARIES)
+            source = "stub"
+            logger.info(f"[ANALYZE] Using stub commentary: {commentary}")
+
+        if tier == TIER_CACHED:
+            analogy = self.analogy_generator._generate_stub_analogy(commentary)
+        else:
+            analogy = await self._generate_analogy(commentary, deadline)
+
+        logger.info(f"[ANALYZE] Complete in {deadline.elapsed():.2f}s (tier={tier}, source={source}): {commentary[:50]}...")
+        if self.store is not None:
+            self.store.upsert(
+                video_id,
+                int(timestamp),
+                commentary=commentary if source != "stub" else None,
+                source=source if source != "stub" else None,
+                analogy=analogy if source != "stub" else None,
+                caption=finished.get("captions"),
+                detections=finished.get("detections")
+            )
+        return {
+            "originalCommentary": commentary,
+            "nflAnalogy": analogy,
+            "source": source,
+            "tier": tier,
+            "frameTimestamp": frame_info.get("timestamp"),
+            "frameClock": frame_info.get("clock", "video") if "timestamp" in frame_info else None,
+            "events": self.nearby_events(video_id, timestamp),
+        }
+
+    async def _race_sources(
+        self,
+        video_id: str,
+        timestamp: float,
+        deadline: Deadline,
+        tier: str = TIER_VISION,
+        seek_mode: str = SEEK_EXACT,
+        frame_info: Optional[Dict[str, float]] = None
+    ) -> Tuple[Optional[str], Optional[str], Dict[str, str]]:
+        frame_task = None
+        detect_task = None
+        if tier in (TIER_VISION, TIER_DETECTIONS):
+            frame_task = asyncio.create_task(self._extract_frame(video_id, timestamp, deadline, seek_mode, frame_info))
+            if self.vision_analyzer.use_enhanced and self.vision_analyzer.has_local_detectors():
+                detect_task = asyncio.create_task(self._detect(frame_task))
+
+        tasks: Dict[asyncio.Task, str] = {
+            asyncio.create_task(self._caption_source(video_id, timestamp, deadline)): "captions",
+        }
+        if tier == TIER_VISION and self._vision_available():
+            tasks[asyncio.create_task(self._vision_source(frame_task, detect_task, deadline, video_id, timestamp))] = "vision"
+        if detect_task is not None:
+            tasks[asyncio.create_task(self._detections_source(detect_task))] = "detections"
+
+        best_commentary = None
+        best_source = None
+        finished: Dict[str, str] = {}
+        pending = set(tasks)
+
+        analogy_reserve = min(self.ANALOGY_RESERVE, deadline.budget * 0.25)
+
+        try:
+            while pending:
+                decision_time = deadline.remaining() - analogy_reserve
+                if decision_time <= 0:
+                    logger.info("[ANALYZE] Decision deadline reached - taking best available source")
+                    break
+
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=decision_time,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.info("[ANALYZE] Decision deadline reached - taking best available source")
+                    break
+
+                for task in done:
+                    source = tasks[task]
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.warning(f"[ANALYZE] {source} source failed: {e}")
+                        continue
+                    if not result:
+                        logger.info(f"[ANALYZE] {source} source returned nothing")
+                        continue
+                    finished[source] = result
+                    logger.info(f"[ANALYZE] ✓ {source} source ready after {deadline.elapsed():.2f}s: {result[:50]}...")
+                    if best_source is None or self.SOURCE_QUALITY[source] > self.SOURCE_QUALITY[best_source]:
+                        best_commentary = result
+                        best_source = source
+
+                if best_source is not None:
+                    best_pending = max((self.SOURCE_QUALITY[tasks[t]] for t in pending), default=-1)
+                    if best_pending <= self.SOURCE_QUALITY[best_source]:
+                        break
+        finally:
+            for task in list(tasks) + [t for t in (frame_task, detect_task) if t is not None]:
+                if not task.done():
+                    task.cancel()
+
+        return best_commentary, best_source, finished
+
+    def _vision_available(self) -> bool:
+        if not (self.vision_analyzer.azure_client or self.vision_analyzer.claude_client):
+            logger.info("[ANALYZE] Vision analyzer not initialized (no API key)")
+            return False
+        vision_breaker = self.vision_analyzer.provider_breaker()
+        if vision_breaker and vision_breaker.is_open():
+            logger.info(f"[ANALYZE] Skipping vision - {vision_breaker.name} circuit open")
+            return False
+        return True
+
+    async def _extract_frame(
+        self,
+        video_id: str,
+        timestamp: float,
+        deadline: Deadline,
+        seek_mode: str = SEEK_EXACT,
+        frame_info: Optional[Dict[str, float]] = None
+    ) -> Optional[str]:
+        try:
+            frame, actual = await asyncio.wait_for(
+                self.frame_extractor.extract_frame_at(video_id, timestamp, deadline=deadline, seek_mode=seek_mode, frame_info=frame_info),
+                timeout=deadline.stage_timeout(self.FRAME_TIMEOUT)
+            )
+            if frame and frame_info is not None:
+                frame_info["timestamp"] = actual
+            return frame
+        except asyncio.TimeoutError:
+            logger.warning(f"[ANALYZE] Frame extraction timed out at {timestamp}s")
+            return None
+
+    async def _detect(self, frame_task: asyncio.Task) -> Tuple[Optional[Dict], Optional[Dict]]:
+        frame_base64 = await frame_task
+        if not frame_base64:
+            return None, None
+        return await self.vision_analyzer.detect(frame_base64)
+
+    async def _vision_source(
+        self,
+        frame_task: asyncio.Task,
+        detect_task: Optional[asyncio.Task],
+        deadline: Deadline,
+        video_id: Optional[str] = None,
+        timestamp: float = 0.0
+    ) -> Optional[str]:
+        frame_base64 = await frame_task
+        if not frame_base64 or not deadline.can_run():
+            return None
+        detections = await detect_task if detect_task is not None else None
+        context = None
+        timeline = self.caption_extractor.event_timeline(video_id) if video_id else None
+        if timeline is not None:
+            context = timeline.describe(timestamp, before=self.EVENTS_BEFORE, after=self.EVENTS_AFTER)
+        return await asyncio.wait_for(
+            self.vision_analyzer.analyze_frame(frame_base64, context=context, deadline=deadline, detections=detections, fallback=False),
+            timeout=deadline.stage_timeout(self.VISION_TIMEOUT)
+        )
+
+    async def _detections_source(self, detect_task: asyncio.Task) -> Optional[str]:
+        detection_result, pose_result = await detect_task
+        return self.vision_analyzer.summarize_detections(detection_result, pose_result)
+
+    async def _caption_source(self, video_id: str, timestamp: float, deadline: Deadline) -> Optional[str]:
+        return await asyncio.wait_for(
+            self.caption_extractor.get_caption_at_timestamp(video_id, timestamp, deadline=deadline),
+            timeout=deadline.stage_timeout(self.CAPTION_TIMEOUT)
+        )
+
+    async def _generate_analogy(self, commentary: str, deadline: Deadline) -> str:
+        if not self.api_key:
+            return self.analogy_generator._generate_stub_analogy(commentary)
+        if not deadline.can_run():
+            logger.info("[ANALYZE] Using stub analogy (deadline exhausted)")
+            return self.analogy_generator._generate_stub_analogy(commentary)
+        try:
+            return await asyncio.wait_for(
+                (self.analogy_batcher or self.analogy_generator).generate(commentary, deadline=deadline),
+                timeout=deadline.remaining()
+            )
+        except Exception as e:
+            logger.warning(f"[ANALYZE] Analogy generation error: {e}, using stub")
+            return self.analogy_generator._generate_stub_analogy(commentary)
@@ -0,0 +1,190 @@
+from typing import Optional, Dict, Any, List
+import logging
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from services.sources import SOURCE_QUALITY
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisStore:
+
+    FIELDS = ("commentary", "source", "raw_action", "live_commentary", "detections", "analogy", "caption")
+    RANKED_FIELDS = ("commentary", "source", "analogy")
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.reads = 0
+        self.hits = 0
+        self.writes = 0
+        self.batches = 0
+        self._pending: queue.Queue = queue.Queue()
+        self._readers = threading.local()
+        self.temporary = path == ":memory:"
+        if self.temporary:
+            self.path = self._temporary_path()
+        try:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+        except Exception as e:
+            self.path = self._temporary_path()
+            self.temporary = True
+            logger.error(f"[ANALYSIS STORE] Could not open {path}: {e} - using temporary {self.path}")
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_timeline ("
+            "video_id TEXT NOT NULL, second INTEGER NOT NULL, "
+            "commentary TEXT, source TEXT, raw_action TEXT, live_commentary TEXT, "
+            "detections TEXT, analogy TEXT, caption TEXT, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (video_id, second))"
+        )
+        self._db.commit()
+        self._writer = threading.Thread(target=self._write_loop, name="analysis-store-writer", daemon=True)
+        self._writer.start()
+        logger.info(f"[ANALYSIS STORE] Using {self.path}")
+
+    @staticmethod
+    def _temporary_path() -> str:
+        fd, path = tempfile.mkstemp(prefix="analysis-store-", suffix=".db")
+        os.close(fd)
+        return path
+
+    def _reader(self) -> sqlite3.Connection:
+        db = getattr(self._readers, "db", None)
+        if db is None:
+            db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            self._readers.db = db
+        return db
+
+    def get(self, video_id: str, second: int) -> Optional[Dict[str, Any]]:
+        row = self._reader().execute(
+            "SELECT * FROM analysis_timeline WHERE video_id = ? AND second = ?",
+            (video_id, int(second))
+        ).fetchone()
+        return dict(row) if row else None
+
+    def range(self, video_id: str, start: float, end: float, require: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM analysis_timeline WHERE video_id = ? AND second BETWEEN ? AND ?"
+        if require:
+            self._check_field(require)
+            query += f" AND {require} IS NOT NULL"
+        rows = self._reader().execute(query + " ORDER BY second", (video_id, int(start), int(end))).fetchall()
+        return [dict(row) for row in rows]
+
+    def nearest(self, video_id: str, timestamp: float, require: str = "commentary", max_distance: float = 2.0) -> Optional[Dict[str, Any]]:
+        self._check_field(require)
+        target = int(round(timestamp))
+        self.reads += 1
+        row = self._reader().execute(
+            f"SELECT * FROM analysis_timeline WHERE video_id = ? AND second BETWEEN ? AND ? "
+            f"AND {require} IS NOT NULL ORDER BY ABS(second - ?), second LIMIT 1",
+            (video_id, target - int(max_distance), target + int(max_distance), target)
+        ).fetchone()
+        if row:
+            self.hits += 1
+        return dict(row) if row else None
+
+    def upsert(self, video_id: str, second: int, **fields):
+        for name in fields:
+            self._check_field(name)
+        self._pending.put((video_id, int(second), fields))
+
+    def flush(self):
+        self._pending.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._pending.put(None)
+            self._writer.join()
+        if self.temporary:
+            self._db.close()
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.path + suffix)
+                except FileNotFoundError:
+                    pass
+
+    def _write_loop(self):
+        while True:
+            batch = [self._pending.get()]
+            while True:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            writes = [item for item in batch if item is not None]
+            try:
+                for video_id, second, fields in writes:
+                    self._write(video_id, second, fields)
+                self._db.commit()
+                self.batches += 1
+            except Exception as e:
+                logger.warning(f"[ANALYSIS STORE] Commit failed for {len(writes)} writes: {e}")
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+            if len(writes) < len(batch):
+                return
+
+    def _write(self, video_id: str, second: int, fields: Dict[str, Any]):
+        row = self._db.execute(
+            "SELECT * FROM analysis_timeline WHERE video_id = ? AND second = ?", (video_id, second)
+        ).fetchone()
+        merged = dict(row) if row else {name: None for name in self.FIELDS}
+
+        if fields.get("commentary") and not self._outranks(fields.get("source"), merged.get("source")):
+            fields = {k: v for k, v in fields.items() if k not in self.RANKED_FIELDS}
+        for name, value in fields.items():
+            if value is not None:
+                merged[name] = value
+
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO analysis_timeline (video_id, second, "
+                + ", ".join(self.FIELDS) + ", updated_at) VALUES (?, ?, "
+                + ", ".join("?" for _ in self.FIELDS) + ", ?)",
+                (video_id, second, *[merged.get(name) for name in self.FIELDS], time.time())
+            )
+            self.writes += 1
+        except Exception as e:
+            logger.warning(f"[ANALYSIS STORE] Write failed for {video_id}@{second}: {e}")
+
+    def _outranks(self, new_source: Optional[str], old_source: Optional[str]) -> bool:
+        return SOURCE_QUALITY.get(new_source or "", 0) >= SOURCE_QUALITY.get(old_source or "", -1)
+
+    def _check_field(self, name: str):
+        if name not in self.FIELDS:
+            raise ValueError(f"Unknown analysis field: {name}")
+
+    def stats(self) -> Dict[str, Any]:
+        rows, videos = self._reader().execute(
+            "SELECT COUNT(*), COUNT(DISTINCT video_id) FROM analysis_timeline"
+        ).fetchone()
+        return {
+            "path": self.path,
+            "rows": rows,
+            "videos": videos,
+            "reads": self.reads,
+            "hits": self.hits,
+            "writes": self.writes,
+            "batches": self.batches,
+            "pending_writes": self._pending.qsize(),
+        }
+
+
+_analysis_store: Optional[AnalysisStore] = None
+
+
+def get_analysis_store() -> AnalysisStore:
+    global _analysis_store
+    if _analysis_store is None:
+        _analysis_store = AnalysisStore(os.getenv("ANALYSIS_STORE_PATH", "analysis_store.db"))
+    return _analysis_store
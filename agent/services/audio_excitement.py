@@ -0,0 +1,235 @@
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, List
+import asyncio
+import logging
+import os
+import time
+import numpy as np
+from services.audio_extractor import AudioExtractor
+from services.live_ingest import get_live_ingest
+from services.priority_scheduler import current_priority, BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+
+SAMPLE_RATE = 8000
+FRAMES_PER_SECOND = 20
+
+
+def excitement_features(pcm: np.ndarray, sample_rate: int = SAMPLE_RATE) -> Tuple[np.ndarray, np.ndarray]:
+    seconds = len(pcm) // sample_rate
+    if seconds == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+    frame_length = sample_rate // FRAMES_PER_SECOND
+    frames = pcm[:seconds * FRAMES_PER_SECOND * frame_length].astype(np.float32)
+    frames = frames.reshape(seconds * FRAMES_PER_SECOND, frame_length) / 32768.0
+
+    energy = np.mean(frames * frames, axis=1)
+    rms_db = 10 * np.log10(energy.reshape(seconds, FRAMES_PER_SECOND).mean(axis=1) + 1e-10)
+
+    spectrum = np.log1p(np.abs(np.fft.rfft(frames * np.hanning(frame_length), axis=1)))
+    flux = np.maximum(np.diff(spectrum, axis=0, prepend=spectrum[:1]), 0).sum(axis=1)
+    flux = flux.reshape(seconds, FRAMES_PER_SECOND).mean(axis=1)
+    return rms_db.astype(np.float32), flux.astype(np.float32)
+
+
+def _robust_z(values: np.ndarray) -> np.ndarray:
+    known = values[~np.isnan(values)]
+    median = np.median(known)
+    spread = np.median(np.abs(known - median)) * 1.4826 + 1e-6
+    return (values - median) / spread
+
+
+class ExcitementCurve:
+
+    def __init__(self, video_id: str):
+        self.video_id = video_id
+        self.rms_db = np.zeros(0, dtype=np.float32)
+        self.flux = np.zeros(0, dtype=np.float32)
+        self.complete = False
+        self.updated_at = time.time()
+        self._scores: Optional[np.ndarray] = None
+
+    @property
+    def covered_seconds(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self.rms_db)))
+
+    def add(self, start_second: int, rms_db: np.ndarray, flux: np.ndarray):
+        end = start_second + len(rms_db)
+        if end > len(self.rms_db):
+            grow = np.full(end - len(self.rms_db), np.nan, dtype=np.float32)
+            self.rms_db = np.concatenate([self.rms_db, grow])
+            self.flux = np.concatenate([self.flux, grow])
+        self.rms_db[start_second:end] = rms_db
+        self.flux[start_second:end] = flux
+        self.updated_at = time.time()
+        self._scores = None
+
+    def scores(self) -> np.ndarray:
+        if self._scores is None:
+            if self.covered_seconds == 0:
+                return np.zeros(0, dtype=np.float32)
+            z = 0.5 * _robust_z(self.rms_db) + 0.5 * _robust_z(self.flux)
+            unknown = np.isnan(z)
+            smoothed = np.convolve(np.where(unknown, 0.0, z), [0.25, 0.5, 0.25], mode="same")
+            scores = 1.0 / (1.0 + np.exp(-(smoothed - 1.5)))
+            scores[unknown] = np.nan
+            self._scores = scores.astype(np.float32)
+        return self._scores
+
+    def at(self, timestamp: float) -> Optional[float]:
+        scores = self.scores()
+        second = int(timestamp)
+        if second < 0 or second >= len(scores) or np.isnan(scores[second]):
+            return None
+        return float(scores[second])
+
+    def points(self, start: float, end: float) -> List[Tuple[int, float]]:
+        scores = self.scores()
+        first, last = max(0, int(start)), min(len(scores), int(end) + 1)
+        return [(second, float(scores[second])) for second in range(first, last) if not np.isnan(scores[second])]
+
+    def peak(self, start: float, end: float) -> Optional[Tuple[int, float]]:
+        scores = self.scores()
+        first, last = max(0, int(start)), min(len(scores), int(end) + 1)
+        if first >= last:
+            return None
+        window = scores[first:last]
+        if np.all(np.isnan(window)):
+            return None
+        index = int(np.nanargmax(window))
+        return first + index, float(window[index])
+
+
+class AudioExcitementDetector:
+
+    def __init__(self, audio_extractor: Optional[AudioExtractor] = None):
+        self.audio_extractor = audio_extractor or AudioExtractor()
+        self.enabled = os.getenv("AUDIO_EXCITEMENT_ENABLED", "true").lower() != "false"
+        self.threshold = float(os.getenv("AUDIO_EXCITEMENT_THRESHOLD", "0.7"))
+        self.chunk_seconds = int(os.getenv("AUDIO_EXCITEMENT_CHUNK_SECONDS", "30"))
+        self.max_videos = int(os.getenv("AUDIO_EXCITEMENT_MAX_VIDEOS", "64"))
+        self.semaphore = asyncio.Semaphore(int(os.getenv("AUDIO_EXCITEMENT_CONCURRENCY", "1")))
+
+        self.curves: "OrderedDict[str, ExcitementCurve]" = OrderedDict()
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.failed: Dict[str, float] = {}
+        self.analyzed_seconds = 0
+
+    def curve(self, video_id: str) -> Optional[ExcitementCurve]:
+        curve = self.curves.get(video_id)
+        if curve is not None:
+            self.curves.move_to_end(video_id)
+        return curve
+
+    def at(self, video_id: str, timestamp: float) -> Optional[float]:
+        curve = self.curve(video_id)
+        return curve.at(timestamp) if curve is not None else None
+
+    def peak(self, video_id: str, start: float, end: float) -> Optional[Tuple[int, float]]:
+        curve = self.curve(video_id)
+        return curve.peak(start, end) if curve is not None else None
+
+    def is_calm(self, video_id: str, start: float, end: float) -> bool:
+        peak = self.peak(video_id, start, end)
+        return peak is not None and peak[1] < self.threshold
+
+    def ensure(self, video_id: str):
+        if not self.enabled or video_id in self.tasks or get_live_ingest().is_live(video_id):
+            return
+        curve = self.curves.get(video_id)
+        if curve is not None and curve.complete:
+            return
+        if time.time() - self.failed.get(video_id, 0) < 3600:
+            return
+        self.tasks[video_id] = asyncio.create_task(self._analyze_match(video_id))
+
+    async def _analyze_match(self, video_id: str):
+        current_priority.set(BACKGROUND)
+        try:
+            async with self.semaphore:
+                started = time.monotonic()
+                curve = await self.analyze(video_id)
+                if curve.covered_seconds == 0:
+                    self.failed[video_id] = time.time()
+                    return
+                if not get_live_ingest().is_live(video_id):
+                    curve.complete = True
+                logger.info(f"[EXCITEMENT] {video_id}: {curve.covered_seconds}s of audio analyzed in {time.monotonic() - started:.1f}s")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed[video_id] = time.time()
+            logger.warning(f"[EXCITEMENT] Audio analysis failed for {video_id}: {e}")
+        finally:
+            self.tasks.pop(video_id, None)
+
+    async def analyze(self, video_id: str, start: float = 0.0, end: Optional[float] = None) -> ExcitementCurve:
+        curve = self.curves.get(video_id)
+        if curve is None:
+            curve = ExcitementCurve(video_id)
+            self.curves[video_id] = curve
+            while len(self.curves) > self.max_videos:
+                self.curves.popitem(last=False)
+
+        bytes_per_second = SAMPLE_RATE * 2
+        chunk_bytes = self.chunk_seconds * bytes_per_second
+        second = int(start)
+        pending = bytearray()
+
+        def flush(whole_seconds: int):
+            nonlocal second
+            pcm = np.frombuffer(bytes(pending[:whole_seconds * bytes_per_second]), dtype=np.int16)
+            del pending[:whole_seconds * bytes_per_second]
+            rms_db, flux = excitement_features(pcm)
+            curve.add(second, rms_db, flux)
+            second += len(rms_db)
+            self.analyzed_seconds += len(rms_db)
+
+        audio = self.audio_extractor.stream_audio_segment(
+            video_id, int(start), end, sample_rate=SAMPLE_RATE, audio_format="s16le"
+        )
+        try:
+            async for chunk in audio:
+                pending.extend(chunk)
+                if len(pending) >= chunk_bytes:
+                    flush(len(pending) // bytes_per_second)
+                    if end is None and get_live_ingest().is_live(video_id):
+                        logger.info(f"[EXCITEMENT] {video_id} is live - stopping whole-match audio analysis")
+                        break
+            if len(pending) >= bytes_per_second:
+                flush(len(pending) // bytes_per_second)
+        finally:
+            await audio.aclose()
+        return curve
+
+    async def stop(self):
+        for task in list(self.tasks.values()):
+            task.cancel()
+        for task in list(self.tasks.values()):
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "videos": {
+                video_id: {"seconds": curve.covered_seconds, "complete": curve.complete}
+                for video_id, curve in list(self.curves.items())
+            },
+            "analyzing": list(self.tasks),
+            "analyzed_seconds": self.analyzed_seconds,
+        }
+
+
+_excitement_detector: Optional[AudioExcitementDetector] = None
+
+
+def get_excitement_detector() -> AudioExcitementDetector:
+    global _excitement_detector
+    if _excitement_detector is None:
+        _excitement_detector = AudioExcitementDetector()
+    return _excitement_detector
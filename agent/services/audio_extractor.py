@@ -1,169 +1,197 @@
 
-import yt_dlp
 import asyncio
-import subprocess
 import os
-import tempfile
-from typing import Optional, Dict, Any
+import threading
+import time
+from typing import Optional, AsyncIterator, Dict, Any, Union, Tuple
 import logging
 import httpx
-import base64
+import yt_dlp
+from services.circuit_breaker import get_breaker
+from services.priority_scheduler import get_scheduler
+from services.video_source import get_video_library
+from services.youtube_extractor import STREAM_URL_TTL
 
 logger = logging.getLogger(__name__)
 
 
+_audio_urls: Dict[str, Tuple[float, str]] = {}
+_audio_urls_lock = threading.Lock()
+
+
 class AudioExtractor:
-    
-    
+
+    CHUNK_BYTES = 32000
+
     def __init__(self):
         self.ydl_opts = {
-            'format': 'worstaudio/worst',
+            'format': os.getenv("AUDIO_FORMAT", "worstaudio/bestaudio/worst"),
             'quiet': True,
             'no_warnings': True,
             'extract_flat': False,
         }
+        self.breaker = get_breaker("youtube_audio")
 
         self.azure_speech_key = os.getenv("AZURE_SPEECH_KEY")
         self.azure_speech_region = os.getenv("AZURE_SPEECH_REGION", "northcentralus")
-        self.azure_speech_endpoint = f"https://{self.azure_speech_region}.stt.speech.microsoft.com/speech/recognition/conversation/cognitiveservices/v1"
-    
-    def _get_video_url(self, video_url_or_id: str) -> str:
-        
-        if video_url_or_id.startswith('http://') or video_url_or_id.startswith('https://'):
-            return video_url_or_id
-        return f"https://www.youtube.com/watch?v={video_url_or_id}"
-    
-    async def extract_audio_segment(self, video_url_or_id: str, start_time: float, end_time: float) -> Optional[str]:
-        
-        try:
-            video_url = self._get_video_url(video_url_or_id)
-            duration = end_time - start_time
-            
-
-            temp_audio = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            temp_audio_path = temp_audio.name
-            temp_audio.close()
-            
-
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                self._extract_audio_sync,
-                video_url,
-                start_time,
-                duration,
-                temp_audio_path
-            )
-            
-            return temp_audio_path
-            
-        except Exception as e:
-            logger.error(f"Audio extraction error: {e}")
-            return None
-    
-    def _extract_audio_sync(self, video_url: str, start_time: float, duration: float, output_path: str):
-        
+        self.azure_speech_endpoint = os.getenv("AZURE_SPEECH_ENDPOINT") or f"https://{self.azure_speech_region}.stt.speech.microsoft.com/speech/recognition/conversation/cognitiveservices/v1"
+
+    async def stream_audio_segment(
+        self,
+        video_url_or_id: str,
+        start_time: float,
+        end_time: Optional[float],
+        sample_rate: int = 16000,
+        audio_format: str = 'wav',
+        status: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[bytes]:
+
+        stream_url = await get_scheduler("resolve").run(self.resolve_audio_url, video_url_or_id)
+        if not stream_url:
+            logger.error(f"Failed to get stream URL for audio extraction")
+            return
+
+        duration = ['-t', str(end_time - start_time)] if end_time is not None else []
+        cmd = [
+            'ffmpeg',
+            '-hide_banner',
+            '-loglevel', 'error',
+            '-ss', str(start_time),
+            '-i', stream_url,
+            *duration,
+            '-vn',
+            '-acodec', 'pcm_s16le',
+            '-ar', str(sample_rate),
+            '-ac', '1',
+            '-f', audio_format,
+            'pipe:1'
+        ]
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        streamed = 0
         try:
+            while True:
+                chunk = await process.stdout.read(self.CHUNK_BYTES)
+                if not chunk:
+                    break
+                streamed += len(chunk)
+                yield chunk
+
+            stderr = await process.stderr.read()
+            if await process.wait() != 0:
+                logger.error(f"FFmpeg error: {stderr.decode(errors='ignore')[-300:]}")
+            else:
+                if status is not None:
+                    status["complete"] = True
+                logger.info(f"Streamed audio segment: {start_time}s to {f'{end_time}s' if end_time is not None else 'end'} ({streamed} bytes)")
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+    def resolve_audio_url(self, video_url_or_id: str) -> Optional[str]:
+
+        local_source = get_video_library().resolve(video_url_or_id)
+        if local_source is not None:
+            return local_source.path
+
+        with _audio_urls_lock:
+            cached = _audio_urls.get(video_url_or_id)
+        if cached is not None and time.monotonic() - cached[0] < STREAM_URL_TTL:
+            return cached[1]
 
+        if video_url_or_id.startswith('http://') or video_url_or_id.startswith('https://'):
+            video_url = video_url_or_id
+        else:
+            video_url = f"https://www.youtube.com/watch?v={video_url_or_id}"
+
+        try:
             with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
                 info = ydl.extract_info(video_url, download=False)
-                if not info or 'url' not in info:
-                    logger.error(f"Failed to get stream URL for audio extraction")
-                    return None
-                stream_url = info['url']
-            
-
-
-            cmd = [
-                'ffmpeg',
-                '-ss', str(start_time),
-                '-i', stream_url,
-                '-t', str(duration),
-                '-vn',
-                '-acodec', 'pcm_s16le',
-                '-ar', '16000',
-                '-ac', '1',
-                '-y',
-                output_path
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                timeout=30,
-                check=False
-            )
-            
-            if result.returncode != 0:
-                logger.error(f"FFmpeg error: {result.stderr.decode()}")
-                return None
-            
-            logger.info(f"Extracted audio segment: {start_time}s to {start_time + duration}s")
-            return output_path
-            
+            self.breaker.record_success()
         except Exception as e:
-            logger.error(f"Sync audio extraction error: {e}")
+            self.breaker.record_failure()
+            logger.error(f"yt-dlp audio extraction error: {e}")
+            return None
+        if not info or not info.get('url'):
+            logger.error(f"Failed to get audio URL for {video_url[:50]}...")
             return None
-    
-    async def transcribe_audio(self, audio_file_path: str, language: str = "en-US") -> Optional[str]:
-        
+        audio_url = info['url']
+        if not info.get('is_live'):
+            now = time.monotonic()
+            with _audio_urls_lock:
+                if len(_audio_urls) >= 1024:
+                    for key in [k for k, (resolved_at, _) in _audio_urls.items() if now - resolved_at >= STREAM_URL_TTL]:
+                        del _audio_urls[key]
+                _audio_urls[video_url_or_id] = (now, audio_url)
+        logger.info(f"Resolved audio-only stream ({info.get('format_id', 'unknown')}) for {video_url_or_id}")
+        return audio_url
+
+    async def transcribe_audio(self, audio: AsyncIterator[bytes], language: str = "en-US") -> Optional[str]:
+
+        result = await self.recognize(audio, language)
+        if result is None:
+            return None
+        if result.get('RecognitionStatus') != 'Success':
+            logger.warning(f"Speech recognition failed: {result.get('RecognitionStatus')}")
+            return None
+        transcript = result.get('DisplayText', '')
+        logger.info(f"Audio transcribed: {transcript[:60]}...")
+        return transcript
+
+    async def recognize(
+        self,
+        audio: Union[bytes, AsyncIterator[bytes]],
+        language: str = "en-US",
+        client: Optional[httpx.AsyncClient] = None
+    ) -> Optional[Dict[str, Any]]:
+
         if not self.azure_speech_key:
             logger.warning("Azure Speech key not set, skipping audio transcription")
             return None
-        
+
+        headers = {
+            'Ocp-Apim-Subscription-Key': self.azure_speech_key,
+            'Content-Type': 'audio/wav; codecs=audio/pcm; samplerate=16000',
+        }
+
+        params = {
+            'language': language,
+            'format': 'detailed',
+        }
+
         try:
+            if client is None:
+                async with httpx.AsyncClient(timeout=30.0) as own_client:
+                    response = await own_client.post(self.azure_speech_endpoint, headers=headers, params=params, content=audio)
+            else:
+                response = await client.post(self.azure_speech_endpoint, headers=headers, params=params, content=audio)
+
+            if response.status_code != 200:
+                logger.error(f"Azure Speech API error: {response.status_code} - {response.text}")
+                return None
+            result = response.json()
+            if result.get('RecognitionStatus') == 'Error':
+                logger.warning(f"Speech recognition failed: {result.get('RecognitionStatus')}")
+                return None
+            return result
 
-            with open(audio_file_path, 'rb') as f:
-                audio_data = f.read()
-            
-
-            headers = {
-                'Ocp-Apim-Subscription-Key': self.azure_speech_key,
-                'Content-Type': 'audio/wav; codec=audio/pcm; samplerate=16000',
-            }
-            
-            params = {
-                'language': language,
-                'format': 'detailed',
-            }
-            
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.azure_speech_endpoint,
-                    headers=headers,
-                    params=params,
-                    content=audio_data
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get('RecognitionStatus') == 'Success':
-                        transcript = result.get('DisplayText', '')
-                        logger.info(f"Audio transcribed: {transcript[:60]}...")
-                        return transcript
-                    else:
-                        logger.warning(f"Speech recognition failed: {result.get('RecognitionStatus')}")
-                        return None
-                else:
-                    logger.error(f"Azure Speech API error: {response.status_code} - {response.text}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Audio transcription error: {e}")
             return None
-        finally:
 
-            try:
-                if os.path.exists(audio_file_path):
-                    os.unlink(audio_file_path)
-            except:
-                pass
-    
     async def extract_and_transcribe(self, video_url_or_id: str, start_time: float, end_time: float) -> Optional[str]:
-        
-        audio_path = await self.extract_audio_segment(video_url_or_id, start_time, end_time)
-        if not audio_path:
+
+        if not self.azure_speech_key:
+            logger.warning("Azure Speech key not set, skipping audio transcription")
             return None
-        
-        transcript = await self.transcribe_audio(audio_path)
-        return transcript
+
+        from services.transcription_pipeline import get_transcription_pipeline
+
+        segments = await get_transcription_pipeline().transcribe(video_url_or_id, start_time, end_time)
+        transcript = " ".join(segment['text'] for segment in segments)
+        return transcript or None
@@ -3,6 +3,11 @@ import yt_dlp
 import asyncio
 from typing import Optional, List, Dict
 import logging
+from services.caption_index import CaptionIndex
+from services.circuit_breaker import get_breaker
+from services.event_timeline import EventTimeline
+from services.deadline import Deadline, stage_timeout
+from services.priority_scheduler import get_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +17,8 @@ class YouTubeCaptionExtractor:
     
     def __init__(self):
         self.caption_cache: Dict[str, List[Dict]] = {}
+        self.caption_indexes: Dict[str, CaptionIndex] = {}
+        self.event_timelines: Dict[str, EventTimeline] = {}
         self.ydl_opts = {
             'quiet': True,
             'no_warnings': True,
@@ -19,6 +26,7 @@ class YouTubeCaptionExtractor:
             'writesubtitles': True,
             'writeautomaticsub': True,
         }
+        self.breaker = get_breaker("youtube_captions")
     
     def _get_cache_key(self, video_url_or_id: str) -> str:
         
@@ -27,11 +35,11 @@ class YouTubeCaptionExtractor:
 
         return f"https://www.youtube.com/watch?v={video_url_or_id}"
     
-    async def get_caption_at_timestamp(self, video_url_or_id: str, timestamp: float) -> Optional[str]:
+    async def get_caption_at_timestamp(self, video_url_or_id: str, timestamp: float, deadline: Optional[Deadline] = None) -> Optional[str]:
         
         try:
 
-            captions = await self.fetch_captions(video_url_or_id)
+            captions = await self.fetch_captions(video_url_or_id, deadline=deadline)
             
             if not captions:
                 return None
@@ -92,7 +100,32 @@ class YouTubeCaptionExtractor:
             logger.error(f"Error getting captions in range: {e}")
             return []
     
-    async def fetch_captions(self, video_url_or_id: str) -> List[Dict]:
+    async def get_caption_index(self, video_url_or_id: str, deadline: Optional[Deadline] = None) -> Optional[CaptionIndex]:
+        
+        cache_key = self._get_cache_key(video_url_or_id)
+        index = self.caption_indexes.get(cache_key)
+        if index is not None:
+            return index
+        
+        captions = await self.fetch_captions(video_url_or_id, deadline=deadline)
+        if not captions:
+            return None
+        
+        index = CaptionIndex(captions)
+        self.caption_indexes[cache_key] = index
+        logger.info(f"Indexed {len(index)} captions ({len(index.postings)} terms) for {cache_key} in {index.build_ms:.1f}ms")
+        return index
+    
+    def event_timeline(self, video_url_or_id: str) -> Optional[EventTimeline]:
+        
+        return self.event_timelines.get(self._get_cache_key(video_url_or_id))
+    
+    async def get_event_timeline(self, video_url_or_id: str, deadline: Optional[Deadline] = None) -> Optional[EventTimeline]:
+        
+        await self.fetch_captions(video_url_or_id, deadline=deadline)
+        return self.event_timeline(video_url_or_id)
+    
+    async def fetch_captions(self, video_url_or_id: str, deadline: Optional[Deadline] = None) -> List[Dict]:
         
         cache_key = self._get_cache_key(video_url_or_id)
         
@@ -101,28 +134,40 @@ class YouTubeCaptionExtractor:
             logger.info(f"Using cached captions for {cache_key}")
             return self.caption_cache[cache_key]
         
+        if deadline is not None and not deadline.can_run():
+            logger.info(f"Deadline exhausted - skipping caption fetch for {video_url_or_id}")
+            return []
+        
+        if not self.breaker.allow_request():
+            logger.info(f"YouTube circuit open - skipping caption fetch for {video_url_or_id}")
+            return []
+        
         try:
 
-            loop = asyncio.get_event_loop()
             captions = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
-                    self._fetch_captions_sync,
-                    video_url_or_id
-                ),
-                timeout=15.0
+                get_scheduler("resolve").run(self._fetch_captions_sync, video_url_or_id),
+                timeout=stage_timeout(deadline, 15.0)
             )
             
 
             if captions:
+                self.breaker.record_success()
                 self.caption_cache[cache_key] = captions
                 logger.info(f"Cached {len(captions)} captions for {cache_key}")
+                timeline = EventTimeline.build(captions)
+                self.event_timelines[cache_key] = timeline
+                logger.info(f"Built event timeline for {cache_key}: {len(timeline)} events in {timeline.build_ms:.1f}ms")
             
             return captions or []
             
         except asyncio.TimeoutError:
+            if deadline is None or not deadline.expired():
+                self.breaker.record_failure()
             logger.warning(f"Caption fetch timeout for {video_url_or_id}")
             return []
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
         except Exception as e:
             logger.error(f"Error fetching captions: {e}")
             return []
@@ -311,6 +356,7 @@ class YouTubeCaptionExtractor:
                 return captions
                 
         except Exception as e:
+            self.breaker.record_failure()
             logger.error(f"Sync caption fetch error: {e}")
             return []
     
@@ -0,0 +1,159 @@
+from bisect import bisect_left
+from typing import Optional, Dict, Any, List, Tuple
+import os
+import re
+import time
+
+
+CLUSTER_SECONDS = float(os.getenv("CAPTION_INDEX_CLUSTER_SECONDS", "30"))
+NEIGHBOR_CUES = int(os.getenv("CAPTION_INDEX_NEIGHBOR_CUES", "1"))
+
+SYNONYMS = {
+    "goal": ["goal", "goals", "score", "scores", "scored", "scoring", "scorer", "net", "nets", "netted",
+             "equaliser", "equalizer", "equalises", "equalizes", "equalised", "equalized", "opener", "brace", "hattrick"],
+    "penalty": ["penalty", "penalties", "pen", "pens", "spotkick"],
+    "shot": ["shot", "shots", "shoot", "shoots", "strike", "strikes", "struck", "effort", "fires", "fired", "volley", "volleys"],
+    "header": ["header", "headers", "headed", "heads"],
+    "save": ["save", "saves", "saved", "stop", "stops", "stopped", "denied", "denies", "parried", "parries", "tipped"],
+    "card": ["card", "cards", "booked", "booking", "bookings", "caution", "cautioned"],
+    "sendoff": ["sentoff", "sendingoff", "dismissed", "dismissal"],
+    "foul": ["foul", "fouls", "fouled", "trip", "tripped", "tackle", "tackles", "tackled"],
+    "substitution": ["substitution", "substitutions", "substitute", "substitutes", "substituted", "sub", "subs", "replaced", "replaces"],
+    "corner": ["corner", "corners"],
+    "freekick": ["freekick", "freekicks"],
+    "offside": ["offside", "offsides"],
+    "var": ["var", "review", "reviewed", "overturned"],
+    "woodwork": ["post", "crossbar", "bar", "woodwork", "upright"],
+    "miss": ["miss", "misses", "missed", "wide"],
+    "owngoal": ["owngoal", "owngoals"],
+    "injury": ["injury", "injured", "injuries", "stretcher"],
+    "celebrate": ["celebrate", "celebrates", "celebrated", "celebration", "celebrations", "celebrating"],
+    "kickoff": ["kickoff"],
+    "halftime": ["halftime"],
+    "fulltime": ["fulltime"],
+}
+
+COMPOUNDS = {
+    ("free", "kick"): "freekick",
+    ("free", "kicks"): "freekick",
+    ("spot", "kick"): "spotkick",
+    ("own", "goal"): "owngoal",
+    ("sent", "off"): "sentoff",
+    ("sending", "off"): "sendingoff",
+    ("kick", "off"): "kickoff",
+    ("half", "time"): "halftime",
+    ("full", "time"): "fulltime",
+    ("hat", "trick"): "hattrick",
+    ("final", "whistle"): "fulltime",
+    ("first", "half"): "firsthalf",
+    ("second", "half"): "secondhalf",
+}
+
+ORDINALS = {"first": 0, "opening": 0, "1st": 0, "second": 1, "2nd": 1, "third": 2, "3rd": 2,
+            "fourth": 3, "4th": 3, "fifth": 4, "5th": 4, "last": -1, "latest": -1, "final": -1}
+
+QUERY_INTENT = re.compile(
+    r"^\W*(?:(?:so|and|but|ok|okay|hey|please|can\s+you|could\s+you|i\s+want\s+to|let\s+me|let's)\W+)*"
+    r"(?:when|what\s+time|what\s+minute|which\s+minute|show\s+me|take\s+me|jump\s+to|go\s+to|skip\s+to|find|see|watch"
+    r"|where(?:'s|\s+is|\s+was))\b"
+)
+
+STOPWORDS = {
+    "a", "about", "after", "amazing", "an", "and", "any", "are", "at", "be", "best", "big", "brilliant", "by",
+    "came", "can", "come", "could", "did", "do", "does", "find", "for", "from", "game", "get", "go", "goalie",
+    "goalkeeper", "good", "got", "great", "had", "happen", "happened", "happening", "happens", "has", "have", "he",
+    "her", "his", "how", "huge", "i", "in", "incredible", "is", "it", "jump", "keeper", "let", "lets", "made",
+    "make", "match", "me", "minute", "moment", "nice", "of", "on", "one", "part", "please", "really", "ref",
+    "referee", "see", "she", "show", "skip", "take", "that", "the", "their", "them", "there", "they", "this",
+    "time", "to", "very", "video", "was", "watch", "we", "were", "what", "when", "where", "which", "who", "will",
+    "with", "would", "you",
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:['’-][a-z0-9]+)*")
+_POSSESSIVE = re.compile(r"['’]s$")
+_PUNCTUATION = re.compile(r"['’-]")
+_CANONICAL = {term: concept for concept, terms in SYNONYMS.items() for term in terms}
+
+
+def tokenize(text: str) -> List[str]:
+    words = []
+    for token in _TOKEN.findall(text.lower()):
+        if not token.isalnum():
+            token = _PUNCTUATION.sub("", _POSSESSIVE.sub("", token))
+        words.append(token)
+
+    terms = []
+    i = 0
+    while i < len(words):
+        compound = COMPOUNDS.get(tuple(words[i:i + 2]))
+        if compound:
+            terms.append(_CANONICAL.get(compound, compound))
+            i += 2
+            continue
+        terms.append(_CANONICAL.get(words[i], words[i]))
+        i += 1
+    return terms
+
+
+def parse_event_query(message: str) -> Optional[Tuple[List[str], Optional[int]]]:
+    lowered = message.lower()
+    if not QUERY_INTENT.search(lowered):
+        return None
+    ordinal = None
+    terms = []
+    for term in tokenize(lowered):
+        if term in ORDINALS and ordinal is None:
+            ordinal = ORDINALS[term]
+        elif term not in STOPWORDS and term not in ORDINALS and not term.isdigit() and term not in terms:
+            terms.append(term)
+    if not any(term in SYNONYMS for term in terms):
+        return None
+    return terms, ordinal
+
+
+class CaptionIndex:
+
+    def __init__(self, captions: List[Dict]):
+        started = time.perf_counter()
+        cues = sorted(
+            (float(c.get("start", 0)), float(c.get("duration", 0)), c.get("text", "").strip())
+            for c in captions
+        )
+        self.starts = [start for start, _, _ in cues]
+        self.durations = [duration for _, duration, _ in cues]
+        self.texts = [text for _, _, text in cues]
+        self.postings: Dict[str, List[int]] = {}
+        for position, text in enumerate(self.texts):
+            for term in set(tokenize(text)):
+                self.postings.setdefault(term, []).append(position)
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _near(self, term: str, position: int) -> bool:
+        postings = self.postings.get(term)
+        if not postings:
+            return False
+        i = bisect_left(postings, position - NEIGHBOR_CUES)
+        return i < len(postings) and postings[i] <= position + NEIGHBOR_CUES
+
+    def find(self, terms: List[str]) -> List[Dict[str, Any]]:
+        known = [term for term in terms if term in self.postings]
+        if len(known) < len(terms):
+            return []
+        anchor = min(known, key=lambda term: len(self.postings[term]))
+        hits = [p for p in self.postings[anchor] if all(self._near(term, p) for term in known if term != anchor)]
+
+        occurrences: List[Dict[str, Any]] = []
+        for position in hits:
+            start = self.starts[position]
+            if occurrences and start - occurrences[-1]["end"] <= CLUSTER_SECONDS:
+                occurrences[-1]["end"] = start
+                occurrences[-1]["cues"] += 1
+                continue
+            occurrences.append({"timestamp": start, "end": start, "text": self.texts[position], "cues": 1})
+        return occurrences
+
+    def stats(self) -> Dict[str, Any]:
+        return {"cues": len(self.starts), "terms": len(self.postings), "build_ms": round(self.build_ms, 2)}
@@ -3,7 +3,13 @@ import os
 import httpx
 import re
 import asyncio
-from typing import Optional, Dict, Any
+import json
+import time
+from typing import Optional, Dict, Any, AsyncIterator
+from services.caption_index import parse_event_query, tokenize
+from services.circuit_breaker import get_breaker
+from services.event_timeline import EVENT_TYPES
+from services.priority_scheduler import get_scheduler
 
 
 class ChatService:
@@ -21,6 +27,7 @@ class ChatService:
         self.chat_endpoint = f"{self.endpoint}openai/deployments/{self.deployment}/chat/completions?api-version={self.api_version}"
         
         self.client = None
+        self.breaker = get_breaker("azure_openai")
         if self.api_key and self.endpoint:
             self.client = httpx.AsyncClient(timeout=30.0)
             print(f"[CHAT] Azure OpenAI initialized: endpoint={self.endpoint}, deployment={self.deployment}")
@@ -116,7 +123,78 @@ class ChatService:
         print(f"[CHAT] Could not parse timestamp from message: '{message}'")
         return None
     
-    async def chat(
+    async def resolve_event_query(self, user_message: str, video_id: str, caption_extractor=None, current_time: float = 0.0) -> Optional[Dict[str, Any]]:
+        
+        if not caption_extractor:
+            return None
+        
+        def fmt(t: float) -> str:
+            return f"{int(t // 60)}:{int(t % 60):02d}"
+        
+        if re.search(r"\bhow many\b", user_message.lower()):
+            kinds = [term for term in dict.fromkeys(tokenize(user_message)) if term in EVENT_TYPES]
+            if len(kinds) != 1:
+                return None
+            timeline = await caption_extractor.get_event_timeline(video_id)
+            if timeline is None:
+                return None
+            kind = kinds[0]
+            events = timeline.to_list(kind)
+            reply = f"The commentary has {len(events)} {kind}{'' if len(events) == 1 else 's'} in this video"
+            if current_time > 0:
+                reply += f", {timeline.count(kind, current_time)} up to {fmt(current_time)}"
+            if events:
+                reply += ": " + ", ".join(fmt(e["videoTimestamp"]) for e in events[:10])
+            print(f"[CHAT] Answered '{kind}' count from the event timeline")
+            return {
+                "reply": reply + ".",
+                "timestamp": current_time,
+                "matches": [{"timestamp": e["videoTimestamp"], "text": e["description"], "type": kind} for e in events]
+            }
+        
+        query = parse_event_query(user_message)
+        if not query or self._parse_timestamp_from_message(user_message) is not None:
+            return None
+        terms, ordinal = query
+        
+        started = time.perf_counter()
+        occurrences = None
+        source = "event timeline"
+        if len(terms) == 1 and terms[0] in EVENT_TYPES:
+            timeline = await caption_extractor.get_event_timeline(video_id)
+            if timeline is not None and timeline.count(terms[0]):
+                occurrences = [
+                    {"timestamp": e["videoTimestamp"], "text": e["description"], "type": e["type"]}
+                    for e in timeline.to_list(terms[0])
+                ]
+        if occurrences is None:
+            source = "caption index"
+            index = await caption_extractor.get_caption_index(video_id)
+            if index is None:
+                return None
+            started = time.perf_counter()
+            occurrences = index.find(terms)
+        elapsed_us = (time.perf_counter() - started) * 1e6
+        if not occurrences:
+            print(f"[CHAT] No captions match {terms} - leaving the question to the model")
+            return None
+        
+        matches = [{key: o[key] for key in ("timestamp", "text", "type") if key in o} for o in occurrences]
+        if ordinal is not None and not -len(occurrences) <= ordinal < len(occurrences):
+            times = ", ".join(fmt(o["timestamp"]) for o in occurrences)
+            reply = f"The commentary only mentions that {len(occurrences)} time{'s' if len(occurrences) > 1 else ''}: {times}."
+            return {"reply": reply, "timestamp": occurrences[-1]["timestamp"], "matches": matches}
+        
+        position = (ordinal or 0) % len(occurrences)
+        chosen = occurrences[position]
+        reply = f"At {fmt(chosen['timestamp'])} - the commentary says: \"{chosen['text']}\""
+        if len(occurrences) > 1:
+            others = [fmt(o["timestamp"]) for i, o in enumerate(occurrences) if i != position][:5]
+            reply += f" (moment {position + 1} of {len(occurrences)} that match; others at {', '.join(others)})"
+        print(f"[CHAT] Resolved {terms} to {fmt(chosen['timestamp'])} from the {source} in {elapsed_us:.0f}µs")
+        return {"reply": reply, "timestamp": chosen["timestamp"], "matches": matches}
+    
+    async def _build_prompts(
         self,
         user_message: str,
         video_id: str,
@@ -125,15 +203,10 @@ class ChatService:
         video_metadata: Optional[Dict[str, Any]] = None,
         caption_extractor=None,
         frame_extractor=None,
-        vision_analyzer=None
-    ) -> str:
-        
-        if not self._is_available():
-            print(f"[CHAT] Azure OpenAI not available - using stub response")
-            print(f"[CHAT] Debug: api_key={'SET' if self.api_key else 'NOT SET'}, endpoint={'SET' if self.endpoint else 'NOT SET'}, client={'SET' if self.client else 'NOT SET'}")
-            return self._generate_stub_response(user_message, current_time, context)
+        vision_analyzer=None,
+        excitement_detector=None
+    ) -> Dict[str, Any]:
         
-        print(f"[CHAT] Calling Azure OpenAI at {self.chat_endpoint}")
         
 
         system_prompt = 
@@ -212,7 +285,7 @@ class ChatService:
                 print(f"[CHAT] User asked 'now' - video is playing at {target_timestamp}s")
             else:
 
-                return "Please play the video first, then ask 'what's happening now' or 'what happened now' while the video is playing."
+                return {"reply": "Please play the video first, then ask 'what's happening now' or 'what happened now' while the video is playing."}
         else:
 
             if current_time > 0:
@@ -220,7 +293,7 @@ class ChatService:
                 print(f"[CHAT] No timestamp specified, using current playback time: {target_timestamp}s")
             else:
 
-                return "Please specify a timestamp (e.g., 'what happened at 23 seconds' or 'explain 1:27') or play the video and ask 'what's happening now'."
+                return {"reply": "Please specify a timestamp (e.g., 'what happened at 23 seconds' or 'explain 1:27') or play the video and ask 'what's happening now'."}
         
 
         minutes = int(target_timestamp // 60)
@@ -317,7 +390,7 @@ class ChatService:
                             print(f"[CHAT] Analyzing frame at {frame_str}...")
 
                             analysis = await asyncio.wait_for(
-                                vision_analyzer.analyze_frame(frame_base64, context=vision_context),
+                                vision_analyzer.analyze_frame(frame_base64, context=vision_context, fallback=False),
                                 timeout=10.0
                             )
                             if analysis and analysis.strip():
@@ -431,6 +504,20 @@ class ChatService:
                 print(f"[CHAT] Could not format captions: {e}")
         
 
+        timeline = caption_extractor.event_timeline(video_id) if caption_extractor else None
+        if timeline is not None:
+            events = timeline.describe(target_timestamp)
+            if events:
+                user_prompt += "=== MATCH EVENTS (classified from the full commentary) ===\n" + events + "\n"
+                user_prompt += "Use these to say what led up to this moment and what the score situation is.\n\n"
+
+        if excitement_detector:
+            peak = excitement_detector.peak(video_id, window_start, window_end)
+            if peak and peak[1] >= excitement_detector.threshold:
+                user_prompt += f"AUDIO: Crowd and commentator noise peaks at {int(peak[0] // 60)}:{int(peak[0] % 60):02d} (excitement {peak[1]:.2f} of 1.0). Something significant most likely happened around then.\n\n"
+            elif peak:
+                user_prompt += f"AUDIO: Crowd and commentator noise stays calm between {window_str} (peak excitement {peak[1]:.2f} of 1.0).\n\n"
+
         if context and context.get('caption'):
             user_prompt += f"CURRENT VIDEO CAPTION/COMMENTARY AT {timestamp_str}: {context['caption']}\n"
             user_prompt += "This is the actual commentary from the video at the current playback time.\n\n"
@@ -485,8 +572,45 @@ class ChatService:
                 user_prompt += "The CURRENT VIDEO CAPTION shows what actually happened - prioritize that information. "
             user_prompt += "Reference the analysis and caption provided above. "
             user_prompt += "If the question is about the video itself, be specific about what's happening at this timestamp. Don't give generic responses - be detailed and specific."
-        
 
+        return {
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "target_timestamp": target_timestamp
+        }
+    
+    async def chat(
+        self,
+        user_message: str,
+        video_id: str,
+        current_time: float,
+        context: Optional[Dict[str, Any]] = None,
+        video_metadata: Optional[Dict[str, Any]] = None,
+        caption_extractor=None,
+        frame_extractor=None,
+        vision_analyzer=None,
+        excitement_detector=None
+    ) -> str:
+        
+        if not self._is_available():
+            print(f"[CHAT] Azure OpenAI not available - using stub response")
+            print(f"[CHAT] Debug: api_key={'SET' if self.api_key else 'NOT SET'}, endpoint={'SET' if self.endpoint else 'NOT SET'}, client={'SET' if self.client else 'NOT SET'}")
+            return self._generate_stub_response(user_message, current_time, context)
+        
+        prompts = await self._build_prompts(
+            user_message, video_id, current_time, context, video_metadata,
+            caption_extractor, frame_extractor, vision_analyzer, excitement_detector
+        )
+        if prompts.get("reply"):
+            return prompts["reply"]
+        system_prompt = prompts["system_prompt"]
+        user_prompt = prompts["user_prompt"]
+        
+        if not self.breaker.allow_request():
+            print(f"[CHAT] Azure OpenAI circuit open - using stub response")
+            return self._generate_stub_response(user_message, current_time, context)
+        
+        print(f"[CHAT] Calling Azure OpenAI at {self.chat_endpoint}")
         
 
         max_retries = 3
@@ -495,25 +619,27 @@ class ChatService:
         for attempt in range(max_retries):
             try:
                 print(f"[CHAT] Sending request to Azure OpenAI... (attempt {attempt + 1}/{max_retries})")
-                response = await self.client.post(
-                    self.chat_endpoint,
-                    headers={
-                        "api-key": self.api_key,
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        "temperature": 0.7,
-                        "max_tokens": 200
-                    }
-                )
+                async with get_scheduler("llm").slot():
+                    response = await self.client.post(
+                        self.chat_endpoint,
+                        headers={
+                            "api-key": self.api_key,
+                            "Content-Type": "application/json"
+                        },
+                        json={
+                            "messages": [
+                                {"role": "system", "content": system_prompt},
+                                {"role": "user", "content": user_prompt}
+                            ],
+                            "temperature": 0.7,
+                            "max_tokens": 200
+                        }
+                    )
                 
                 print(f"[CHAT] Azure OpenAI response status: {response.status_code}")
                 
                 if response.status_code == 200:
+                    self.breaker.record_success()
                     data = response.json()
                     ai_response = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
                     print(f"[CHAT] ✓ Got AI response: {ai_response[:100]}...")
@@ -524,22 +650,18 @@ class ChatService:
                     retry_after = error_data.get('error', {}).get('message', '')
                     
                     if attempt < max_retries - 1:
-
-                        import re
-                        retry_match = re.search(r'retry after (\d+) seconds?', retry_after.lower())
-                        if retry_match:
-                            retry_delay = float(retry_match.group(1)) + 1
-                        else:
-                            retry_delay = retry_delay * 2
+                        retry_delay = self._rate_limit_delay(retry_after, retry_delay)
                         
                         print(f"[CHAT] Rate limit (429) - waiting {retry_delay:.1f}s before retry...")
                         await asyncio.sleep(retry_delay)
                         continue
                     else:
                         print(f"[CHAT] ✗ Azure OpenAI rate limit - max retries reached")
+                        self.breaker.record_failure()
                         return self._generate_stub_response(user_message, current_time, context)
                 else:
                     print(f"[CHAT] ✗ Azure OpenAI API error: {response.status_code} - {response.text}")
+                    self.breaker.record_failure()
                     return self._generate_stub_response(user_message, current_time, context)
             except Exception as e:
                 print(f"[CHAT] ✗ Chat service error: {e}")
@@ -547,6 +669,7 @@ class ChatService:
                 traceback.print_exc()
 
                 if attempt == max_retries - 1:
+                    self.breaker.record_failure()
                     return self._generate_stub_response(user_message, current_time, context)
 
                 await asyncio.sleep(retry_delay)
@@ -555,6 +678,131 @@ class ChatService:
 
         return self._generate_stub_response(user_message, current_time, context)
     
+    async def chat_stream(
+        self,
+        user_message: str,
+        video_id: str,
+        current_time: float,
+        context: Optional[Dict[str, Any]] = None,
+        video_metadata: Optional[Dict[str, Any]] = None,
+        caption_extractor=None,
+        frame_extractor=None,
+        vision_analyzer=None,
+        excitement_detector=None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        
+        if not self._is_available():
+            print(f"[CHAT STREAM] Azure OpenAI not available - streaming stub response")
+            stub = self._generate_stub_response(user_message, current_time, context)
+            yield {"event": "token", "content": stub}
+            yield {"event": "done", "response": stub, "timestamp": current_time}
+            return
+        
+        prompts = await self._build_prompts(
+            user_message, video_id, current_time, context, video_metadata,
+            caption_extractor, frame_extractor, vision_analyzer, excitement_detector
+        )
+        if prompts.get("reply"):
+            yield {"event": "token", "content": prompts["reply"]}
+            yield {"event": "done", "response": prompts["reply"], "timestamp": current_time}
+            return
+        target_timestamp = prompts["target_timestamp"]
+        
+        if not self.breaker.allow_request():
+            print(f"[CHAT STREAM] Azure OpenAI circuit open - streaming stub response")
+            stub = self._generate_stub_response(user_message, current_time, context)
+            yield {"event": "token", "content": stub}
+            yield {"event": "done", "response": stub, "timestamp": target_timestamp}
+            return
+        
+        print(f"[CHAT STREAM] Streaming from Azure OpenAI at {self.chat_endpoint}")
+        chunks = []
+        tokens: asyncio.Queue = asyncio.Queue()
+        pump = asyncio.create_task(self._pump_stream(prompts, tokens))
+        try:
+            while True:
+                delta = await tokens.get()
+                if delta is None:
+                    break
+                chunks.append(delta)
+                yield {"event": "token", "content": delta}
+            await pump
+            self.breaker.record_success()
+        except (asyncio.CancelledError, GeneratorExit):
+            self.breaker.release()
+            raise
+        except Exception as e:
+            print(f"[CHAT STREAM] ✗ Streaming error: {e}")
+            self.breaker.record_failure()
+            if not chunks:
+                stub = self._generate_stub_response(user_message, current_time, context)
+                chunks.append(stub)
+                yield {"event": "token", "content": stub}
+        finally:
+            if not pump.done():
+                pump.cancel()
+        
+        full_response = "".join(chunks).strip()
+        print(f"[CHAT STREAM] ✓ Streamed response: {full_response[:100]}...")
+        yield {"event": "done", "response": full_response, "timestamp": target_timestamp}
+    
+    async def _pump_stream(self, prompts: Dict[str, Any], tokens: asyncio.Queue):
+        max_retries = 3
+        retry_delay = 2.0
+        try:
+            for attempt in range(max_retries):
+                async with get_scheduler("llm").slot():
+                    async with self.client.stream(
+                        "POST",
+                        self.chat_endpoint,
+                        headers={
+                            "api-key": self.api_key,
+                            "Content-Type": "application/json"
+                        },
+                        json={
+                            "messages": [
+                                {"role": "system", "content": prompts["system_prompt"]},
+                                {"role": "user", "content": prompts["user_prompt"]}
+                            ],
+                            "temperature": 0.7,
+                            "max_tokens": 200,
+                            "stream": True
+                        }
+                    ) as response:
+                        if response.status_code == 429 and attempt < max_retries - 1:
+                            body = await response.aread()
+                            retry_delay = self._rate_limit_delay(body.decode(errors="ignore"), retry_delay)
+                        elif response.status_code != 200:
+                            body = await response.aread()
+                            raise RuntimeError(f"Azure OpenAI API error: {response.status_code} - {body[:200]!r}")
+                        else:
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                payload = line[len("data:"):].strip()
+                                if payload == "[DONE]":
+                                    break
+                                try:
+                                    data = json.loads(payload)
+                                except ValueError:
+                                    continue
+                                choices = data.get("choices") or [{}]
+                                delta = choices[0].get("delta", {}).get("content")
+                                if delta:
+                                    tokens.put_nowait(delta)
+                            return
+                print(f"[CHAT STREAM] Rate limit (429) - waiting {retry_delay:.1f}s before retry...")
+                await asyncio.sleep(retry_delay)
+        finally:
+            tokens.put_nowait(None)
+    
+    @staticmethod
+    def _rate_limit_delay(message: str, retry_delay: float) -> float:
+        retry_match = re.search(r'retry after (\d+) seconds?', message.lower())
+        if retry_match:
+            return float(retry_match.group(1)) + 1
+        return retry_delay * 2
+    
     def _generate_stub_response(self, user_message: str, current_time: float, context: Optional[Dict[str, Any]] = None) -> str:
         
         print(f"[CHAT] Generating stub response (Azure OpenAI not available)")
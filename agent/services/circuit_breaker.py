@@ -0,0 +1,145 @@
+from typing import Dict, Any, Optional
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.half_open_in_flight = 0
+        self.last_probe_at: Optional[float] = None
+        self.total_failures = 0
+        self.total_successes = 0
+        self.total_rejected = 0
+
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    self.total_rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self.half_open_in_flight = 0
+                logger.info(f"[CIRCUIT] {self.name}: open -> half_open, probing")
+
+            now = time.monotonic()
+            if self.last_probe_at is not None and now - self.last_probe_at >= self.recovery_timeout:
+                self.half_open_in_flight = 0
+
+            if self.half_open_in_flight < self.half_open_max_calls:
+                self.half_open_in_flight += 1
+                self.last_probe_at = now
+                return True
+
+            self.total_rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.total_successes += 1
+            self.consecutive_failures = 0
+            if self.state != self.CLOSED:
+                logger.info(f"[CIRCUIT] {self.name}: {self.state} -> closed")
+            self.state = self.CLOSED
+            self.opened_at = None
+            self.half_open_in_flight = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"[CIRCUIT] {self.name}: {self.state} -> open "
+                        f"after {self.consecutive_failures} consecutive failure(s)"
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.half_open_in_flight = 0
+
+    def release(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN and self.half_open_in_flight > 0:
+                self.half_open_in_flight -= 1
+
+    def is_open(self) -> bool:
+        with self._lock:
+            if self.state != self.OPEN:
+                return False
+            return time.monotonic() - self.opened_at < self.recovery_timeout
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self.state != self.OPEN or self.opened_at is None:
+                return 0.0
+            return max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+
+    def get_state(self) -> Dict[str, Any]:
+        retry_after = self.retry_after()
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "retry_after": round(retry_after, 1),
+                "total_failures": self.total_failures,
+                "total_successes": self.total_successes,
+                "total_rejected": self.total_rejected,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            env_name = name.upper()
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=int(os.getenv(
+                    f"CIRCUIT_{env_name}_FAILURE_THRESHOLD",
+                    os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3")
+                )),
+                recovery_timeout=float(os.getenv(
+                    f"CIRCUIT_{env_name}_RECOVERY_TIMEOUT",
+                    os.getenv("CIRCUIT_RECOVERY_TIMEOUT", "30")
+                )),
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def get_all_states() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.get_state() for breaker in breakers}
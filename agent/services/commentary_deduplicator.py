@@ -1,53 +1,124 @@
-from typing import List, Tuple
+from collections import OrderedDict
+from typing import List, Tuple, Optional, Dict, Any, FrozenSet, Hashable
 import logging
-from difflib import SequenceMatcher
+import os
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
 
+SHINGLE_SIZE = 3
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> FrozenSet[int]:
+    normalized = _WHITESPACE.sub(" ", text.lower().strip())
+    if len(normalized) <= size:
+        return frozenset([hash(normalized)])
+    return frozenset(hash(normalized[i:i + size]) for i in range(len(normalized) - size + 1))
+
+
+def dice(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a and not b:
+        return 1.0
+    if len(a) > len(b):
+        a, b = b, a
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
 class CommentaryDeduplicator:
-    
-    def __init__(self, similarity_threshold: float = 0.85, max_history: int = 10):
-        self.threshold = similarity_threshold
+
+    def __init__(self, similarity_threshold: Optional[float] = None, max_history: int = 10):
+        self.threshold = similarity_threshold if similarity_threshold is not None else float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.81"))
         self.max_history = max_history
-        self.history: List[Tuple[str, float]] = []
-    
+        self.history: List[Tuple[str, float, FrozenSet[int]]] = []
+        self.last_used = time.monotonic()
+
     def should_skip(self, new_commentary: str) -> bool:
+        self.last_used = time.monotonic()
         if not new_commentary or not new_commentary.strip():
             return True
-        
+
         if len(self.history) == 0:
             return False
-        
-        new_lower = new_commentary.lower().strip()
-        
-        for old_commentary, _ in self.history:
-            old_lower = old_commentary.lower().strip()
-            
-            similarity = SequenceMatcher(None, new_lower, old_lower).ratio()
-            
+
+        new_shingles = shingles(new_commentary)
+
+        for old_commentary, _, old_shingles in self.history:
+            smaller, larger = sorted((len(new_shingles), len(old_shingles)))
+            if 2 * smaller / (smaller + larger) < self.threshold:
+                continue
+
+            similarity = dice(new_shingles, old_shingles)
+
             if similarity >= self.threshold:
                 logger.info(f"[DEDUP] Skipping similar commentary (similarity: {similarity:.2f})")
                 logger.info(f"[DEDUP] Old: {old_commentary[:50]}...")
                 logger.info(f"[DEDUP] New: {new_commentary[:50]}...")
                 return True
-        
+
         return False
-    
+
     def add_commentary(self, commentary: str, timestamp: float):
+        self.last_used = time.monotonic()
         if not commentary or not commentary.strip():
             return
-        
-        self.history.append((commentary, timestamp))
-        
+
+        self.history.append((commentary, timestamp, shingles(commentary)))
+
         if len(self.history) > self.max_history:
             self.history.pop(0)
-        
+
         logger.debug(f"[DEDUP] Added to history: {commentary[:50]}... (total: {len(self.history)})")
-    
+
     def clear_history(self):
         self.history.clear()
         logger.info("[DEDUP] History cleared")
-    
+
     def get_similarity_score(self, text1: str, text2: str) -> float:
-        return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
+        return dice(shingles(text1), shingles(text2))
+
+
+class DeduplicatorTable:
+
+    def __init__(self, max_sessions: Optional[int] = None, idle_seconds: Optional[float] = None):
+        self.max_sessions = max_sessions or int(os.getenv("DEDUP_MAX_SESSIONS", "2000"))
+        self.idle_seconds = idle_seconds or float(os.getenv("DEDUP_IDLE_SECONDS", "900"))
+        self.sessions: "OrderedDict[Hashable, CommentaryDeduplicator]" = OrderedDict()
+        self.expired = 0
+        self.evicted = 0
+
+    def get(self, key: Hashable) -> CommentaryDeduplicator:
+        self._expire()
+        deduplicator = self.sessions.get(key)
+        if deduplicator is None:
+            deduplicator = CommentaryDeduplicator()
+            self.sessions[key] = deduplicator
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.evicted += 1
+        else:
+            self.sessions.move_to_end(key)
+        deduplicator.last_used = time.monotonic()
+        return deduplicator
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        while self.sessions:
+            _, deduplicator = next(iter(self.sessions.items()))
+            if deduplicator.last_used >= cutoff:
+                break
+            self.sessions.popitem(last=False)
+            self.expired += 1
+
+    def stats(self) -> Dict[str, Any]:
+        self._expire()
+        return {
+            "sessions": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "idle_seconds": self.idle_seconds,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
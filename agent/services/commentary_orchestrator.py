@@ -1,34 +1,113 @@
 from typing import Optional, Dict, Any
 import logging
+import os
 from services.frame_window_service import FrameWindowService
 from services.gemini_vision import GeminiVisionAnalyzer
 from services.gemini_commentary import GeminiCommentaryEnhancer
 from services.commentary_deduplicator import CommentaryDeduplicator
+from services.circuit_breaker import get_breaker
+from services.quality_profiles import get_profile
+from services.youtube_extractor import SEEK_MODES
 
 logger = logging.getLogger(__name__)
 
 
+LIVE_SEEK_MODE = os.getenv("LIVE_SEEK_MODE", "fast")
+if LIVE_SEEK_MODE not in SEEK_MODES:
+    LIVE_SEEK_MODE = "fast"
+
+
 class CommentaryOrchestrator:
     
-    def __init__(self):
+    def __init__(self, cache=None, store=None):
         self.frame_service = FrameWindowService()
         self.vision_analyzer = GeminiVisionAnalyzer()
         self.commentary_enhancer = GeminiCommentaryEnhancer()
-        self.deduplicator = CommentaryDeduplicator()
+        self.cache = cache
+        self.store = store
     
-    async def generate_live_commentary(
+    @staticmethod
+    def window_cache_key(video_url: str, current_time: float, window_size: float) -> str:
+        return f"live:{video_url}:{int(current_time)}:{window_size:g}"
+    
+    def deduplicate(
+        self,
+        window: Dict[str, Any],
+        current_time: float,
+        deduplicator: CommentaryDeduplicator
+    ) -> Dict[str, Any]:
+        if window.get("error"):
+            return {
+                "commentary": None,
+                "raw_action": window.get("raw_action"),
+                "timestamp": current_time,
+                "skipped": False,
+                "error": window["error"]
+            }
+        
+        enhanced_commentary = window["commentary"]
+        raw_action = window["raw_action"]
+        
+        logger.info("[ORCHESTRATOR] Step 4: Checking deduplication...")
+        should_skip = deduplicator.should_skip(enhanced_commentary)
+        
+        if should_skip:
+            logger.info("[ORCHESTRATOR] ✗ Commentary skipped (too similar to recent)")
+            return {
+                "commentary": None,
+                "raw_action": raw_action,
+                "timestamp": current_time,
+                "skipped": True
+            }
+        
+        deduplicator.add_commentary(enhanced_commentary, current_time)
+        
+        logger.info("[ORCHESTRATOR] ✓ Commentary accepted and added to history")
+        
+        return {
+            "commentary": enhanced_commentary,
+            "raw_action": raw_action,
+            "timestamp": current_time,
+            "skipped": False
+        }
+    
+    async def compute_window(
         self,
         video_url: str,
         current_time: float,
-        window_size: float = 5.0
+        window_size: Optional[float] = None,
+        seek_mode: Optional[str] = None
     ) -> Dict[str, Any]:
+        window_size = window_size or get_profile().window_size
+        cache_key = self.window_cache_key(video_url, current_time, window_size)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached:
+                logger.info(f"[ORCHESTRATOR] Cache hit for {cache_key}")
+                return cached
+        
+        if self.store is not None:
+            record = self.store.nearest(video_url, current_time, require="live_commentary", max_distance=window_size / 2)
+            if record:
+                logger.info(f"[ORCHESTRATOR] Serving stored commentary for {video_url} at {record['second']}s")
+                window = {
+                    "commentary": record["live_commentary"],
+                    "raw_action": record.get("raw_action")
+                }
+                if self.cache is not None:
+                    self.cache.set(cache_key, window, expire=600)
+                return window
+        
         try:
             logger.info(f"[ORCHESTRATOR] Generating commentary for {video_url} at {current_time:.1f}s")
             
             raw_action = None
             
             import os
-            if os.getenv("OVERSHOOT_API_KEY"):
+            overshoot_breaker = get_breaker("overshoot")
+            if os.getenv("OVERSHOOT_API_KEY") and not overshoot_breaker.allow_request():
+                logger.info("[ORCHESTRATOR] Step 1: Overshoot circuit open - skipping to Gemini Vision")
+            elif os.getenv("OVERSHOOT_API_KEY"):
                 try:
                     logger.info("[ORCHESTRATOR] Step 1: Trying Overshoot...")
                     import httpx
@@ -43,11 +122,15 @@ class CommentaryOrchestrator:
                             }
                         )
                         if response.status_code == 200:
+                            overshoot_breaker.record_success()
                             data = response.json()
                             if data.get("success") and data.get("commentary"):
                                 raw_action = data.get("commentary") or data.get("rawAction")
                                 logger.info(f"[ORCHESTRATOR] ✓ Got raw action from Overshoot: {raw_action[:50]}...")
+                        else:
+                            overshoot_breaker.record_failure()
                 except Exception as e:
+                    overshoot_breaker.record_failure()
                     logger.warning(f"[ORCHESTRATOR] Overshoot failed: {e}, falling back to Gemini Vision")
             
             if not raw_action:
@@ -55,7 +138,8 @@ class CommentaryOrchestrator:
                 frames, timestamps = await self.frame_service.get_frame_window(
                     video_url,
                     current_time,
-                    window_size=window_size
+                    window_size=window_size,
+                    seek_mode=seek_mode or LIVE_SEEK_MODE
                 )
                 
                 if not frames:
@@ -63,15 +147,22 @@ class CommentaryOrchestrator:
                     return {
                         "commentary": None,
                         "raw_action": None,
-                        "timestamp": current_time,
-                        "skipped": False,
                         "error": "No frames extracted"
                     }
                 
                 logger.info(f"[ORCHESTRATOR] ✓ Extracted {len(frames)} frames")
                 
                 logger.info("[ORCHESTRATOR] Step 2b: Analyzing with Gemini Vision...")
-                raw_action = await self.vision_analyzer.analyze_frame_window(frames, timestamps)
+                images = None
+                if self.vision_analyzer.model is not None:
+                    images = self.frame_service.frame_analysis(
+                        video_url,
+                        frames,
+                        timestamps,
+                        "image",
+                        self.vision_analyzer.decode_frame
+                    )
+                raw_action = await self.vision_analyzer.analyze_frame_window(frames, timestamps, images=images)
                 logger.info(f"[ORCHESTRATOR] ✓ Raw action: {raw_action[:50]}...")
             
             logger.info("[ORCHESTRATOR] Step 3: Enhancing with Gemini Text...")
@@ -82,28 +173,20 @@ class CommentaryOrchestrator:
             )
             logger.info(f"[ORCHESTRATOR] ✓ Enhanced commentary: {enhanced_commentary[:50]}...")
             
-            logger.info("[ORCHESTRATOR] Step 4: Checking deduplication...")
-            should_skip = self.deduplicator.should_skip(enhanced_commentary)
-            
-            if should_skip:
-                logger.info("[ORCHESTRATOR] ✗ Commentary skipped (too similar to recent)")
-                return {
-                    "commentary": None,
-                    "raw_action": raw_action,
-                    "timestamp": current_time,
-                    "skipped": True
-                }
-            
-            self.deduplicator.add_commentary(enhanced_commentary, current_time)
-            
-            logger.info("[ORCHESTRATOR] ✓ Commentary accepted and added to history")
-            
-            return {
+            window = {
                 "commentary": enhanced_commentary,
-                "raw_action": raw_action,
-                "timestamp": current_time,
-                "skipped": False
+                "raw_action": raw_action
             }
+            if self.cache is not None:
+                self.cache.set(cache_key, window, expire=600)
+            if self.store is not None:
+                self.store.upsert(
+                    video_url,
+                    int(current_time),
+                    raw_action=raw_action,
+                    live_commentary=enhanced_commentary
+                )
+            return window
             
         except Exception as e:
             logger.error(f"[ORCHESTRATOR] Error in pipeline: {e}")
@@ -112,11 +195,5 @@ class CommentaryOrchestrator:
             return {
                 "commentary": None,
                 "raw_action": None,
-                "timestamp": current_time,
-                "skipped": False,
                 "error": str(e)
             }
-    
-    def clear_history(self):
-        self.deduplicator.clear_history()
-        logger.info("[ORCHESTRATOR] History cleared")
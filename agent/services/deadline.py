@@ -0,0 +1,49 @@
+from typing import Optional
+import os
+import time
+
+
+DEFAULT_ANALYZE_BUDGET = float(os.getenv("ANALYZE_DEADLINE_SECONDS", "8.0"))
+MAX_ANALYZE_BUDGET = float(os.getenv("ANALYZE_DEADLINE_MAX_SECONDS", "30.0"))
+MIN_STAGE_SECONDS = float(os.getenv("DEADLINE_MIN_STAGE_SECONDS", "0.25"))
+
+
+class Deadline:
+
+    def __init__(self, budget_seconds: float):
+        self.budget = budget_seconds
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + budget_seconds
+
+    @classmethod
+    def from_request(
+        cls,
+        header_ms: Optional[float] = None,
+        field_ms: Optional[float] = None,
+        default_seconds: float = DEFAULT_ANALYZE_BUDGET
+    ) -> "Deadline":
+        budget_ms = header_ms if header_ms is not None else field_ms
+        if budget_ms is None or budget_ms <= 0:
+            return cls(default_seconds)
+        return cls(min(budget_ms / 1000.0, MAX_ANALYZE_BUDGET))
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def can_run(self, min_seconds: float = MIN_STAGE_SECONDS) -> bool:
+        return self.remaining() >= min_seconds
+
+    def stage_timeout(self, cap: float) -> float:
+        return min(cap, self.remaining())
+
+
+def stage_timeout(deadline: Optional[Deadline], cap: float) -> float:
+    if deadline is None:
+        return cap
+    return deadline.stage_timeout(cap)
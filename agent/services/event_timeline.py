@@ -0,0 +1,178 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Optional, Dict, Any, List
+import re
+import time
+
+
+EVENT_TYPES = ("goal", "shot", "save", "card", "substitution", "foul")
+
+MERGE_SECONDS = {"goal": 60.0, "shot": 8.0, "save": 8.0, "card": 30.0, "substitution": 30.0, "foul": 15.0}
+
+TITLES = {"goal": "Goal", "shot": "Shot", "save": "Save", "card": "Booking", "substitution": "Substitution", "foul": "Foul"}
+
+RULES = [
+    (
+        "goal",
+        re.compile(
+            r"(?<!\bon )(?<!\bat )(?<!\btowards )\bg+o+a+l+\b(?!\s*(?:kick|line|keeper|mouth|posts?|difference|side|scorer))|\bscore[sd]\b|\bnetted\b|\bnets\b"
+            r"|\b(?:back of|into|in) the (?:net|onion bag)\b|\bequali[sz](?:es|ed|er)\b|\bown goal\b|\bhat[- ]?trick\b"
+            r"|\bmakes? it \d+\s*[-–]\s*\d+\b",
+            re.IGNORECASE
+        ),
+        re.compile(
+            r"\bno goal\b|\bdisallowed\b|\bruled out\b|\bchalked off\b|\boffside\b|\balmost\b|\bnearly\b|\bso close\b"
+            r"|\b(?:could|should|would|must) have\b|\bif (?:he|she|they)\b|\bwhat's the score\b|\bgoal[- ]?less\b"
+            r"|\b(?:need|needs|needed|want|wants|looking for|pushing for|chasing|searching for) (?:a|an|another|that|the) goal\b"
+            r"|\bearlier\b|\bago\b|\bremember\b|\blast (?:week|season|time|game|match)\b|\bprevious(?:ly)?\b",
+            re.IGNORECASE
+        ),
+    ),
+    (
+        "save",
+        re.compile(
+            r"\bsave[sd]?\b|\bkept out\b|\bkeeps it out\b|\bparr(?:y|ies|ied)\b|\btip(?:s|ped)? (?:it )?(?:over|round|around|wide)\b"
+            r"|\bdenie[sd]\b|\bdenies\b|\bfingertips?\b|\bpalm(?:s|ed)? (?:it )?away\b|\bclaws? (?:it )?away\b",
+            re.IGNORECASE
+        ),
+        re.compile(r"\bsaved? (?:the|his|her) (?:day|season|best)\b", re.IGNORECASE),
+    ),
+    (
+        "card",
+        re.compile(
+            r"\b(?:yellow|red) card\b|\bbooked\b|\bbooking\b|\bcaution(?:ed)?\b|\bsent off\b|\bsending off\b"
+            r"|\bsecond yellow\b|\bmarching orders\b|\bgoes into the book\b",
+            re.IGNORECASE
+        ),
+        None,
+    ),
+    (
+        "substitution",
+        re.compile(
+            r"\bsubstitution\b|\bsubstitute[sd]?\b|\bcomes? (?:off|on) for\b|\b(?:is|being) replaced\b|\breplaced by\b"
+            r"|\bmakes? way\b|\bdouble change\b|\bfresh legs\b",
+            re.IGNORECASE
+        ),
+        None,
+    ),
+    (
+        "foul",
+        re.compile(
+            r"\bfoul(?:ed|s)?\b|\bfree[- ]?kick\b|\btripped\b|\bbrought down\b|\blate (?:challenge|tackle)\b|\bhandball\b"
+            r"|\bpenalty\b(?!\s*shoot)|\bpoints to the spot\b",
+            re.IGNORECASE
+        ),
+        re.compile(r"\bno foul\b|\bnot a foul\b|\bplay on\b", re.IGNORECASE),
+    ),
+    (
+        "shot",
+        re.compile(
+            r"\bshot\b|\bshoots\b|\bstrikes?\b|\bstruck\b|\beffort\b|\bfires?\b|\bfired\b|\bvolley(?:s|ed)?\b|\bheader\b"
+            r"|\bcurls?\b|\bcurled\b|\bover the bar\b|\b(?:hits|against|off) the (?:post|bar|crossbar|woodwork)\b|\bjust wide\b",
+            re.IGNORECASE
+        ),
+        None,
+    ),
+]
+
+_ANY_EVENT = re.compile("|".join(f"(?:{pattern.pattern})" for _, pattern, _ in RULES), re.IGNORECASE)
+
+RED_CARD = re.compile(r"\bred card\b|\bsent off\b|\bsending off\b|\bsecond yellow\b|\bmarching orders\b", re.IGNORECASE)
+YELLOW_CARD = re.compile(r"\byellow\b|\bbooked\b|\bbooking\b|\bcaution", re.IGNORECASE)
+
+
+def classify(text: str) -> Optional[str]:
+    if not _ANY_EVENT.search(text):
+        return None
+    for kind, pattern, negation in RULES:
+        if pattern.search(text) and not (negation is not None and negation.search(text)):
+            return kind
+    return None
+
+
+def _fmt(t: float) -> str:
+    return f"{int(t // 60)}:{int(t % 60):02d}"
+
+
+class EventTimeline:
+
+    def __init__(self):
+        self.times = array("d")
+        self.kinds = array("B")
+        self.texts: List[str] = []
+        self.kind_times: Dict[str, array] = {kind: array("d") for kind in EVENT_TYPES}
+        self.kind_positions: Dict[str, array] = {kind: array("I") for kind in EVENT_TYPES}
+        self.cues = 0
+        self.build_ms = 0.0
+
+    @classmethod
+    def build(cls, captions: List[Dict]) -> "EventTimeline":
+        started = time.perf_counter()
+        timeline = cls()
+        last_seen: Dict[str, float] = {}
+        for start, text in sorted((float(c.get("start", 0)), c.get("text", "").strip()) for c in captions):
+            timeline.cues += 1
+            kind = classify(text)
+            if kind is None:
+                continue
+            previous = last_seen.get(kind)
+            if previous is not None and start - previous <= MERGE_SECONDS[kind]:
+                continue
+            last_seen[kind] = start
+            timeline.kind_positions[kind].append(len(timeline.times))
+            timeline.kind_times[kind].append(start)
+            timeline.times.append(start)
+            timeline.kinds.append(EVENT_TYPES.index(kind))
+            timeline.texts.append(text)
+        timeline.build_ms = (time.perf_counter() - started) * 1000
+        return timeline
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def event(self, position: int) -> Dict[str, Any]:
+        kind = EVENT_TYPES[self.kinds[position]]
+        text = self.texts[position]
+        title = TITLES[kind]
+        if kind == "card":
+            title = "Red card" if RED_CARD.search(text) else "Yellow card" if YELLOW_CARD.search(text) else title
+        timestamp = self.times[position]
+        return {
+            "id": f"{kind}-{position}",
+            "type": kind,
+            "minute": int(timestamp // 60),
+            "videoTimestamp": timestamp,
+            "title": title,
+            "description": text,
+        }
+
+    def between(self, start: float, end: float, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        if kind is not None:
+            times = self.kind_times[kind]
+            positions = self.kind_positions[kind]
+            return [self.event(p) for p in positions[bisect_left(times, start):bisect_right(times, end)]]
+        return [self.event(p) for p in range(bisect_left(self.times, start), bisect_right(self.times, end))]
+
+    def count(self, kind: str, until: Optional[float] = None) -> int:
+        times = self.kind_times[kind]
+        return len(times) if until is None else bisect_right(times, until)
+
+    def counts(self, until: Optional[float] = None) -> Dict[str, int]:
+        return {kind: self.count(kind, until) for kind in EVENT_TYPES}
+
+    def describe(self, timestamp: float, before: float = 90.0, after: float = 15.0) -> Optional[str]:
+        nearby = self.between(timestamp - before, timestamp + after)
+        goals = self.count("goal", timestamp)
+        if not nearby and not goals:
+            return None
+        lines = [f"{_fmt(e['videoTimestamp'])} {e['title'].upper()}: {e['description']}" for e in nearby]
+        lines.append(f"Goals in the commentary up to {_fmt(timestamp)}: {goals}")
+        return "\n".join(lines)
+
+    def to_list(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        if kind is not None:
+            return [self.event(p) for p in self.kind_positions[kind]]
+        return [self.event(p) for p in range(len(self.times))]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"cues": self.cues, "events": len(self.times), "counts": self.counts(), "build_ms": round(self.build_ms, 2)}
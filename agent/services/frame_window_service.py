@@ -1,13 +1,70 @@
-from typing import List, Tuple, Optional
+from collections import OrderedDict
+from typing import List, Tuple, Optional, Dict, Any, Callable, Awaitable, Set
 import asyncio
 import logging
+import math
 import os
+import time
 import httpx
-from services.youtube_extractor import YouTubeFrameExtractor
+from services.youtube_extractor import YouTubeFrameExtractor, SEEK_EXACT, SEEK_FAST, FAST_SEEK_TOLERANCE
+from services.circuit_breaker import get_breaker
+from services.quality_profiles import get_profile
+from services.live_ingest import get_live_ingest
 
 logger = logging.getLogger(__name__)
 
 
+class BufferedFrame:
+
+    def __init__(self, timestamp: float, frame: str):
+        self.timestamp = timestamp
+        self.frame = frame
+        self.analysis: Dict[str, Any] = {}
+
+
+class _FrameRing:
+
+    def __init__(self):
+        self.frames: Dict[float, BufferedFrame] = {}
+        self.pending: Dict[float, asyncio.Task] = {}
+        self.positions: Dict[int, Tuple[float, float]] = {}
+        self.last_used = time.monotonic()
+
+    def prune(self, current_time: float, buffer_seconds: float, position_seconds: float):
+        now = time.monotonic()
+        self.positions[int(current_time // buffer_seconds)] = (current_time, now)
+        for bucket in [b for b, (_, seen) in self.positions.items() if now - seen > position_seconds]:
+            del self.positions[bucket]
+        active = [position for position, _ in self.positions.values()]
+        for timestamp in [t for t in self.frames if all(abs(t - p) > buffer_seconds for p in active)]:
+            del self.frames[timestamp]
+
+    def fill(self, timestamp: float, extract: Callable[[], Awaitable[Tuple[Optional[str], float]]]) -> Tuple[asyncio.Future, bool]:
+        task = self.pending.get(timestamp)
+        if task is not None:
+            return task, False
+        task = asyncio.ensure_future(extract())
+        self.pending[timestamp] = task
+        task.add_done_callback(lambda done: self._store(timestamp, done))
+        return task, True
+
+    def _store(self, timestamp: float, task: asyncio.Task):
+        self.pending.pop(timestamp, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        frame, actual = task.result()
+        if frame:
+            self.frames[timestamp] = BufferedFrame(actual, frame)
+
+    def nearest(self, timestamp: float, tolerance: float, exclude: Set[int]) -> Optional[BufferedFrame]:
+        best = None
+        for buffered in self.frames.values():
+            distance = abs(buffered.timestamp - timestamp)
+            if distance <= tolerance and id(buffered) not in exclude and (best is None or distance < abs(best.timestamp - timestamp)):
+                best = buffered
+        return best
+
+
 class FrameWindowService:
     
     def __init__(self):
@@ -18,15 +75,33 @@ class FrameWindowService:
         )
         self.overshoot_enabled = os.getenv("OVERSHOOT_API_KEY") is not None
         self.http_client = httpx.AsyncClient(timeout=30.0)
+        self.overshoot_breaker = get_breaker("overshoot")
+        self.buffer_seconds = float(os.getenv("FRAME_WINDOW_BUFFER_SECONDS", "30"))
+        self.position_seconds = float(os.getenv("FRAME_WINDOW_POSITION_SECONDS", "30"))
+        self.max_sessions = int(os.getenv("FRAME_WINDOW_MAX_SESSIONS", "64"))
+        self.idle_seconds = float(os.getenv("FRAME_WINDOW_IDLE_SECONDS", "300"))
+        self.rings: "OrderedDict[Tuple[str, str], _FrameRing]" = OrderedDict()
+        self.decoded_frames = 0
+        self.reused_frames = 0
+        self.reused_analysis = 0
     
     async def get_frame_window(
         self,
         video_url_or_id: str,
         current_time: float,
         window_size: float = 5.0,
-        sample_interval: float = 1.5
+        sample_interval: Optional[float] = None,
+        seek_mode: str = SEEK_EXACT
     ) -> Tuple[List[str], List[float]]:
-        if self.overshoot_enabled:
+        sample_interval = sample_interval or get_profile().sample_interval
+        live_frames = get_live_ingest().window(video_url_or_id, window_size, sample_interval)
+        if live_frames:
+            logger.info(f"[FRAME WINDOW] ✓ Got {len(live_frames)} frames from live ingest buffer")
+            return [frame for _, frame in live_frames], [position for position, _ in live_frames]
+        
+        if self.overshoot_enabled and not self.overshoot_breaker.allow_request():
+            logger.info("[FRAME WINDOW] Overshoot circuit open - using YouTube extractor directly")
+        elif self.overshoot_enabled:
             try:
                 logger.info(f"[FRAME WINDOW] Trying Overshoot for {video_url_or_id} at {current_time:.1f}s")
                 frames, timestamps = await self._get_frames_from_overshoot(
@@ -48,29 +123,25 @@ class FrameWindowService:
             
             logger.info(f"[FRAME WINDOW] Using YouTube extractor: {start_time:.1f}s - {end_time:.1f}s")
             
-            frame_results = await self.frame_extractor.extract_frames_range(
+            buffered = await self.get_window_frames(
                 video_url_or_id,
                 start_time,
                 end_time,
-                sample_interval=sample_interval
+                sample_interval,
+                seek_mode
             )
             
-            frames = []
-            timestamps = []
-            
-            for timestamp, frame_base64 in frame_results:
-                if frame_base64:
-                    frames.append(frame_base64)
-                    timestamps.append(timestamp)
+            frames = [b.frame for b in buffered]
+            timestamps = [b.timestamp for b in buffered]
             
             logger.info(f"[FRAME WINDOW] ✓ Extracted {len(frames)} frames from YouTube")
             
             if len(frames) == 0:
                 logger.warning(f"[FRAME WINDOW] No frames, trying single frame at {current_time}s")
-                single_frame = await self.frame_extractor.extract_frame(video_url_or_id, current_time)
+                single_frame, actual = await self.frame_extractor.extract_frame_at(video_url_or_id, current_time, seek_mode=seek_mode)
                 if single_frame:
                     frames = [single_frame]
-                    timestamps = [current_time]
+                    timestamps = [actual]
             
             return frames, timestamps
             
@@ -80,6 +151,108 @@ class FrameWindowService:
             traceback.print_exc()
             return [], []
     
+    async def get_window_frames(
+        self,
+        video_url_or_id: str,
+        start_time: float,
+        end_time: float,
+        sample_interval: float,
+        seek_mode: str = SEEK_EXACT
+    ) -> List[BufferedFrame]:
+        ring = self._ring(video_url_or_id)
+        ring.prune(end_time, self.buffer_seconds, self.position_seconds)
+        
+        wanted = self.window_times(start_time, end_time, sample_interval)
+        if seek_mode == SEEK_FAST:
+            used = {id(ring.frames[t]) for t in wanted if t in ring.frames}
+            for t in wanted:
+                if t in ring.frames or t in ring.pending:
+                    continue
+                nearby = ring.nearest(t, FAST_SEEK_TOLERANCE, used)
+                if nearby is not None:
+                    ring.frames[t] = nearby
+                    used.add(id(nearby))
+        missing = [t for t in wanted if t not in ring.frames]
+        self.reused_frames += len(wanted) - len(missing)
+        if missing:
+            fills = [ring.fill(t, lambda t=t: self._extract(video_url_or_id, t, seek_mode)) for t in missing]
+            started = sum(1 for _, new in fills if new)
+            self.decoded_frames += started
+            logger.info(f"[FRAME WINDOW] Reusing {len(wanted) - len(missing)}/{len(wanted)} buffered frames, decoding {started}")
+            await asyncio.gather(*[asyncio.shield(task) for task, _ in fills])
+        
+        window = []
+        for t in wanted:
+            buffered = ring.frames.get(t)
+            if buffered is not None and buffered not in window:
+                window.append(buffered)
+        return window
+    
+    def frame_analysis(
+        self,
+        video_url_or_id: str,
+        frames: List[str],
+        timestamps: List[float],
+        name: str,
+        compute: Callable[[str], Any]
+    ) -> List[Any]:
+        ring = self.rings.get((video_url_or_id, get_profile().name))
+        by_timestamp = {b.timestamp: b for b in ring.frames.values()} if ring is not None else {}
+        results = []
+        for frame, timestamp in zip(frames, timestamps):
+            buffered = by_timestamp.get(timestamp)
+            if buffered is None or buffered.frame is not frame:
+                results.append(compute(frame))
+                continue
+            if name in buffered.analysis:
+                self.reused_analysis += 1
+            else:
+                buffered.analysis[name] = compute(frame)
+            results.append(buffered.analysis[name])
+        return results
+    
+    @staticmethod
+    def window_times(start_time: float, end_time: float, sample_interval: float) -> List[float]:
+        first = math.ceil(start_time / sample_interval - 1e-6)
+        last = math.floor(end_time / sample_interval + 1e-6)
+        times = [round(k * sample_interval, 3) for k in range(first, last + 1)]
+        return times or [round(end_time, 3)]
+    
+    async def _extract(self, video_url_or_id: str, timestamp: float, seek_mode: str = SEEK_EXACT) -> Tuple[Optional[str], float]:
+        try:
+            return await self.frame_extractor.extract_frame_at(video_url_or_id, timestamp, seek_mode=seek_mode)
+        except Exception as e:
+            logger.error(f"[FRAME WINDOW] Error extracting frame at {timestamp}s: {e}")
+            return None, timestamp
+    
+    def _ring(self, video_url_or_id: str) -> "_FrameRing":
+        key = (video_url_or_id, get_profile().name)
+        now = time.monotonic()
+        while self.rings:
+            oldest_key, oldest = next(iter(self.rings.items()))
+            if oldest_key != key and (now - oldest.last_used > self.idle_seconds or len(self.rings) > self.max_sessions):
+                self.rings.popitem(last=False)
+                continue
+            break
+        ring = self.rings.get(key)
+        if ring is None:
+            ring = _FrameRing()
+            self.rings[key] = ring
+        else:
+            self.rings.move_to_end(key)
+        ring.last_used = now
+        return ring
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self.rings),
+            "buffered_frames": sum(len(ring.frames) for ring in self.rings.values()),
+            "active_positions": sum(len(ring.positions) for ring in self.rings.values()),
+            "decoded_frames": self.decoded_frames,
+            "reused_frames": self.reused_frames,
+            "reused_analysis": self.reused_analysis,
+        }
+    
     async def _get_frames_from_overshoot(
         self,
         video_url: str,
@@ -98,6 +271,7 @@ class FrameWindowService:
             )
             
             if response.status_code == 200:
+                self.overshoot_breaker.record_success()
                 data = response.json()
                 if data.get("success"):
                     commentary = data.get("commentary") or data.get("rawAction")
@@ -111,18 +285,23 @@ class FrameWindowService:
                     logger.warning(f"[OVERSHOOT] Service error: {data.get('error')}")
                     return [], []
             elif response.status_code == 503:
+                self.overshoot_breaker.record_failure()
                 logger.warning("[OVERSHOOT] Service not available")
                 return [], []
             elif response.status_code == 400:
+                self.overshoot_breaker.record_success()
                 logger.warning(f"[OVERSHOOT] Invalid request: {response.text}")
                 return [], []
             else:
+                self.overshoot_breaker.record_failure()
                 logger.warning(f"[OVERSHOOT] Service error: {response.status_code}")
                 return [], []
                 
         except httpx.RequestError as e:
+            self.overshoot_breaker.record_failure()
             logger.warning(f"[OVERSHOOT] Connection error: {e}")
             return [], []
         except Exception as e:
+            self.overshoot_breaker.record_failure()
             logger.error(f"[OVERSHOOT] Error: {e}")
             return [], []
@@ -3,21 +3,29 @@ import google.generativeai as genai
 from typing import Optional
 import asyncio
 import logging
+from services.circuit_breaker import get_breaker
+from services.llm_response_cache import get_llm_cache
+from services.priority_scheduler import get_scheduler
 
 logger = logging.getLogger(__name__)
 
 
 class GeminiCommentaryEnhancer:
     
+    MODEL = "gemini-1.5-flash"
+    PROMPT_VERSION = "enhance-v1"
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         self.model = None
+        self.breaker = get_breaker("gemini")
+        self.response_cache = get_llm_cache()
         
         if self.api_key:
             try:
                 genai.configure(api_key=self.api_key)
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
-                logger.info("[GEMINI COMMENTARY] Initialized with gemini-1.5-flash")
+                self.model = genai.GenerativeModel(self.MODEL)
+                logger.info(f"[GEMINI COMMENTARY] Initialized with {self.MODEL}")
             except Exception as e:
                 logger.error(f"[GEMINI COMMENTARY] Failed to initialize: {e}")
                 self.model = None
@@ -33,12 +41,22 @@ class GeminiCommentaryEnhancer:
         if not self.model or not raw_action:
             return self._enhance_stub(raw_action)
         
+        cache_key = self.response_cache.make_key(
+            self.MODEL, self.PROMPT_VERSION, raw_action, f"{style}:{detail_level}"
+        )
+        cached = self.response_cache.get(cache_key)
+        if cached:
+            logger.info(f"[GEMINI COMMENTARY] Cache hit: {cached[:60]}...")
+            return cached
+        
+        if not self.breaker.allow_request():
+            logger.info("[GEMINI COMMENTARY] Circuit open - using stub enhancement")
+            return self._enhance_stub(raw_action)
+        
         try:
             prompt = f
 
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
+            response = await get_scheduler("llm").run(
                 lambda: self.model.generate_content(
                     prompt,
                     generation_config={
@@ -48,14 +66,17 @@ class GeminiCommentaryEnhancer:
                 )
             )
             
+            self.breaker.record_success()
             commentary = response.text.strip()
             
             commentary = commentary.strip('"').strip("'").strip()
             
             logger.info(f"[GEMINI COMMENTARY] Enhanced: {commentary[:60]}...")
+            self.response_cache.set(cache_key, commentary)
             return commentary
             
         except Exception as e:
+            self.breaker.record_failure()
             logger.error(f"[GEMINI COMMENTARY] Error enhancing commentary: {e}")
             import traceback
             traceback.print_exc()
@@ -3,6 +3,8 @@ import google.generativeai as genai
 from typing import List, Optional
 import asyncio
 import logging
+from services.circuit_breaker import get_breaker
+from services.priority_scheduler import get_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +15,7 @@ class GeminiVisionAnalyzer:
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         self.client = None
         self.model = None
+        self.breaker = get_breaker("gemini")
         
         if self.api_key:
             try:
@@ -28,48 +31,38 @@ class GeminiVisionAnalyzer:
     async def analyze_frame_window(
         self, 
         frames: List[str], 
-        timestamps: List[float]
+        timestamps: List[float],
+        images: Optional[List] = None
     ) -> str:
         if not self.model or not frames:
             return self._generate_stub_action()
         
+        if not self.breaker.allow_request():
+            logger.info("[GEMINI VISION] Circuit open - using stub action")
+            return self._generate_stub_action()
+        
         try:
             prompt = 
 
             if len(frames) > 1:
-                images = []
-                for frame_base64 in frames:
-                    import base64
-                    from PIL import Image
-                    import io
-                    
-                    image_data = base64.b64decode(frame_base64)
-                    image = Image.open(io.BytesIO(image_data))
-                    images.append(image)
+                if images is None:
+                    images = [self.decode_frame(frame_base64) for frame_base64 in frames]
                 
                 content = [prompt] + images
                 
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
+                response = await get_scheduler("llm").run(
                     lambda: self.model.generate_content(content)
                 )
             else:
-                import base64
-                from PIL import Image
-                import io
-                
-                image_data = base64.b64decode(frames[0])
-                image = Image.open(io.BytesIO(image_data))
+                image = images[0] if images else self.decode_frame(frames[0])
                 
                 content = [prompt, image]
                 
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
+                response = await get_scheduler("llm").run(
                     lambda: self.model.generate_content(content)
                 )
             
+            self.breaker.record_success()
             raw_action = response.text.strip()
             
             words = raw_action.split()
@@ -80,11 +73,22 @@ class GeminiVisionAnalyzer:
             return raw_action
             
         except Exception as e:
+            self.breaker.record_failure()
             logger.error(f"[GEMINI VISION] Error analyzing frames: {e}")
             import traceback
             traceback.print_exc()
             return self._generate_stub_action()
     
+    @staticmethod
+    def decode_frame(frame_base64: str):
+        import base64
+        from PIL import Image
+        import io
+        
+        image = Image.open(io.BytesIO(base64.b64decode(frame_base64)))
+        image.load()
+        return image
+    
     async def analyze_single_frame(self, frame_base64: str) -> str:
         return await self.analyze_frame_window([frame_base64], [0.0])
     
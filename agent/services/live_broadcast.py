@@ -0,0 +1,81 @@
+from typing import Optional, Dict, Any, Tuple
+import asyncio
+import logging
+import math
+import os
+from services.commentary_deduplicator import CommentaryDeduplicator, DeduplicatorTable
+
+logger = logging.getLogger(__name__)
+
+
+class _SharedWindow:
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.subscribers = 0
+
+
+class LiveBroadcaster:
+
+    def __init__(self, orchestrator, bucket_seconds: Optional[float] = None):
+        self.orchestrator = orchestrator
+        self.bucket_seconds = bucket_seconds or float(os.getenv("LIVE_BROADCAST_BUCKET_SECONDS", "2.0"))
+        self.windows: Dict[Tuple[str, float, float, Optional[str]], _SharedWindow] = {}
+        self.client_deduplicators = DeduplicatorTable()
+        self.computed = 0
+        self.joined = 0
+        self.abandoned = 0
+
+    def bucket(self, current_time: float) -> float:
+        return math.floor(current_time / self.bucket_seconds) * self.bucket_seconds
+
+    async def generate(
+        self,
+        video_url: str,
+        current_time: float,
+        window_size: float,
+        deduplicator: CommentaryDeduplicator,
+        seek_mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        bucket_time = self.bucket(current_time)
+        window = await self.get_window(video_url, bucket_time, window_size, seek_mode)
+        return self.orchestrator.deduplicate(window, bucket_time, deduplicator)
+
+    def client_deduplicator(self, client_id: str, video_url: str) -> CommentaryDeduplicator:
+        return self.client_deduplicators.get((client_id, video_url))
+
+    async def get_window(self, video_url: str, bucket_time: float, window_size: float, seek_mode: Optional[str] = None) -> Dict[str, Any]:
+        key = (video_url, bucket_time, window_size, seek_mode)
+        shared = self.windows.get(key)
+        if shared is None:
+            self.computed += 1
+            task = asyncio.create_task(self.orchestrator.compute_window(video_url, bucket_time, window_size, seek_mode))
+            shared = _SharedWindow(task)
+            self.windows[key] = shared
+            task.add_done_callback(lambda _: self.windows.pop(key, None) if self.windows.get(key) is shared else None)
+        else:
+            self.joined += 1
+            logger.info(f"[BROADCAST] Joining in-flight window {video_url}@{bucket_time:g}s ({shared.subscribers + 1} subscribers)")
+
+        shared.subscribers += 1
+        try:
+            return await asyncio.shield(shared.task)
+        except asyncio.CancelledError:
+            if not shared.task.done() and shared.subscribers == 1:
+                self.abandoned += 1
+                self.windows.pop(key, None)
+                shared.task.cancel()
+            raise
+        finally:
+            shared.subscribers -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "bucket_seconds": self.bucket_seconds,
+            "in_flight_windows": len(self.windows),
+            "subscribers": sum(shared.subscribers for shared in self.windows.values()),
+            "computed": self.computed,
+            "joined": self.joined,
+            "abandoned": self.abandoned,
+            "client_deduplicators": self.client_deduplicators.stats(),
+        }
@@ -0,0 +1,260 @@
+from collections import OrderedDict, deque
+from typing import Optional, Dict, Any, List, Tuple, Callable
+import asyncio
+import logging
+import os
+import threading
+import time
+from services.quality_profiles import get_profile
+
+logger = logging.getLogger(__name__)
+
+
+class LiveIngestWorker:
+
+    def __init__(
+        self,
+        video_id: str,
+        resolve: Callable[[], Optional[str]],
+        encode: Callable[[Any], Optional[str]],
+        sample_interval: float,
+        buffer_seconds: float,
+        reconnect_seconds: float = 5.0
+    ):
+        self.video_id = video_id
+        self.resolve = resolve
+        self.encode = encode
+        self.sample_interval = sample_interval
+        self.buffer_seconds = buffer_seconds
+        self.reconnect_seconds = reconnect_seconds
+
+        self.frames: deque = deque()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.last_access = time.monotonic()
+        self.decoded = 0
+        self.reconnects = 0
+        self.error: Optional[str] = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name=f"live-ingest-{self.video_id[:16]}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def latest(self) -> Optional[Tuple[float, str]]:
+        self.last_access = time.monotonic()
+        with self._lock:
+            return self.frames[-1] if self.frames else None
+
+    def window(self, window_size: float, sample_interval: float) -> List[Tuple[float, str]]:
+        self.last_access = time.monotonic()
+        with self._lock:
+            frames = list(self.frames)
+        if not frames:
+            return []
+        start = frames[-1][0] - window_size
+        selected = []
+        for position, frame in frames:
+            if position < start:
+                continue
+            if selected and position - selected[-1][0] < sample_interval:
+                continue
+            selected.append((position, frame))
+        if selected[-1][0] != frames[-1][0]:
+            selected.append(frames[-1])
+        return selected
+
+    def _run(self):
+        import cv2
+
+        while not self._stop.is_set():
+            cap = None
+            try:
+                stream_url = self.resolve()
+                if not stream_url:
+                    raise RuntimeError("could not resolve live stream")
+                cap = cv2.VideoCapture(stream_url)
+                if not cap.isOpened():
+                    raise RuntimeError("could not open live stream")
+                logger.info(f"[LIVE INGEST] {self.video_id} connected")
+                self.error = None
+                connected_at = time.monotonic()
+                with self._lock:
+                    offset = self.frames[-1][0] + self.sample_interval if self.frames else 0.0
+
+                next_sample = None
+                while not self._stop.is_set():
+                    if not cap.grab():
+                        raise RuntimeError("live stream ended or stalled")
+                    position = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                    if position <= 0:
+                        position = time.monotonic() - connected_at
+                    position += offset
+                    if next_sample is not None and position < next_sample:
+                        continue
+                    success, frame = cap.retrieve()
+                    if not success or frame is None:
+                        continue
+                    encoded = self.encode(frame)
+                    if not encoded:
+                        continue
+                    next_sample = position + self.sample_interval
+                    self.decoded += 1
+                    with self._lock:
+                        self.frames.append((position, encoded))
+                        while self.frames and self.frames[0][0] < position - self.buffer_seconds:
+                            self.frames.popleft()
+            except Exception as e:
+                self.error = str(e)
+                logger.warning(f"[LIVE INGEST] {self.video_id}: {e} - reconnecting in {self.reconnect_seconds:g}s")
+            finally:
+                if cap is not None:
+                    cap.release()
+            if self._stop.wait(self.reconnect_seconds):
+                break
+            self.reconnects += 1
+        logger.info(f"[LIVE INGEST] {self.video_id} stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            span = (self.frames[0][0], self.frames[-1][0]) if self.frames else None
+            buffered = len(self.frames)
+        return {
+            "running": self.running,
+            "buffered_frames": buffered,
+            "buffered_span": [round(span[0], 2), round(span[1], 2)] if span else None,
+            "decoded": self.decoded,
+            "reconnects": self.reconnects,
+            "idle_seconds": round(time.monotonic() - self.last_access, 1),
+            "error": self.error,
+        }
+
+
+class LiveIngestManager:
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+        sample_interval: Optional[float] = None,
+        buffer_seconds: Optional[float] = None
+    ):
+        self.enabled = os.getenv("LIVE_INGEST_ENABLED", "true").lower() != "false"
+        self.max_workers = max_workers or int(os.getenv("LIVE_INGEST_MAX_WORKERS", "4"))
+        self.idle_seconds = idle_seconds or float(os.getenv("LIVE_INGEST_IDLE_SECONDS", "60"))
+        self.sample_interval = sample_interval or float(os.getenv("LIVE_INGEST_SAMPLE_SECONDS", "1.0"))
+        self.buffer_seconds = buffer_seconds or float(os.getenv("LIVE_INGEST_BUFFER_SECONDS", "60"))
+        self.workers: "OrderedDict[str, LiveIngestWorker]" = OrderedDict()
+        self.live_videos: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+        self.reaper: Optional[asyncio.Task] = None
+        self.rejected = 0
+
+    def mark_live(self, video_id: str, is_live: bool):
+        with self._lock:
+            self.live_videos[video_id] = is_live
+
+    def is_live(self, video_id: str) -> bool:
+        return self.live_videos.get(video_id, False)
+
+    def worker_for(self, video_id: str) -> Optional[LiveIngestWorker]:
+        if not self.enabled or not self.is_live(video_id):
+            return None
+        with self._lock:
+            worker = self.workers.get(video_id)
+            if worker is not None and worker.running:
+                self.workers.move_to_end(video_id)
+                return worker
+            self._reap_locked()
+            if len(self.workers) >= self.max_workers:
+                self.rejected += 1
+                logger.warning(f"[LIVE INGEST] Worker cap ({self.max_workers}) reached - {video_id} uses on-demand extraction")
+                return None
+            worker = self._create_worker(video_id)
+            self.workers[video_id] = worker
+        worker.start()
+        logger.info(f"[LIVE INGEST] Started worker for {video_id} ({len(self.workers)}/{self.max_workers})")
+        return worker
+
+    def add_worker(self, worker: LiveIngestWorker):
+        with self._lock:
+            self.live_videos[worker.video_id] = True
+            self.workers[worker.video_id] = worker
+        worker.start()
+
+    def latest_frame(self, video_id: str) -> Optional[Tuple[float, str]]:
+        worker = self.worker_for(video_id)
+        return worker.latest() if worker is not None else None
+
+    def window(self, video_id: str, window_size: float, sample_interval: float) -> List[Tuple[float, str]]:
+        worker = self.worker_for(video_id)
+        return worker.window(window_size, sample_interval) if worker is not None else []
+
+    def _create_worker(self, video_id: str) -> LiveIngestWorker:
+        from services.youtube_extractor import YouTubeFrameExtractor
+
+        extractor = YouTubeFrameExtractor()
+        profile = get_profile()
+        return LiveIngestWorker(
+            video_id,
+            resolve=lambda: extractor.resolve_stream_url(video_id),
+            encode=lambda frame: extractor.encode_frame(frame, profile.frame_max_size, profile.frame_jpeg_quality),
+            sample_interval=self.sample_interval,
+            buffer_seconds=self.buffer_seconds
+        )
+
+    def _reap_locked(self):
+        now = time.monotonic()
+        for video_id, worker in list(self.workers.items()):
+            if not worker.running or now - worker.last_access > self.idle_seconds:
+                worker.stop()
+                del self.workers[video_id]
+                logger.info(f"[LIVE INGEST] Stopped idle worker for {video_id}")
+
+    async def start(self):
+        if self.reaper is None:
+            self.reaper = asyncio.create_task(self._reap_loop())
+
+    async def stop(self):
+        if self.reaper is not None:
+            self.reaper.cancel()
+            try:
+                await self.reaper
+            except (asyncio.CancelledError, Exception):
+                pass
+            self.reaper = None
+        with self._lock:
+            for worker in self.workers.values():
+                worker.stop()
+            self.workers.clear()
+
+    async def _reap_loop(self):
+        while True:
+            await asyncio.sleep(max(1.0, self.idle_seconds / 4))
+            with self._lock:
+                self._reap_locked()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_workers": self.max_workers,
+            "rejected": self.rejected,
+            "workers": {video_id: worker.stats() for video_id, worker in list(self.workers.items())},
+        }
+
+
+_live_ingest: Optional[LiveIngestManager] = None
+
+
+def get_live_ingest() -> LiveIngestManager:
+    global _live_ingest
+    if _live_ingest is None:
+        _live_ingest = LiveIngestManager()
+    return _live_ingest
@@ -0,0 +1,200 @@
+from typing import Optional, Dict, Any, Callable, Awaitable, Set
+import asyncio
+import logging
+import os
+import time
+import uuid
+from services.priority_scheduler import current_priority, LIVE
+from services.quality_profiles import current_profile, get_profile
+from services.commentary_deduplicator import CommentaryDeduplicator
+
+logger = logging.getLogger(__name__)
+
+
+class LiveCommentarySession:
+
+    def __init__(
+        self,
+        broadcaster,
+        video_id: str,
+        send: Callable[[Dict[str, Any]], Awaitable[None]],
+        window_size: Optional[float] = None,
+        cadence: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+        profile: Optional[str] = None,
+        seek_mode: Optional[str] = None
+    ):
+        self.session_id = uuid.uuid4().hex
+        self.broadcaster = broadcaster
+        self.video_id = video_id
+        self.send = send
+        self.profile = get_profile(profile).name
+        self.seek_mode = seek_mode
+        self.window_size = window_size or get_profile(profile).window_size
+        self.cadence = cadence or float(os.getenv("LIVE_SESSION_CADENCE_SECONDS", "4.0"))
+        self.max_in_flight = max_in_flight or int(os.getenv("LIVE_SESSION_MAX_IN_FLIGHT", "2"))
+        self.deduplicator = CommentaryDeduplicator()
+
+        self.position = 0.0
+        self.position_updated_at = time.monotonic()
+        self.playing = False
+        self.generation = 0
+        self.closed = False
+
+        self.in_flight: Set[asyncio.Task] = set()
+        self.playing_event = asyncio.Event()
+        self.wake_event = asyncio.Event()
+        self.runner: Optional[asyncio.Task] = None
+
+    def current_position(self) -> float:
+        if not self.playing:
+            return self.position
+        return self.position + (time.monotonic() - self.position_updated_at)
+
+    def start(self):
+        if self.runner is None:
+            self.runner = asyncio.create_task(self._run())
+
+    def update_position(self, position: float, playing: bool = True):
+        drift = abs(self.current_position() - position)
+        if drift > self.cadence + self.window_size:
+            self.seek(position, playing)
+            return
+        self.position = position
+        self.position_updated_at = time.monotonic()
+        self._set_playing(playing)
+
+    def seek(self, position: float, playing: Optional[bool] = None):
+        logger.info(f"[LIVE SESSION] {self.session_id[:8]} seek to {position:.1f}s - cancelling {len(self.in_flight)} stale window(s)")
+        self.generation += 1
+        self._cancel_in_flight()
+        self.position = position
+        self.position_updated_at = time.monotonic()
+        self._set_playing(self.playing if playing is None else playing)
+        self.wake_event.set()
+
+    def pause(self, position: Optional[float] = None):
+        if position is not None:
+            self.position = position
+        else:
+            self.position = self.current_position()
+        self.position_updated_at = time.monotonic()
+        self._set_playing(False)
+        self.wake_event.set()
+
+    def resume(self, position: Optional[float] = None):
+        if position is not None and abs(position - self.position) > self.window_size:
+            self.seek(position, True)
+            return
+        if position is not None:
+            self.position = position
+        self.position_updated_at = time.monotonic()
+        self._set_playing(True)
+        self.wake_event.set()
+
+    async def close(self):
+        self.closed = True
+        self.generation += 1
+        self._cancel_in_flight()
+        self.playing_event.set()
+        self.wake_event.set()
+        if self.runner is not None:
+            self.runner.cancel()
+            try:
+                await self.runner
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def _set_playing(self, playing: bool):
+        self.playing = playing
+        if playing:
+            self.playing_event.set()
+        else:
+            self.playing_event.clear()
+
+    def _cancel_in_flight(self):
+        for task in self.in_flight:
+            task.cancel()
+        self.in_flight.clear()
+
+    async def _run(self):
+        while not self.closed:
+            await self.playing_event.wait()
+            if self.closed:
+                break
+
+            if len(self.in_flight) >= self.max_in_flight:
+                await asyncio.wait(set(self.in_flight), return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            target = self.current_position()
+            task = asyncio.create_task(self._compute_window(target, self.generation))
+            self.in_flight.add(task)
+            task.add_done_callback(self.in_flight.discard)
+
+            self.wake_event.clear()
+            try:
+                await asyncio.wait_for(self.wake_event.wait(), timeout=self.cadence)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _compute_window(self, target: float, generation: int):
+        current_priority.set(LIVE)
+        current_profile.set(self.profile)
+        try:
+            result = await self.broadcaster.generate(
+                self.video_id,
+                target,
+                self.window_size,
+                self.deduplicator,
+                self.seek_mode
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[LIVE SESSION] {self.session_id[:8]} window at {target:.1f}s failed: {e}")
+            result = {"commentary": None, "raw_action": None, "timestamp": target, "skipped": False, "error": str(e)}
+
+        if self.closed or generation != self.generation:
+            logger.info(f"[LIVE SESSION] {self.session_id[:8]} dropping stale window at {target:.1f}s")
+            return
+
+        await self.send({
+            "type": "commentary",
+            "commentary": result.get("commentary"),
+            "rawAction": result.get("raw_action"),
+            "timestamp": result.get("timestamp", target),
+            "skipped": result.get("skipped", False),
+            "error": result.get("error"),
+        })
+
+
+class LiveSessionManager:
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self.sessions: Dict[str, LiveCommentarySession] = {}
+
+    def open_session(
+        self,
+        video_id: str,
+        send: Callable[[Dict[str, Any]], Awaitable[None]],
+        window_size: Optional[float] = None,
+        profile: Optional[str] = None,
+        seek_mode: Optional[str] = None
+    ) -> LiveCommentarySession:
+        session = LiveCommentarySession(self.broadcaster, video_id, send, window_size=window_size, profile=profile, seek_mode=seek_mode)
+        self.sessions[session.session_id] = session
+        logger.info(f"[LIVE SESSION] Opened {session.session_id[:8]} for {video_id} ({len(self.sessions)} active)")
+        return session
+
+    async def close_session(self, session: LiveCommentarySession):
+        await session.close()
+        self.sessions.pop(session.session_id, None)
+        logger.info(f"[LIVE SESSION] Closed {session.session_id[:8]} ({len(self.sessions)} active)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active_sessions": len(self.sessions),
+            "in_flight_windows": sum(len(s.in_flight) for s in self.sessions.values()),
+        }
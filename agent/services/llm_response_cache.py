@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        ttl: float = 6 * 3600,
+        persist_path: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self.entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = None
+
+        if persist_path:
+            try:
+                self._db = sqlite3.connect(persist_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_responses ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._db.execute("DELETE FROM llm_responses WHERE expires_at < ?", (time.time(),))
+                self._db.commit()
+                logger.info(f"[LLM CACHE] Persisting responses to {persist_path}")
+            except Exception as e:
+                logger.error(f"[LLM CACHE] Could not open {persist_path}: {e} - using memory only")
+                self._db = None
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+    @classmethod
+    def make_key(cls, model: str, prompt_version: str, text: str, style: str = "") -> str:
+        payload = json.dumps([model, prompt_version, cls.normalize(text), style])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if now <= expires_at:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and now <= row[1]:
+                    self._store(key, row[0], row[1])
+                    self.hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str):
+        if not value:
+            return
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO llm_responses (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, value, expires_at)
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    logger.warning(f"[LLM CACHE] Persist failed: {e}")
+
+    def _store(self, key: str, value: str, expires_at: float):
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_responses")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "persistent": self._db is not None,
+            }
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache(
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000")),
+            ttl=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(6 * 3600))),
+            persist_path=os.getenv("LLM_CACHE_PATH") or None
+        )
+    return _llm_cache
@@ -4,6 +4,7 @@ import numpy as np
 import base64
 from typing import List, Dict, Any, Optional
 import logging
+import threading
 from ultralytics import YOLO
 
 logger = logging.getLogger(__name__)
@@ -12,8 +13,12 @@ logger = logging.getLogger(__name__)
 class ObjectDetector:
     
     
+    DEFAULT_MODEL = 'yolov8n.pt'
+    
     def __init__(self):
         self.model = None
+        self.models: Dict[str, Any] = {}
+        self._load_lock = threading.Lock()
         self.initialized = False
         self._initialize_model()
     
@@ -22,7 +27,8 @@ class ObjectDetector:
         try:
 
 
-            self.model = YOLO('yolov8n.pt')
+            self.model = YOLO(self.DEFAULT_MODEL)
+            self.models[self.DEFAULT_MODEL] = self.model
 
             self.initialized = True
             logger.info("[OBJECT_DETECTOR] YOLOv8 initialized successfully")
@@ -30,12 +36,27 @@ class ObjectDetector:
             logger.error(f"[OBJECT_DETECTOR] Failed to initialize YOLOv8: {e}")
             self.initialized = False
     
-    def detect_objects(self, base64_image: str, confidence_threshold: float = 0.25) -> Dict[str, Any]:
+    def _get_model(self, model_name: Optional[str]):
+        
+        if not model_name or model_name in self.models:
+            return self.models.get(model_name, self.model)
+        with self._load_lock:
+            if model_name not in self.models:
+                try:
+                    self.models[model_name] = YOLO(model_name)
+                    logger.info(f"[OBJECT_DETECTOR] Loaded {model_name}")
+                except Exception as e:
+                    logger.error(f"[OBJECT_DETECTOR] Failed to load {model_name}, using {self.DEFAULT_MODEL}: {e}")
+                    self.models[model_name] = self.model
+        return self.models[model_name]
+    
+    def detect_objects(self, base64_image: str, confidence_threshold: float = 0.25, model_name: Optional[str] = None) -> Dict[str, Any]:
         
         if not self.initialized:
             return self._empty_detection()
         
         try:
+            model = self._get_model(model_name)
 
             image_bytes = base64.b64decode(base64_image)
             nparr = np.frombuffer(image_bytes, np.uint8)
@@ -47,7 +68,7 @@ class ObjectDetector:
             
 
             try:
-                results = self.model(image, conf=confidence_threshold, verbose=False)
+                results = model(image, conf=confidence_threshold, verbose=False)
             except AttributeError as e:
                 if "'Conv' object has no attribute 'bn'" in str(e):
 
@@ -75,7 +96,7 @@ class ObjectDetector:
                 for box in boxes:
 
                     class_id = int(box.cls[0])
-                    class_name = self.model.names[class_id]
+                    class_name = model.names[class_id]
                     confidence = float(box.conf[0])
                     
 
@@ -4,6 +4,7 @@ import numpy as np
 import base64
 from typing import List, Dict, Any, Optional
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -19,10 +20,14 @@ except ImportError:
 class PoseEstimator:
     
     
+    DEFAULT_COMPLEXITY = 2
+    
     def __init__(self):
         self.mp_pose = None
         self.pose = None
+        self.poses: Dict[int, Any] = {}
         self.mp_drawing = None
+        self._load_lock = threading.Lock()
         self.initialized = False
         self._initialize_model()
     
@@ -44,13 +49,8 @@ class PoseEstimator:
                 return
             
 
-            self.pose = self.mp_pose.Pose(
-                static_image_mode=False,
-                model_complexity=2,
-                enable_segmentation=False,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
+            self.pose = self._create_pose(self.DEFAULT_COMPLEXITY)
+            self.poses[self.DEFAULT_COMPLEXITY] = self.pose
             self.initialized = True
             logger.info("[POSE_ESTIMATOR] MediaPipe Pose initialized successfully")
         except Exception as e:
@@ -60,12 +60,37 @@ class PoseEstimator:
             traceback.print_exc()
             self.initialized = False
     
-    def estimate_pose(self, base64_image: str) -> Dict[str, Any]:
+    def _create_pose(self, model_complexity: int):
+        
+        return self.mp_pose.Pose(
+            static_image_mode=False,
+            model_complexity=model_complexity,
+            enable_segmentation=False,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+    
+    def _get_pose(self, model_complexity: Optional[int]):
+        
+        if model_complexity is None or model_complexity in self.poses:
+            return self.poses.get(model_complexity, self.pose)
+        with self._load_lock:
+            if model_complexity not in self.poses:
+                try:
+                    self.poses[model_complexity] = self._create_pose(model_complexity)
+                    logger.info(f"[POSE_ESTIMATOR] Created MediaPipe Pose with model_complexity={model_complexity}")
+                except Exception as e:
+                    logger.error(f"[POSE_ESTIMATOR] model_complexity={model_complexity} unavailable, using default: {e}")
+                    self.poses[model_complexity] = self.pose
+        return self.poses[model_complexity]
+    
+    def estimate_pose(self, base64_image: str, model_complexity: Optional[int] = None) -> Dict[str, Any]:
         
         if not self.initialized:
             return self._empty_pose()
         
         try:
+            pose = self._get_pose(model_complexity)
 
             image_bytes = base64.b64decode(base64_image)
             nparr = np.frombuffer(image_bytes, np.uint8)
@@ -80,7 +105,7 @@ class PoseEstimator:
             
 
             try:
-                results = self.pose.process(image_rgb)
+                results = pose.process(image_rgb)
             except ValueError as e:
                 if "Packet timestamp mismatch" in str(e) or "CalculatorGraph" in str(e):
 
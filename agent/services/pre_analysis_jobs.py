@@ -0,0 +1,356 @@
+from typing import Optional, Dict, Any, List
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+import cv2
+from services.deadline import Deadline
+from services.priority_scheduler import get_scheduler, current_priority, BACKGROUND
+from services.quality_profiles import get_profile
+
+logger = logging.getLogger(__name__)
+
+
+class PreAnalysisJob:
+
+    ACTIVE_STATES = ("queued", "running")
+
+    def __init__(
+        self,
+        video_id: str,
+        start_time: float = 0.0,
+        end_time: Optional[float] = None,
+        cadence: float = 1.0,
+        vision_cadence: float = 5.0,
+        job_id: Optional[str] = None
+    ):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.video_id = video_id
+        self.start_time = start_time
+        self.end_time = end_time
+        self.cadence = cadence
+        self.vision_cadence = vision_cadence
+        self.status = "queued"
+        self.cursor = start_time
+        self.last_vision_at: Optional[float] = None
+        self.processed = 0
+        self.vision_samples = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.cancel_requested = False
+        self.task: Optional[asyncio.Task] = None
+
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 1.0
+        if not self.end_time or self.end_time <= self.start_time:
+            return 0.0
+        return round(min(1.0, max(0.0, (self.cursor - self.start_time) / (self.end_time - self.start_time))), 4)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "jobId": self.job_id,
+            "videoId": self.video_id,
+            "status": self.status,
+            "startTime": self.start_time,
+            "endTime": self.end_time,
+            "cadence": self.cadence,
+            "visionCadence": self.vision_cadence,
+            "cursor": self.cursor,
+            "lastVisionAt": self.last_vision_at,
+            "processed": self.processed,
+            "visionSamples": self.vision_samples,
+            "progress": self.progress(),
+            "error": self.error,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PreAnalysisJob":
+        job = cls(
+            video_id=data["videoId"],
+            start_time=data.get("startTime", 0.0),
+            end_time=data.get("endTime"),
+            cadence=data.get("cadence", 1.0),
+            vision_cadence=data.get("visionCadence", 5.0),
+            job_id=data["jobId"]
+        )
+        job.status = data.get("status", "queued")
+        job.cursor = data.get("cursor", job.start_time)
+        job.last_vision_at = data.get("lastVisionAt")
+        job.processed = data.get("processed", 0)
+        job.vision_samples = data.get("visionSamples", 0)
+        job.error = data.get("error")
+        job.created_at = data.get("createdAt", job.created_at)
+        job.updated_at = data.get("updatedAt", job.updated_at)
+        return job
+
+
+class PreAnalysisJobManager:
+
+    def __init__(self, frame_extractor, vision_analyzer, analysis_pipeline, store, commentary_enhancer=None):
+        self.frame_extractor = frame_extractor
+        self.vision_analyzer = vision_analyzer
+        self.analysis_pipeline = analysis_pipeline
+        self.store = store
+        self.commentary_enhancer = commentary_enhancer
+
+        self.job_dir = os.getenv("PRE_ANALYSIS_DIR", "pre_analysis")
+        self.worker_count = int(os.getenv("PRE_ANALYSIS_WORKERS", "1"))
+        self.default_cadence = float(os.getenv("PRE_ANALYSIS_CADENCE_SECONDS", "1.0"))
+        self.default_vision_cadence = float(os.getenv("PRE_ANALYSIS_VISION_CADENCE_SECONDS", "5.0"))
+        self.checkpoint_every = int(os.getenv("PRE_ANALYSIS_CHECKPOINT_EVERY", "10"))
+
+        self.jobs: Dict[str, PreAnalysisJob] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+
+    async def start(self):
+        if self.workers:
+            return
+        self.queue = asyncio.Queue()
+        self._load_checkpoints()
+        for job in sorted(self.jobs.values(), key=lambda j: j.created_at):
+            if job.status in PreAnalysisJob.ACTIVE_STATES:
+                logger.info(f"[PRE-ANALYSIS] Resuming job {job.job_id[:8]} for {job.video_id} at {job.cursor:.1f}s")
+                job.status = "queued"
+                self.queue.put_nowait(job.job_id)
+        self.workers = [asyncio.create_task(self._worker(i)) for i in range(max(1, self.worker_count))]
+        logger.info(f"[PRE-ANALYSIS] Started {len(self.workers)} worker(s)")
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        for worker in self.workers:
+            try:
+                await worker
+            except (asyncio.CancelledError, Exception):
+                pass
+        self.workers = []
+
+    async def submit(
+        self,
+        video_id: str,
+        start_time: float = 0.0,
+        end_time: Optional[float] = None,
+        cadence: Optional[float] = None,
+        vision_cadence: Optional[float] = None
+    ) -> PreAnalysisJob:
+        for job in self.jobs.values():
+            if job.video_id == video_id and job.status in PreAnalysisJob.ACTIVE_STATES:
+                logger.info(f"[PRE-ANALYSIS] {video_id} already has active job {job.job_id[:8]}")
+                return job
+
+        await self.start()
+        job = PreAnalysisJob(
+            video_id=video_id,
+            start_time=max(0.0, start_time),
+            end_time=end_time,
+            cadence=cadence or self.default_cadence,
+            vision_cadence=vision_cadence or self.default_vision_cadence
+        )
+        self.jobs[job.job_id] = job
+        self._checkpoint(job)
+        self.queue.put_nowait(job.job_id)
+        logger.info(f"[PRE-ANALYSIS] Queued job {job.job_id[:8]} for {video_id} (cadence {job.cadence:g}s, vision every {job.vision_cadence:g}s)")
+        return job
+
+    def get(self, job_id: str) -> Optional[PreAnalysisJob]:
+        return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in sorted(self.jobs.values(), key=lambda j: j.created_at, reverse=True)]
+
+    def cancel(self, job_id: str) -> Optional[PreAnalysisJob]:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if job.status not in PreAnalysisJob.ACTIVE_STATES:
+            return job
+        job.cancel_requested = True
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+        else:
+            job.status = "cancelled"
+            self._checkpoint(job)
+        logger.info(f"[PRE-ANALYSIS] Cancel requested for job {job_id[:8]}")
+        return job
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self.queue.get()
+            job = self.jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            job.task = asyncio.create_task(self._run_job(job))
+            try:
+                await job.task
+            except asyncio.CancelledError:
+                if not job.cancel_requested:
+                    job.task.cancel()
+                    raise
+            except Exception as e:
+                logger.error(f"[PRE-ANALYSIS] Worker {index} job {job_id[:8]} crashed: {e}")
+            finally:
+                job.task = None
+
+    async def _run_job(self, job: PreAnalysisJob):
+        current_priority.set(BACKGROUND)
+        job.status = "running"
+        job.updated_at = time.time()
+        logger.info(f"[PRE-ANALYSIS] Running job {job.job_id[:8]} for {job.video_id} from {job.cursor:.1f}s")
+
+        cap = None
+        try:
+            cap, duration = await get_scheduler("resolve").run(self._open_capture, job.video_id, job.cursor)
+            if cap is None:
+                self._finish(job, "failed", "Could not open video stream")
+                return
+
+            if job.end_time is None or (duration and job.end_time > duration):
+                job.end_time = duration
+            if job.end_time is None:
+                self._finish(job, "failed", "Video duration unknown - pass endTime")
+                return
+
+            while job.cursor <= job.end_time:
+                frame = await get_scheduler("decode").run(self._read_at, cap, job.cursor)
+                if frame is None:
+                    logger.info(f"[PRE-ANALYSIS] Stream ended at {job.cursor:.1f}s for {job.video_id}")
+                    break
+
+                await self._analyze_sample(job, job.cursor, frame)
+                job.cursor += job.cadence
+                job.processed += 1
+                job.updated_at = time.time()
+                if job.processed % self.checkpoint_every == 0:
+                    self._checkpoint(job)
+
+            self._finish(job, "completed")
+        except asyncio.CancelledError:
+            if job.cancel_requested:
+                self._finish(job, "cancelled")
+            else:
+                self._checkpoint(job)
+            raise
+        except Exception as e:
+            logger.error(f"[PRE-ANALYSIS] Job {job.job_id[:8]} failed at {job.cursor:.1f}s: {e}")
+            self._finish(job, "failed", str(e))
+        finally:
+            if cap is not None:
+                cap.release()
+
+    def _open_capture(self, video_id: str, start_time: float):
+        stream_url = self.frame_extractor.resolve_stream_url(video_id)
+        if not stream_url:
+            return None, None
+        cap = cv2.VideoCapture(stream_url)
+        if not cap.isOpened():
+            cap.release()
+            logger.error(f"[PRE-ANALYSIS] Failed to open stream for {video_id}")
+            return None, None
+
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+        duration = frame_count / fps if fps > 0 and frame_count > 0 else None
+
+        if start_time > 0:
+            cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
+        return cap, duration
+
+    def _read_at(self, cap, target: float):
+        while True:
+            if not cap.grab():
+                return None
+            if cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0 >= target:
+                break
+        success, frame = cap.retrieve()
+        return frame if success else None
+
+    async def _analyze_sample(self, job: PreAnalysisJob, timestamp: float, frame):
+        profile = get_profile()
+        frame_base64 = await get_scheduler("decode").run(
+            self.frame_extractor.encode_frame,
+            frame,
+            profile.frame_max_size,
+            profile.frame_jpeg_quality
+        )
+        if not frame_base64:
+            return
+
+        detection_result, pose_result = await self.vision_analyzer.detect(frame_base64)
+        summary = self.vision_analyzer.summarize_detections(detection_result, pose_result)
+        record: Dict[str, Any] = {
+            "commentary": summary,
+            "source": "detections" if summary else None,
+            "detections": summary,
+        }
+
+        vision_due = job.last_vision_at is None or timestamp - job.last_vision_at >= job.vision_cadence
+        if vision_due and (self.vision_analyzer.azure_client or self.vision_analyzer.claude_client):
+            commentary = await self.vision_analyzer.analyze_frame(
+                frame_base64,
+                detections=(detection_result, pose_result),
+                fallback=False
+            )
+            if commentary:
+                record["commentary"] = commentary
+                record["source"] = "vision"
+                record["raw_action"] = commentary
+                record["analogy"] = await self.analysis_pipeline._generate_analogy(commentary, Deadline(30.0))
+                if self.commentary_enhancer is not None:
+                    record["live_commentary"] = await self.commentary_enhancer.enhance_commentary(
+                        commentary,
+                        style="Broadcast",
+                        detail_level="Normal"
+                    )
+                job.vision_samples += 1
+            job.last_vision_at = timestamp
+
+        if record["commentary"]:
+            self.store.upsert(job.video_id, int(round(timestamp)), **record)
+
+    def _finish(self, job: PreAnalysisJob, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.updated_at = time.time()
+        self._checkpoint(job)
+        logger.info(f"[PRE-ANALYSIS] Job {job.job_id[:8]} {status} ({job.processed} samples, {job.vision_samples} vision){': ' + error if error else ''}")
+
+    def _checkpoint(self, job: PreAnalysisJob):
+        try:
+            os.makedirs(self.job_dir, exist_ok=True)
+            path = os.path.join(self.job_dir, f"{job.job_id}.json")
+            with open(path + ".tmp", "w") as f:
+                json.dump(job.to_dict(), f)
+            os.replace(path + ".tmp", path)
+        except Exception as e:
+            logger.warning(f"[PRE-ANALYSIS] Checkpoint failed for {job.job_id[:8]}: {e}")
+
+    def _load_checkpoints(self):
+        if not os.path.isdir(self.job_dir):
+            return
+        for name in os.listdir(self.job_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.job_dir, name)) as f:
+                    job = PreAnalysisJob.from_dict(json.load(f))
+                self.jobs.setdefault(job.job_id, job)
+            except Exception as e:
+                logger.warning(f"[PRE-ANALYSIS] Could not load checkpoint {name}: {e}")
+        logger.info(f"[PRE-ANALYSIS] Loaded {len(self.jobs)} job(s) from {self.job_dir}")
+
+    def stats(self) -> Dict[str, Any]:
+        by_status: Dict[str, int] = {}
+        for job in self.jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            "workers": len(self.workers),
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+            "jobs": by_status,
+        }
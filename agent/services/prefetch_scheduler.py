@@ -0,0 +1,169 @@
+from typing import Dict, Any, Tuple, List
+import asyncio
+import logging
+import os
+import time
+from services.analysis_pipeline import AnalysisPipeline
+from services.deadline import Deadline
+from services.priority_scheduler import current_priority, BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+
+class ViewerState:
+
+    def __init__(self, position: float):
+        self.position = position
+        self.last_seen = time.monotonic()
+        self.tasks: Dict[Tuple[str, str, int], asyncio.Task] = {}
+
+
+class PrefetchScheduler:
+
+    def __init__(self, cache, analysis_pipeline: AnalysisPipeline, orchestrator, excitement=None):
+        self.cache = cache
+        self.analysis_pipeline = analysis_pipeline
+        self.orchestrator = orchestrator
+        self.excitement = excitement
+
+        self.enabled = os.getenv("PREFETCH_ENABLED", "true").lower() != "false"
+        self.lookahead = float(os.getenv("PREFETCH_LOOKAHEAD_SECONDS", "15"))
+        self.step = float(os.getenv("PREFETCH_STEP_SECONDS", "5"))
+        self.max_tasks = int(os.getenv("PREFETCH_MAX_TASKS", "16"))
+        self.seek_threshold = float(os.getenv("PREFETCH_SEEK_THRESHOLD_SECONDS", "20"))
+        self.viewer_ttl = float(os.getenv("PREFETCH_VIEWER_TTL_SECONDS", "120"))
+        self.semaphore = asyncio.Semaphore(int(os.getenv("PREFETCH_CONCURRENCY", "2")))
+
+        self.viewers: Dict[Tuple[str, str], ViewerState] = {}
+        self.in_progress: Dict[Tuple[str, str, int], asyncio.Task] = {}
+        self.watchers: Dict[Tuple[str, str, int], int] = {}
+        self.completed = 0
+        self.cancelled = 0
+        self.dropped = 0
+        self.skipped_calm = 0
+
+    def record(self, client_id: str, video_id: str, timestamp: float, kind: str = "analyze", window_size: float = 5.0):
+        if not self.enabled:
+            return
+
+        self._expire_viewers()
+        viewer_key = (client_id, video_id)
+        viewer = self.viewers.get(viewer_key)
+
+        if viewer is None:
+            viewer = ViewerState(timestamp)
+            self.viewers[viewer_key] = viewer
+        else:
+            jump = timestamp - viewer.position
+            if jump < -self.step or jump > self.seek_threshold:
+                logger.info(f"[PREFETCH] {client_id} seeked {viewer.position:.1f}s -> {timestamp:.1f}s on {video_id} - cancelling speculative work")
+                self._cancel_viewer(viewer)
+            viewer.position = timestamp
+            viewer.last_seen = time.monotonic()
+
+        for task_key, task in list(viewer.tasks.items()):
+            if task.done():
+                viewer.tasks.pop(task_key, None)
+
+        for target in self._targets(kind, video_id, timestamp, window_size):
+            key = (kind, video_id, target)
+            if key in viewer.tasks or self._is_cached(kind, video_id, target, window_size):
+                continue
+            if key in self.in_progress:
+                viewer.tasks[key] = self.in_progress[key]
+                self.watchers[key] += 1
+                continue
+            if len(self.in_progress) >= self.max_tasks:
+                self.dropped += 1
+                continue
+            task = asyncio.create_task(self._prefetch(kind, video_id, target, window_size))
+            self.in_progress[key] = task
+            self.watchers[key] = 1
+            viewer.tasks[key] = task
+
+    def _targets(self, kind: str, video_id: str, timestamp: float, window_size: float) -> List[int]:
+        targets = []
+        offset = self.step
+        while offset <= self.lookahead:
+            targets.append(int(timestamp + offset))
+            offset += self.step
+        if self.excitement is None:
+            return targets
+
+        self.excitement.ensure(video_id)
+        span = window_size if kind == "live" else 1.0
+        kept = [t for t in targets if not self.excitement.is_calm(video_id, t - span, t + span)]
+        self.skipped_calm += len(targets) - len(kept)
+        peak = self.excitement.peak(video_id, timestamp + 1, timestamp + self.lookahead)
+        if peak is not None and peak[1] >= self.excitement.threshold and peak[0] not in kept:
+            kept.insert(0, peak[0])
+        return kept
+
+    def _is_cached(self, kind: str, video_id: str, second: int, window_size: float) -> bool:
+        store = self.analysis_pipeline.store
+        if kind == "live":
+            if self.cache.get(self.orchestrator.window_cache_key(video_id, second, window_size)) is not None:
+                return True
+            return store is not None and store.nearest(video_id, second, require="live_commentary", max_distance=window_size / 2) is not None
+        if self.cache.get(AnalysisPipeline.cache_key(video_id, second)) is not None:
+            return True
+        return store is not None and store.nearest(video_id, second, require="analogy", max_distance=0) is not None
+
+    async def _prefetch(self, kind: str, video_id: str, second: int, window_size: float):
+        current_priority.set(BACKGROUND)
+        try:
+            async with self.semaphore:
+                if self._is_cached(kind, video_id, second, window_size):
+                    return
+                logger.info(f"[PREFETCH] Speculatively computing {kind} for {video_id} at {second}s")
+                if kind == "live":
+                    await self.orchestrator.compute_window(video_id, float(second), window_size)
+                else:
+                    result = await self.analysis_pipeline.analyze(video_id, float(second), Deadline(20.0))
+                    if result.get("source") == "stub":
+                        return
+                    self.cache.set(
+                        AnalysisPipeline.cache_key(video_id, second),
+                        {**result, "timestamp": float(second), "cached": False},
+                        expire=600
+                    )
+                self.completed += 1
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception as e:
+            logger.warning(f"[PREFETCH] {kind} prefetch for {video_id} at {second}s failed: {e}")
+        finally:
+            key = (kind, video_id, second)
+            if self.in_progress.get(key) is asyncio.current_task():
+                del self.in_progress[key]
+                self.watchers.pop(key, None)
+
+    def _cancel_viewer(self, viewer: ViewerState):
+        for key, task in viewer.tasks.items():
+            if task.done() or self.in_progress.get(key) is not task:
+                continue
+            self.watchers[key] -= 1
+            if self.watchers[key] <= 0:
+                del self.in_progress[key]
+                del self.watchers[key]
+                task.cancel()
+        viewer.tasks.clear()
+
+    def _expire_viewers(self):
+        now = time.monotonic()
+        for key, viewer in list(self.viewers.items()):
+            if now - viewer.last_seen > self.viewer_ttl:
+                self._cancel_viewer(viewer)
+                del self.viewers[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "viewers": len(self.viewers),
+            "in_progress": len(self.in_progress),
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "dropped": self.dropped,
+            "skipped_calm": self.skipped_calm,
+        }
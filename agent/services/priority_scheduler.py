@@ -0,0 +1,171 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Callable
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+INTERACTIVE = "interactive"
+LIVE = "live"
+BACKGROUND = "background"
+
+PRIORITY_RANK = {
+    INTERACTIVE: 0,
+    LIVE: 1,
+    BACKGROUND: 2,
+}
+
+STAGE_CAPACITY = {
+    "resolve": 4,
+    "decode": 4,
+    "inference": 2,
+    "llm": 8,
+}
+
+current_priority: ContextVar[str] = ContextVar("current_priority", default=INTERACTIVE)
+
+
+class _Waiter:
+
+    def __init__(self, level: str, future: asyncio.Future):
+        self.level = level
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class StageScheduler:
+
+    def __init__(self, name: str, capacity: int, class_caps: Dict[str, int], aging_seconds: float = 10.0):
+        self.name = name
+        self.capacity = capacity
+        self.class_caps = class_caps
+        self.aging_seconds = aging_seconds
+        self.running: Dict[str, int] = {level: 0 for level in PRIORITY_RANK}
+        self.completed: Dict[str, int] = {level: 0 for level in PRIORITY_RANK}
+        self.waiters: List[_Waiter] = []
+        self.max_wait: Dict[str, float] = {level: 0.0 for level in PRIORITY_RANK}
+        self.abandoned = 0
+
+    def _effective_rank(self, waiter: _Waiter, now: float) -> float:
+        waited = now - waiter.enqueued_at
+        return PRIORITY_RANK[waiter.level] - (waited / self.aging_seconds if self.aging_seconds > 0 else 0)
+
+    def _dispatch(self):
+        now = time.monotonic()
+        while self.waiters and sum(self.running.values()) < self.capacity:
+            eligible = [
+                w for w in self.waiters
+                if self.running[w.level] < self.class_caps.get(w.level, self.capacity)
+            ]
+            if not eligible:
+                return
+            waiter = min(eligible, key=lambda w: (self._effective_rank(w, now), w.enqueued_at))
+            self.waiters.remove(waiter)
+            if waiter.future.done():
+                continue
+            self.running[waiter.level] += 1
+            self.max_wait[waiter.level] = max(self.max_wait[waiter.level], now - waiter.enqueued_at)
+            waiter.future.set_result(True)
+
+    async def acquire(self, level: Optional[str] = None) -> str:
+        level = level or current_priority.get()
+        if level not in PRIORITY_RANK:
+            level = INTERACTIVE
+        waiter = _Waiter(level, asyncio.get_event_loop().create_future())
+        self.waiters.append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+            elif waiter.future.done() and not waiter.future.cancelled():
+                self.release(level)
+            raise
+        return level
+
+    def release(self, level: str):
+        self.running[level] = max(0, self.running[level] - 1)
+        self.completed[level] += 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, level: Optional[str] = None):
+        level = await self.acquire(level)
+        try:
+            yield
+        finally:
+            self.release(level)
+
+    async def run(self, fn: Callable, *args, level: Optional[str] = None):
+        level = await self.acquire(level)
+        try:
+            future = asyncio.get_event_loop().run_in_executor(None, fn, *args)
+        except BaseException:
+            self.release(level)
+            raise
+        future.add_done_callback(lambda done: self._finished(level, done))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.done():
+                self.abandoned += 1
+            raise
+
+    def _finished(self, level: str, future: asyncio.Future):
+        if not future.cancelled():
+            future.exception()
+        self.release(level)
+
+    def stats(self) -> Dict[str, Any]:
+        waiting: Dict[str, int] = {level: 0 for level in PRIORITY_RANK}
+        for waiter in self.waiters:
+            waiting[waiter.level] += 1
+        return {
+            "capacity": self.capacity,
+            "running": dict(self.running),
+            "waiting": waiting,
+            "completed": dict(self.completed),
+            "abandoned": self.abandoned,
+            "max_wait_seconds": {level: round(value, 3) for level, value in self.max_wait.items()},
+        }
+
+
+_schedulers: Dict[str, StageScheduler] = {}
+
+
+def get_scheduler(stage: str) -> StageScheduler:
+    if stage not in _schedulers:
+        env_name = stage.upper()
+        capacity = int(os.getenv(f"SCHEDULER_{env_name}_CAPACITY", str(STAGE_CAPACITY.get(stage, 4))))
+        background_share = float(os.getenv("SCHEDULER_BACKGROUND_SHARE", "0.5"))
+        live_share = float(os.getenv("SCHEDULER_LIVE_SHARE", "0.75"))
+        class_caps = {
+            INTERACTIVE: capacity,
+            LIVE: max(1, int(capacity * live_share)),
+            BACKGROUND: max(1, int(capacity * background_share)),
+        }
+        _schedulers[stage] = StageScheduler(
+            stage,
+            capacity,
+            class_caps,
+            aging_seconds=float(os.getenv("SCHEDULER_AGING_SECONDS", "10"))
+        )
+    return _schedulers[stage]
+
+
+def total_waiting(include_background: bool = False) -> int:
+    return sum(
+        1
+        for scheduler in _schedulers.values()
+        for waiter in scheduler.waiters
+        if include_background or waiter.level != BACKGROUND
+    )
+
+
+def get_all_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: scheduler.stats() for name, scheduler in _schedulers.items()}
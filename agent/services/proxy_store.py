@@ -0,0 +1,319 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Optional, Dict, Any, Tuple
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VideoProxy:
+
+    def __init__(self, video_id: str, data_path: str, index_path: str, meta: Dict[str, Any]):
+        self.video_id = video_id
+        self.data_path = data_path
+        self.index_path = index_path
+        self.meta = meta
+        self.max_size = meta["maxSize"]
+        self.quality = meta["quality"]
+        self.timestamps = array("d")
+        self.offsets = array("q")
+        with open(index_path, "rb") as f:
+            self.timestamps.fromfile(f, meta["frames"])
+            self.offsets.fromfile(f, meta["frames"] + 1)
+        self._file = open(data_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.last_access = time.time()
+
+    @property
+    def size_bytes(self) -> int:
+        return os.path.getsize(self.data_path) + os.path.getsize(self.index_path)
+
+    def frame_bytes(self, timestamp: float) -> Tuple[float, bytes]:
+        self.last_access = time.time()
+        i = bisect_left(self.timestamps, timestamp)
+        if i == len(self.timestamps) or (i > 0 and timestamp - self.timestamps[i - 1] < self.timestamps[i] - timestamp):
+            i -= 1
+        return self.timestamps[i], self._map[self.offsets[i]:self.offsets[i + 1]]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class ProxyStore:
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv("PROXY_DIR", "proxies")
+        self.enabled = os.getenv("PROXY_ENABLED", "true").lower() != "false"
+        self.hot_threshold = int(os.getenv("PROXY_HOT_THRESHOLD", "20"))
+        self.quota_bytes = int(float(os.getenv("PROXY_DISK_QUOTA_MB", "2048")) * 1024 * 1024)
+        self.max_size = int(os.getenv("PROXY_MAX_SIZE", "800"))
+        self.quality = int(os.getenv("PROXY_JPEG_QUALITY", "78"))
+        self.fps = float(os.getenv("PROXY_FPS", "4"))
+        self.max_tolerance = float(os.getenv("PROXY_MAX_TOLERANCE_SECONDS", "0.5"))
+        self.max_tracked = int(os.getenv("PROXY_MAX_TRACKED_VIDEOS", "1024"))
+        self.decay_seconds = float(os.getenv("PROXY_ACCESS_DECAY_SECONDS", "3600"))
+
+        self.proxies: Dict[str, VideoProxy] = {}
+        self.accesses: Counter = Counter()
+        self.decayed_at = time.monotonic()
+        self.building: Dict[str, threading.Event] = {}
+        self.failed: Dict[str, float] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.evictions = 0
+
+    def _paths(self, video_id: str) -> Tuple[str, str, str]:
+        key = hashlib.sha1(video_id.encode("utf-8")).hexdigest()[:20]
+        base = os.path.join(self.directory, key)
+        return f"{base}.mjpg", f"{base}.idx", f"{base}.json"
+
+    async def start(self):
+        if self.worker is not None or not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_existing()
+        self.queue = asyncio.Queue()
+        self.worker = asyncio.create_task(self._worker())
+        logger.info(f"[PROXY] Started with {len(self.proxies)} proxies ({self._used_bytes() / 1e6:.0f}MB of {self.quota_bytes / 1e6:.0f}MB)")
+
+    async def stop(self):
+        for stop_event in self.building.values():
+            stop_event.set()
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except (asyncio.CancelledError, Exception):
+                pass
+            self.worker = None
+
+    def _load_existing(self):
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    meta = json.load(f)
+                self._open(meta["videoId"], meta)
+            except Exception as e:
+                logger.warning(f"[PROXY] Ignoring unreadable proxy {name}: {e}")
+
+    def _open(self, video_id: str, meta: Dict[str, Any]):
+        data_path, index_path, meta_path = self._paths(video_id)
+        proxy = VideoProxy(video_id, data_path, index_path, meta)
+        proxy.last_access = os.path.getmtime(meta_path)
+        with self._lock:
+            self.proxies[video_id] = proxy
+
+    def covers(self, video_id: str, max_size: int) -> bool:
+        proxy = self.proxies.get(video_id)
+        return proxy is not None and max_size <= proxy.max_size
+
+    def read_frame(self, video_id: str, timestamp: float, max_size: int, quality: int, tolerance: float = 0.0) -> Optional[Tuple[str, float]]:
+        proxy = self.proxies.get(video_id)
+        if proxy is None or max_size > proxy.max_size:
+            return None
+        try:
+            actual, jpeg = proxy.frame_bytes(timestamp)
+        except ValueError:
+            return None
+        if abs(actual - timestamp) > max(self.max_tolerance, tolerance):
+            return None
+        self.hits += 1
+        if max_size == proxy.max_size:
+            return base64.b64encode(jpeg).decode("utf-8"), actual
+        from services.youtube_extractor import YouTubeFrameExtractor
+
+        frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return None
+        return YouTubeFrameExtractor.encode_frame(frame, max_size, quality), actual
+
+    def record_access(self, video_id: str):
+        if not self.enabled or video_id in self.proxies or video_id in self.building:
+            return
+        now = time.monotonic()
+        if now - self.decayed_at > self.decay_seconds or len(self.accesses) > self.max_tracked:
+            self._decay(now)
+        self.accesses[video_id] += 1
+        if self.accesses[video_id] < self.hot_threshold or self.queue is None:
+            return
+        if time.time() - self.failed.get(video_id, 0) < 3600:
+            return
+        from services.live_ingest import get_live_ingest
+
+        if get_live_ingest().is_live(video_id):
+            return
+        logger.info(f"[PROXY] {video_id} is hot ({self.accesses[video_id]} requests) - queueing proxy transcode")
+        self.building[video_id] = threading.Event()
+        self.queue.put_nowait(video_id)
+
+    def _decay(self, now: float):
+        self.accesses = Counter({video_id: count // 2 for video_id, count in self.accesses.items() if count > 1})
+        cutoff = time.time() - 3600
+        self.failed = {video_id: failed_at for video_id, failed_at in self.failed.items() if failed_at > cutoff}
+        self.decayed_at = now
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            video_id = await self.queue.get()
+            stop_event = self.building.get(video_id)
+            try:
+                started = time.monotonic()
+                meta = await loop.run_in_executor(None, self._build, video_id, stop_event)
+                if meta is None:
+                    self.failed[video_id] = time.time()
+                    continue
+                self._open(video_id, meta)
+                logger.info(f"[PROXY] Built proxy for {video_id}: {meta['frames']} frames, {meta['bytes'] / 1e6:.1f}MB in {time.monotonic() - started:.0f}s")
+                self._enforce_quota(keep=video_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed[video_id] = time.time()
+                logger.error(f"[PROXY] Transcode failed for {video_id}: {e}")
+            finally:
+                self.building.pop(video_id, None)
+
+    def _build(self, video_id: str, stop_event: Optional[threading.Event]) -> Optional[Dict[str, Any]]:
+        from services.youtube_extractor import YouTubeFrameExtractor
+
+        extractor = YouTubeFrameExtractor()
+        stream_url = extractor.resolve_stream_url(video_id)
+        if not stream_url:
+            return None
+        data_path, index_path, meta_path = self._paths(video_id)
+        os.makedirs(self.directory, exist_ok=True)
+
+        timestamps = array("d")
+        offsets = array("q", [0])
+        interval = 1.0 / self.fps
+        next_sample = 0.0
+        tmp_paths = [f"{data_path}.tmp", f"{index_path}.tmp", f"{meta_path}.tmp"]
+        committed = False
+        try:
+            cap = cv2.VideoCapture(stream_url)
+            try:
+                if not cap.isOpened():
+                    logger.error(f"[PROXY] Failed to open stream for {video_id}")
+                    return None
+                with open(f"{data_path}.tmp", "wb") as out:
+                    while cap.grab():
+                        if stop_event is not None and stop_event.is_set():
+                            return None
+                        position = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                        if position < next_sample:
+                            continue
+                        success, frame = cap.retrieve()
+                        if not success or frame is None:
+                            continue
+                        jpeg = self._encode(frame)
+                        if jpeg is None:
+                            continue
+                        out.write(jpeg)
+                        timestamps.append(position)
+                        offsets.append(offsets[-1] + len(jpeg))
+                        next_sample = position + interval
+            finally:
+                cap.release()
+
+            if not timestamps:
+                return None
+            with open(f"{index_path}.tmp", "wb") as f:
+                timestamps.tofile(f)
+                offsets.tofile(f)
+            meta = {
+                "videoId": video_id,
+                "frames": len(timestamps),
+                "bytes": offsets[-1],
+                "maxSize": self.max_size,
+                "quality": self.quality,
+                "fps": self.fps,
+                "duration": timestamps[-1],
+                "createdAt": time.time(),
+            }
+            with open(f"{meta_path}.tmp", "w") as f:
+                json.dump(meta, f)
+            os.replace(f"{data_path}.tmp", data_path)
+            os.replace(f"{index_path}.tmp", index_path)
+            os.replace(f"{meta_path}.tmp", meta_path)
+            committed = True
+            return meta
+        finally:
+            if not committed:
+                for path in tmp_paths:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+    def _encode(self, frame) -> Optional[bytes]:
+        height, width = frame.shape[:2]
+        scale = self.max_size / max(height, width)
+        if scale < 1:
+            frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+        success, buffer = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality])
+        return buffer.tobytes() if success else None
+
+    def _used_bytes(self) -> int:
+        return sum(proxy.size_bytes for proxy in list(self.proxies.values()))
+
+    def _enforce_quota(self, keep: Optional[str] = None):
+        while self._used_bytes() > self.quota_bytes:
+            candidates = [p for p in self.proxies.values() if p.video_id != keep]
+            if not candidates:
+                break
+            victim = min(candidates, key=lambda p: p.last_access)
+            self.evict(victim.video_id)
+
+    def evict(self, video_id: str):
+        with self._lock:
+            proxy = self.proxies.pop(video_id, None)
+        if proxy is None:
+            return
+        proxy.close()
+        for path in self._paths(video_id):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.accesses.pop(video_id, None)
+        self.evictions += 1
+        logger.info(f"[PROXY] Evicted proxy for {video_id}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "proxies": len(self.proxies),
+            "building": list(self.building),
+            "used_mb": round(self._used_bytes() / 1e6, 1),
+            "quota_mb": round(self.quota_bytes / 1e6, 1),
+            "hits": self.hits,
+            "tracked_videos": len(self.accesses),
+            "evictions": self.evictions,
+        }
+
+
+_proxy_store: Optional[ProxyStore] = None
+
+
+def get_proxy_store() -> ProxyStore:
+    global _proxy_store
+    if _proxy_store is None:
+        _proxy_store = ProxyStore()
+    return _proxy_store
@@ -0,0 +1,108 @@
+from contextvars import ContextVar
+from typing import Optional, Dict, Any
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class QualityProfile:
+
+    def __init__(
+        self,
+        name: str,
+        frame_max_size: int,
+        frame_jpeg_quality: int,
+        azure_image_size: int,
+        azure_image_quality: int,
+        claude_image_size: int,
+        claude_image_quality: int,
+        yolo_model: str,
+        pose_complexity: int,
+        sample_interval: float,
+        window_size: float
+    ):
+        self.name = name
+        self.frame_max_size = frame_max_size
+        self.frame_jpeg_quality = frame_jpeg_quality
+        self.azure_image_size = azure_image_size
+        self.azure_image_quality = azure_image_quality
+        self.claude_image_size = claude_image_size
+        self.claude_image_quality = claude_image_quality
+        self.yolo_model = yolo_model
+        self.pose_complexity = pose_complexity
+        self.sample_interval = sample_interval
+        self.window_size = window_size
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+PROFILES: Dict[str, QualityProfile] = {
+    "realtime": QualityProfile(
+        name="realtime",
+        frame_max_size=512,
+        frame_jpeg_quality=65,
+        azure_image_size=512,
+        azure_image_quality=60,
+        claude_image_size=320,
+        claude_image_quality=45,
+        yolo_model="yolov8n.pt",
+        pose_complexity=0,
+        sample_interval=2.5,
+        window_size=4.0
+    ),
+    "balanced": QualityProfile(
+        name="balanced",
+        frame_max_size=800,
+        frame_jpeg_quality=78,
+        azure_image_size=1024,
+        azure_image_quality=85,
+        claude_image_size=384,
+        claude_image_quality=50,
+        yolo_model="yolov8n.pt",
+        pose_complexity=2,
+        sample_interval=1.5,
+        window_size=5.0
+    ),
+    "quality": QualityProfile(
+        name="quality",
+        frame_max_size=1280,
+        frame_jpeg_quality=88,
+        azure_image_size=1280,
+        azure_image_quality=90,
+        claude_image_size=768,
+        claude_image_quality=75,
+        yolo_model="yolov8s.pt",
+        pose_complexity=2,
+        sample_interval=1.0,
+        window_size=6.0
+    ),
+}
+
+DEFAULT_PROFILE = "balanced"
+
+current_profile: ContextVar[Optional[str]] = ContextVar("current_profile", default=None)
+
+_deployment_profile = os.getenv("QUALITY_PROFILE", DEFAULT_PROFILE)
+if _deployment_profile not in PROFILES:
+    logger.warning(f"[PROFILE] Unknown QUALITY_PROFILE {_deployment_profile!r} - using {DEFAULT_PROFILE}")
+    _deployment_profile = DEFAULT_PROFILE
+
+
+def get_profile(name: Optional[str] = None) -> QualityProfile:
+    name = name or current_profile.get() or _deployment_profile
+    return PROFILES.get(name) or PROFILES[_deployment_profile]
+
+
+def deployment_profile() -> str:
+    return _deployment_profile
+
+
+def set_deployment_profile(name: str):
+    global _deployment_profile
+    if name not in PROFILES:
+        raise ValueError(f"Unknown quality profile: {name}")
+    if name != _deployment_profile:
+        logger.info(f"[PROFILE] Deployment profile {_deployment_profile} -> {name}")
+    _deployment_profile = name
@@ -0,0 +1,6 @@
+SOURCE_QUALITY = {
+    "vision": 3,
+    "captions": 2,
+    "detections": 1,
+    "stub": 0,
+}
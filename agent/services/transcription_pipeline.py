@@ -0,0 +1,274 @@
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+import asyncio
+import logging
+import math
+import os
+import re
+import struct
+import time
+import httpx
+from services.audio_extractor import AudioExtractor
+
+logger = logging.getLogger(__name__)
+
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2
+TICKS_PER_SECOND = 10_000_000
+
+_WORD = re.compile(r"[^\w']+")
+
+
+def wav_bytes(pcm: bytes, sample_rate: int = SAMPLE_RATE) -> bytes:
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE", b"fmt ", 16, 1, 1,
+        sample_rate, sample_rate * 2, 2, 16, b"data", len(pcm)
+    )
+    return header + pcm
+
+
+def _normalize_word(word: str) -> str:
+    return _WORD.sub("", word.lower())
+
+
+def _overlap_words(previous: List[str], current: List[str], limit: int = 12) -> int:
+    previous = [_normalize_word(w) for w in previous[-limit:]]
+    current = [_normalize_word(w) for w in current[:limit]]
+    for size in range(min(len(previous), len(current)), 0, -1):
+        if previous[-size:] == current[:size]:
+            return size
+    return 0
+
+
+class TranscriptionPipeline:
+
+    def __init__(
+        self,
+        audio_extractor: Optional[AudioExtractor] = None,
+        chunk_seconds: Optional[float] = None,
+        overlap_seconds: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        max_cached_chunks: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.audio_extractor = audio_extractor or AudioExtractor()
+        self.chunk_seconds = chunk_seconds or float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "10"))
+        self.overlap_seconds = overlap_seconds if overlap_seconds is not None else float(os.getenv("TRANSCRIBE_OVERLAP_SECONDS", "2"))
+        self.concurrency = concurrency or int(os.getenv("TRANSCRIBE_CONCURRENCY", "3"))
+        self.max_cached_chunks = max_cached_chunks or int(os.getenv("TRANSCRIBE_CACHE_CHUNKS", "5000"))
+        self.transport = transport
+        self.step = self.chunk_seconds - self.overlap_seconds
+        if self.step <= 0:
+            raise ValueError("TRANSCRIBE_OVERLAP_SECONDS must be smaller than TRANSCRIBE_CHUNK_SECONDS")
+
+        self.cache: "OrderedDict[Tuple[str, str, int], Dict[str, Any]]" = OrderedDict()
+        self.in_flight: Dict[Tuple[str, str, int], asyncio.Future] = {}
+        self.uploads = 0
+        self.failures = 0
+        self.hits = 0
+
+    def chunk_start(self, index: int) -> float:
+        return index * self.step
+
+    def chunk_indexes(self, start: float, end: float) -> List[int]:
+        first = max(0, math.floor((start - self.overlap_seconds) / self.step))
+        last = max(first, math.floor(end / self.step))
+        return [index for index in range(first, last + 1) if self.chunk_start(index) + self.chunk_seconds > start]
+
+    def owned_span(self, index: int) -> Tuple[float, float]:
+        start = self.chunk_start(index) + self.overlap_seconds / 2 if index > 0 else 0.0
+        return start, self.chunk_start(index + 1) + self.overlap_seconds / 2
+
+    async def transcribe(self, video_id: str, start: float, end: float, language: str = "en-US") -> List[Dict[str, Any]]:
+        indexes = self.chunk_indexes(start, end)
+        results: Dict[int, Dict[str, Any]] = {}
+        missing, waiting = [], []
+        for index in indexes:
+            key = (video_id, language, index)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                results[index] = cached
+            elif key in self.in_flight:
+                waiting.append((index, self.in_flight[key]))
+            else:
+                missing.append(index)
+
+        if missing and self.audio_extractor.azure_speech_key:
+            results.update(await self._transcribe_chunks(video_id, missing, language))
+        for index, future in waiting:
+            result = await asyncio.shield(future)
+            if result is not None:
+                results[index] = result
+        return self.stitch(results, start, end)
+
+    async def _transcribe_chunks(self, video_id: str, indexes: List[int], language: str) -> Dict[int, Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        futures = {}
+        for index in indexes:
+            futures[index] = loop.create_future()
+            self.in_flight[(video_id, language, index)] = futures[index]
+
+        span_start = self.chunk_start(indexes[0])
+        span_end = self.chunk_start(indexes[-1]) + self.chunk_seconds
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        started = time.monotonic()
+
+        async def upload(client: httpx.AsyncClient, index: int, pcm: bytes):
+            try:
+                result = await self.audio_extractor.recognize(wav_bytes(pcm), language, client=client)
+                self.uploads += 1
+                if result is None:
+                    self.failures += 1
+                    return index, None
+                return index, self._parse(result)
+            finally:
+                semaphore.release()
+
+        status: Dict[str, Any] = {}
+        audio = self.audio_extractor.stream_audio_segment(video_id, span_start, span_end, sample_rate=SAMPLE_RATE, audio_format="s16le", status=status)
+        chunk_bytes = int(round(self.chunk_seconds * SAMPLE_RATE)) * 2
+        buffer = bytearray()
+        buffer_start = span_start
+        pending = list(indexes)
+        results: Dict[int, Dict[str, Any]] = {}
+        try:
+            async with httpx.AsyncClient(timeout=30.0, transport=self.transport) as client:
+                ended = False
+                while pending and not ended:
+                    try:
+                        chunk = await audio.__anext__()
+                        buffer.extend(chunk)
+                    except StopAsyncIteration:
+                        ended = True
+
+                    while pending:
+                        offset = int(round((self.chunk_start(pending[0]) - buffer_start) * SAMPLE_RATE)) * 2
+                        if len(buffer) < offset + chunk_bytes and not ended:
+                            break
+                        index = pending.pop(0)
+                        pcm = bytes(buffer[offset:offset + chunk_bytes])
+                        truncated = len(pcm) < chunk_bytes and not status.get("complete")
+                        if truncated:
+                            logger.warning(f"[TRANSCRIBE] {video_id}: audio stream ended early at chunk {index} - leaving it uncached")
+                        elif len(pcm) >= BYTES_PER_SECOND // 2:
+                            await semaphore.acquire()
+                            tasks.append(asyncio.create_task(upload(client, index, pcm)))
+                        else:
+                            results[index] = {"text": "", "offset": 0.0, "duration": 0.0, "words": None}
+                        if pending:
+                            drop = min(len(buffer), int(round((self.chunk_start(pending[0]) - buffer_start) * SAMPLE_RATE)) * 2)
+                            del buffer[:drop]
+                            buffer_start += drop / BYTES_PER_SECOND
+
+                for index, result in await asyncio.gather(*tasks):
+                    if result is not None:
+                        results[index] = result
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await audio.aclose()
+            for index, future in futures.items():
+                if index in results:
+                    self._store((video_id, language, index), results[index])
+                if not future.done():
+                    future.set_result(results.get(index))
+                self.in_flight.pop((video_id, language, index), None)
+
+        logger.info(f"[TRANSCRIBE] {video_id}: {len(results)}/{len(indexes)} chunks from {span_start:.0f}s to {span_end:.0f}s in {time.monotonic() - started:.1f}s")
+        return results
+
+    def _parse(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        if result.get("RecognitionStatus") != "Success":
+            return {"text": "", "offset": 0.0, "duration": 0.0, "words": None}
+        best = (result.get("NBest") or [{}])[0]
+        words = None
+        if best.get("Words"):
+            words = [
+                (w["Offset"] / TICKS_PER_SECOND, w["Duration"] / TICKS_PER_SECOND, w["Word"])
+                for w in best["Words"]
+            ]
+        return {
+            "text": result.get("DisplayText") or best.get("Display") or "",
+            "offset": result.get("Offset", 0) / TICKS_PER_SECOND,
+            "duration": result.get("Duration", 0) / TICKS_PER_SECOND,
+            "words": words,
+        }
+
+    def _store(self, key: Tuple[str, str, int], result: Dict[str, Any]):
+        self.cache[key] = result
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_cached_chunks:
+            self.cache.popitem(last=False)
+
+    def stitch(self, results: Dict[int, Dict[str, Any]], start: float, end: float) -> List[Dict[str, Any]]:
+        segments = []
+        previous_words: List[str] = []
+        previous_index = None
+        for index in sorted(results):
+            result = results[index]
+            chunk_start = self.chunk_start(index)
+            if result["words"] is not None:
+                owned_start, owned_end = self.owned_span(index)
+                kept = [
+                    (chunk_start + offset, duration, word)
+                    for offset, duration, word in result["words"]
+                    if owned_start <= chunk_start + offset + duration / 2 < owned_end
+                ]
+                if not kept:
+                    previous_words, previous_index = [], index
+                    continue
+                segment_start = kept[0][0]
+                segment_end = kept[-1][0] + kept[-1][1]
+                words = [word for _, _, word in kept]
+                text = " ".join(words)
+            else:
+                words = result["text"].split()
+                if not words:
+                    previous_words, previous_index = [], index
+                    continue
+                segment_start = chunk_start + result["offset"]
+                segment_end = segment_start + result["duration"]
+                repeated = _overlap_words(previous_words, words) if previous_index == index - 1 else 0
+                if repeated == len(words):
+                    previous_words, previous_index = words, index
+                    continue
+                segment_start += result["duration"] * repeated / len(words)
+                text = " ".join(words[repeated:]) if repeated else result["text"]
+
+            previous_words, previous_index = words, index
+            if segment_end < start or segment_start > end:
+                continue
+            segments.append({
+                "start": round(segment_start, 2),
+                "duration": round(max(0.0, segment_end - segment_start), 2),
+                "text": text,
+            })
+        return segments
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chunk_seconds": self.chunk_seconds,
+            "overlap_seconds": self.overlap_seconds,
+            "concurrency": self.concurrency,
+            "cached_chunks": len(self.cache),
+            "in_flight": len(self.in_flight),
+            "uploads": self.uploads,
+            "failures": self.failures,
+            "cache_hits": self.hits,
+        }
+
+
+_transcription_pipeline: Optional[TranscriptionPipeline] = None
+
+
+def get_transcription_pipeline() -> TranscriptionPipeline:
+    global _transcription_pipeline
+    if _transcription_pipeline is None:
+        _transcription_pipeline = TranscriptionPipeline()
+    return _transcription_pipeline
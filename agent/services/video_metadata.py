@@ -3,6 +3,8 @@ import yt_dlp
 import asyncio
 from typing import Optional, Dict, Any
 import logging
+from services.circuit_breaker import get_breaker
+from services.priority_scheduler import get_scheduler
 
 
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +22,7 @@ class VideoMetadataExtractor:
             'skip_download': True,
             'extract_flat': False,
         }
+        self.breaker = get_breaker("youtube")
     
     def _get_cache_key(self, video_url_or_id: str) -> str:
         
@@ -37,26 +40,27 @@ class VideoMetadataExtractor:
             logger.info(f"Using cached metadata for {cache_key}")
             return self.metadata_cache[cache_key]
         
+        if not self.breaker.allow_request():
+            logger.info(f"YouTube circuit open - skipping metadata for {video_url_or_id}")
+            return None
+        
         try:
 
-            loop = asyncio.get_event_loop()
             metadata = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
-                    self._extract_metadata_sync,
-                    video_url_or_id
-                ),
+                get_scheduler("resolve").run(self._extract_metadata_sync, video_url_or_id),
                 timeout=10.0
             )
             
 
             if metadata:
+                self.breaker.record_success()
                 self.metadata_cache[cache_key] = metadata
                 logger.info(f"Cached metadata for {cache_key}: {metadata.get('title', 'N/A')[:50]}")
             
             return metadata
             
         except asyncio.TimeoutError:
+            self.breaker.record_failure()
             logger.warning(f"Metadata extraction timeout for {video_url_or_id}")
             return None
         except Exception as e:
@@ -98,5 +102,6 @@ class VideoMetadataExtractor:
                 return metadata
                 
         except Exception as e:
+            self.breaker.record_failure()
             logger.error(f"Metadata extraction error: {e}")
             return None
@@ -0,0 +1,283 @@
+from bisect import bisect_right
+from typing import Optional, Dict, Any, List, Tuple
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+LOCAL_PREFIX = "local:"
+
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov", ".webm", ".avi", ".ts", ".m4v")
+
+
+class LocalVideoSource:
+
+    UNINDEXED_READ_AHEAD = 2.0
+    SEEK_BACKOFF_FRAMES = 16
+
+    def __init__(self, video_id: str, path: str):
+        self.video_id = video_id
+        self.path = path
+        self.index_path = f"{path}.keyframes.json"
+        self.index: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._cap = None
+        self._position: Optional[float] = None
+        self._last: Optional[Tuple[float, Any]] = None
+        self.seeks = 0
+        self.snapped = 0
+        self.forward_reads = 0
+
+    @property
+    def keyframes(self) -> List[float]:
+        return self.load_index()["keyframes"]
+
+    @property
+    def duration(self) -> Optional[float]:
+        return self.load_index().get("duration")
+
+    def load_index(self) -> Dict[str, Any]:
+        if self.index is not None:
+            return self.index
+        stat = os.stat(self.path)
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+            if index.get("size") == stat.st_size and index.get("mtime") == stat.st_mtime:
+                self.index = index
+                return index
+        except (FileNotFoundError, ValueError):
+            pass
+
+        started = time.monotonic()
+        index = self._build_index()
+        index.update({"size": stat.st_size, "mtime": stat.st_mtime})
+        logger.info(f"[VIDEO SOURCE] Indexed {len(index['keyframes'])} keyframes in {self.path} ({time.monotonic() - started:.1f}s, {index['method']})")
+        try:
+            with open(f"{self.index_path}.tmp", "w") as f:
+                json.dump(index, f)
+            os.replace(f"{self.index_path}.tmp", self.index_path)
+        except OSError as e:
+            logger.warning(f"[VIDEO SOURCE] Could not cache keyframe index next to {self.path}: {e}")
+        self.index = index
+        return index
+
+    def _build_index(self) -> Dict[str, Any]:
+        cap = cv2.VideoCapture(self.path)
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 0
+            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+        finally:
+            cap.release()
+        duration = frame_count / fps if fps > 0 and frame_count > 0 else None
+        index = {"fps": fps, "duration": duration, "keyframes": [0.0], "method": "none"}
+
+        if shutil.which("ffprobe") is None:
+            return index
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "v:0", "-skip_frame", "nokey",
+             "-show_entries", "frame=pts_time,best_effort_timestamp_time", "-of", "csv=p=0", self.path],
+            capture_output=True,
+            text=True,
+            check=False
+        )
+        if result.returncode != 0:
+            logger.warning(f"[VIDEO SOURCE] ffprobe failed for {self.path}: {result.stderr.strip()[:200]}")
+            return index
+        keyframes = []
+        for line in result.stdout.splitlines():
+            for value in line.split(","):
+                try:
+                    keyframes.append(float(value))
+                    break
+                except ValueError:
+                    continue
+        if keyframes:
+            index["keyframes"] = sorted(set(keyframes))
+            index["method"] = "ffprobe"
+        return index
+
+    def keyframe_before(self, timestamp: float) -> float:
+        keyframes = self.keyframes
+        i = bisect_right(keyframes, timestamp)
+        return keyframes[i - 1] if i > 0 else 0.0
+
+    def seek_landing(self, timestamp: float) -> Optional[float]:
+        fps = self.load_index().get("fps")
+        if self.index.get("method") == "none" or not fps:
+            return None
+        backoff = self.SEEK_BACKOFF_FRAMES / fps
+        keyframes = self.keyframes
+        i = bisect_right(keyframes, timestamp - backoff)
+        candidates = [keyframe + backoff for keyframe in keyframes[max(0, i - 1):i + 1]]
+        return min(candidates, key=lambda landing: abs(landing - timestamp)) if candidates else None
+
+    def read_frame(self, timestamp: float, tolerance: float = 0.0) -> Tuple[Any, float]:
+        with self._lock:
+            if self._cap is None:
+                self._cap = cv2.VideoCapture(self.path)
+                self._position = None
+                self._last = None
+                if not self._cap.isOpened():
+                    self._cap = None
+                    logger.error(f"[VIDEO SOURCE] Failed to open {self.path}")
+                    return None, timestamp
+
+            self.load_index()
+            if tolerance > 0 and self._last is not None and abs(self._last[0] - timestamp) <= tolerance:
+                self.snapped += 1
+                return self._last[1], self._last[0]
+
+            if not self._needs_seek(timestamp):
+                self.forward_reads += 1
+                return self._decode_until(timestamp)
+
+            if tolerance > 0:
+                landing = self.seek_landing(timestamp)
+                if landing is not None and abs(landing - timestamp) <= tolerance:
+                    timestamp = landing
+                    self.snapped += 1
+
+            self._cap.set(cv2.CAP_PROP_POS_MSEC, timestamp * 1000)
+            self.seeks += 1
+            return self._decode_until(timestamp)
+
+    def _needs_seek(self, timestamp: float) -> bool:
+        if self._position is None or timestamp < self._position:
+            return True
+        if self.index.get("method") == "none":
+            return timestamp - self._position > self.UNINDEXED_READ_AHEAD
+        return self.keyframe_before(timestamp) > self._position
+
+    def _decode_until(self, timestamp: float) -> Tuple[Any, float]:
+        while True:
+            if not self._cap.grab():
+                self._position = None
+                return None, timestamp
+            self._position = self._cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if self._position >= timestamp - 1e-3:
+                break
+        success, frame = self._cap.retrieve()
+        if not success:
+            return None, timestamp
+        self._last = (self._position, frame)
+        return frame, self._position
+
+    def close(self):
+        with self._lock:
+            if self._cap is not None:
+                self._cap.release()
+                self._cap = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "indexed": self.index is not None,
+            "keyframes": len(self.index["keyframes"]) if self.index else None,
+            "seeks": self.seeks,
+            "forward_reads": self.forward_reads,
+            "snapped": self.snapped,
+        }
+
+
+class LocalVideoLibrary:
+
+    def __init__(self, roots: Optional[List[str]] = None):
+        if roots is None:
+            roots = [r for r in os.getenv("LOCAL_VIDEO_DIRS", "videos").split(os.pathsep) if r]
+        self.roots = [os.path.realpath(root) for root in roots]
+        self.sources: Dict[str, LocalVideoSource] = {}
+        self._durations: Dict[str, Tuple[int, float, Optional[float]]] = {}
+
+    @staticmethod
+    def is_local(video_id: str) -> bool:
+        return video_id.startswith(LOCAL_PREFIX)
+
+    def resolve(self, video_id: str) -> Optional[LocalVideoSource]:
+        if not self.is_local(video_id):
+            return None
+        source = self.sources.get(video_id)
+        if source is not None:
+            return source
+        path = self._find(video_id[len(LOCAL_PREFIX):])
+        if path is None:
+            return None
+        source = LocalVideoSource(video_id, path)
+        self.sources[video_id] = source
+        return source
+
+    def _find(self, name: str) -> Optional[str]:
+        for root in self.roots:
+            path = os.path.realpath(os.path.join(root, name))
+            if os.path.commonpath([root, path]) != root:
+                continue
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def list_videos(self) -> List[Dict[str, Any]]:
+        videos = []
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            for directory, _, files in os.walk(root):
+                for name in sorted(files):
+                    if not name.lower().endswith(VIDEO_EXTENSIONS):
+                        continue
+                    path = os.path.join(directory, name)
+                    video_id = LOCAL_PREFIX + os.path.relpath(path, root).replace(os.sep, "/")
+                    videos.append({
+                        "videoId": video_id,
+                        "name": name,
+                        "duration": self._duration(path),
+                    })
+        return videos
+
+    def _duration(self, path: str) -> Optional[float]:
+        stat = os.stat(path)
+        cached = self._durations.get(path)
+        if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime):
+            return cached[2]
+        duration = None
+        try:
+            with open(f"{path}.keyframes.json") as f:
+                index = json.load(f)
+            if index.get("size") == stat.st_size and index.get("mtime") == stat.st_mtime:
+                duration = index.get("duration")
+        except (FileNotFoundError, ValueError):
+            pass
+        if duration is None:
+            cap = cv2.VideoCapture(path)
+            try:
+                fps = cap.get(cv2.CAP_PROP_FPS) or 0
+                frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+            finally:
+                cap.release()
+            duration = frame_count / fps if fps > 0 and frame_count > 0 else None
+        if duration is not None:
+            duration = round(duration, 2)
+        self._durations[path] = (stat.st_size, stat.st_mtime, duration)
+        return duration
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "roots": self.roots,
+            "open_sources": {video_id: source.stats() for video_id, source in list(self.sources.items())},
+        }
+
+
+_library: Optional[LocalVideoLibrary] = None
+
+
+def get_video_library() -> LocalVideoLibrary:
+    global _library
+    if _library is None:
+        _library = LocalVideoLibrary()
+    return _library
@@ -4,10 +4,14 @@ import os
 import httpx
 import base64
 import asyncio
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from utils.image_processor import compress_image
 from services.object_detector import ObjectDetector
 from services.pose_estimator import PoseEstimator
+from services.circuit_breaker import get_breaker
+from services.deadline import Deadline, stage_timeout
+from services.priority_scheduler import get_scheduler
+from services.quality_profiles import get_profile
 
 
 class VisionAnalyzer:
@@ -27,6 +31,8 @@ class VisionAnalyzer:
         self.azure_client = None
         self.claude_client = None
         self.provider = None
+        self.azure_breaker = get_breaker("azure_openai")
+        self.claude_breaker = get_breaker("anthropic")
         
 
         self.use_enhanced = use_enhanced
@@ -70,58 +76,109 @@ class VisionAnalyzer:
         if not self.azure_client and not self.claude_client:
             print(f"[VISION] No vision AI provider available - will use stub responses")
     
+    def provider_breaker(self):
+        
+        if self.azure_client:
+            return self.azure_breaker
+        if self.claude_client:
+            return self.claude_breaker
+        return None
+    
     async def analyze(self, base64_image: str, context: Optional[str] = None) -> str:
         
         return await self.analyze_frame(base64_image, context)
     
-    async def analyze_frame(self, base64_image: str, context: Optional[str] = None) -> str:
+    async def analyze_frame(
+        self,
+        base64_image: str,
+        context: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        detections: Optional[Tuple[Optional[Dict], Optional[Dict]]] = None,
+        fallback: bool = True
+    ) -> Optional[str]:
         
-
+        commentary = None
         if self.use_enhanced and (self.object_detector or self.pose_estimator):
-            return await self._analyze_enhanced(base64_image, context)
+            if detections is None:
+                try:
+                    detections = await self.detect(base64_image)
+                except Exception as e:
+                    print(f"[VISION] ✗ Local detection error: {e}")
+                    detections = (None, None)
+            commentary = await self._analyze_enhanced(base64_image, context, deadline, detections)
+        elif self.azure_client:
+            commentary = await self._analyze_with_azure(base64_image, context, deadline)
+        elif self.claude_client:
+            commentary = await self._analyze_with_claude(base64_image, context, deadline)
+        
+        if commentary or not fallback:
+            return commentary
+        if detections is not None:
+            return self._generate_commentary_from_detections(*detections)
+        return self._generate_stub_commentary()
+    
+    def has_local_detectors(self) -> bool:
+        
+        return bool(
+            (self.object_detector and self.object_detector.initialized) or
+            (self.pose_estimator and self.pose_estimator.initialized)
+        )
+    
+    async def detect(self, base64_image: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        
+        detection_task = None
+        pose_task = None
+        
+        inference = get_scheduler("inference")
+        profile = get_profile()
+        if self.object_detector and self.object_detector.initialized:
+            detection_task = asyncio.create_task(
+                inference.run(self.object_detector.detect_objects, base64_image, 0.25, profile.yolo_model)
+            )
+        
+        if self.pose_estimator and self.pose_estimator.initialized:
+            pose_task = asyncio.create_task(
+                inference.run(self.pose_estimator.estimate_pose, base64_image, profile.pose_complexity)
+            )
         
 
-        if self.azure_client:
-            return await self._analyze_with_azure(base64_image, context)
+        detection_result = None
+        pose_result = None
         
-        if self.claude_client:
-            return await self._analyze_with_claude(base64_image, context)
+        if detection_task:
+            detection_result = await detection_task
+        if pose_task:
+            pose_result = await pose_task
         
-        return self._generate_stub_commentary()
+        return detection_result, pose_result
     
-    async def _analyze_enhanced(self, base64_image: str, context: Optional[str] = None) -> str:
+    def summarize_detections(self, detection_result: Optional[Dict], pose_result: Optional[Dict]) -> Optional[str]:
+        
+        if not (detection_result and detection_result.get('players')) and not (pose_result and pose_result.get('poses')):
+            return None
+        return self._generate_commentary_from_detections(detection_result, pose_result)
+    
+    async def _analyze_enhanced(
+        self,
+        base64_image: str,
+        context: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        detections: Tuple[Optional[Dict], Optional[Dict]] = (None, None)
+    ) -> Optional[str]:
         
         try:
-
-            detection_task = None
-            pose_task = None
-            
-            if self.object_detector and self.object_detector.initialized:
-                loop = asyncio.get_event_loop()
-                detection_task = loop.run_in_executor(
-                    None, 
-                    self.object_detector.detect_objects, 
-                    base64_image
-                )
-            
-            if self.pose_estimator and self.pose_estimator.initialized:
-                loop = asyncio.get_event_loop()
-                pose_task = loop.run_in_executor(
-                    None,
-                    self.pose_estimator.estimate_pose,
-                    base64_image
-                )
+            detection_result, pose_result = detections
             
 
-            detection_result = None
-            pose_result = None
+            vision_breaker = self.provider_breaker()
+            if vision_breaker and vision_breaker.is_open():
+                print(f"[VISION] {vision_breaker.name} circuit open - skipping vision call")
+                return None
             
-            if detection_task:
-                detection_result = await detection_task
-            if pose_task:
-                pose_result = await pose_task
+            if deadline is not None and not deadline.can_run(1.0):
+                print(f"[VISION] Deadline nearly exhausted ({deadline.remaining():.2f}s) - skipping vision call")
+                return None
             
-
             enhanced_context = self._build_enhanced_context(
                 detection_result, 
                 pose_result, 
@@ -130,12 +187,10 @@ class VisionAnalyzer:
             
 
             if self.azure_client:
-                return await self._analyze_with_azure(base64_image, enhanced_context)
+                return await self._analyze_with_azure(base64_image, enhanced_context, deadline)
             elif self.claude_client:
-                return await self._analyze_with_claude(base64_image, enhanced_context)
-            else:
-
-                return self._generate_commentary_from_detections(detection_result, pose_result)
+                return await self._analyze_with_claude(base64_image, enhanced_context, deadline)
+            return None
                 
         except Exception as e:
             print(f"[VISION] ✗ Enhanced analysis error: {e}")
@@ -143,10 +198,10 @@ class VisionAnalyzer:
             traceback.print_exc()
 
             if self.azure_client:
-                return await self._analyze_with_azure(base64_image, context)
+                return await self._analyze_with_azure(base64_image, context, deadline)
             elif self.claude_client:
-                return await self._analyze_with_claude(base64_image, context)
-            return self._generate_stub_commentary()
+                return await self._analyze_with_claude(base64_image, context, deadline)
+            return None
     
     def _build_enhanced_context(self, detection_result: Optional[Dict], pose_result: Optional[Dict], original_context: Optional[str]) -> str:
         
@@ -218,12 +273,21 @@ class VisionAnalyzer:
         
         return self._generate_stub_commentary()
     
-    async def _analyze_with_azure(self, base64_image: str, context: Optional[str] = None) -> str:
+    async def _analyze_with_azure(self, base64_image: str, context: Optional[str] = None, deadline: Optional[Deadline] = None) -> Optional[str]:
+        
+        if deadline is not None and not deadline.can_run():
+            print(f"[VISION] Deadline exhausted - skipping Azure vision call")
+            return None
+        
+        if not self.azure_breaker.allow_request():
+            print(f"[VISION] Azure circuit open - skipping vision call")
+            return None
         
         try:
 
 
-            compressed = compress_image(base64_image, max_size=1024, quality=85)
+            profile = get_profile()
+            compressed = compress_image(base64_image, max_size=profile.azure_image_size, quality=profile.azure_image_quality)
             
 
             prompt = 
@@ -237,36 +301,39 @@ class VisionAnalyzer:
             
             for attempt in range(max_retries):
                 try:
-                    response = await self.azure_client.post(
-                        self.azure_vision_endpoint,
-                        headers={
-                            "api-key": self.azure_key,
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "messages": [
-                                {
-                                    "role": "user",
-                                    "content": [
-                                        {
-                                            "type": "text",
-                                            "text": prompt
-                                        },
-                                        {
-                                            "type": "image_url",
-                                            "image_url": {
-                                                "url": f"data:image/jpeg;base64,{compressed}"
+                    async with get_scheduler("llm").slot():
+                        response = await self.azure_client.post(
+                            self.azure_vision_endpoint,
+                            timeout=stage_timeout(deadline, 30.0),
+                            headers={
+                                "api-key": self.azure_key,
+                                "Content-Type": "application/json"
+                            },
+                            json={
+                                "messages": [
+                                    {
+                                        "role": "user",
+                                        "content": [
+                                            {
+                                                "type": "text",
+                                                "text": prompt
+                                            },
+                                            {
+                                                "type": "image_url",
+                                                "image_url": {
+                                                    "url": f"data:image/jpeg;base64,{compressed}"
+                                                }
                                             }
-                                        }
-                                    ]
-                                }
-                            ],
-                            "temperature": 0.7,
-                            "max_tokens": 300
-                        }
-                    )
+                                        ]
+                                    }
+                                ],
+                                "temperature": 0.7,
+                                "max_tokens": 300
+                            }
+                        )
                     
                     if response.status_code == 200:
+                        self.azure_breaker.record_success()
                         data = response.json()
                         commentary = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
                         print(f"[VISION] ✓ Azure Vision analysis: {commentary[:60]}...")
@@ -287,42 +354,63 @@ class VisionAnalyzer:
 
                                 retry_delay = retry_delay * 5
                             
+                            if deadline is not None and not deadline.can_run(retry_delay + 1.0):
+                                print(f"[VISION] Rate limit (429) - no deadline budget left for retry")
+                                return None
+                            
                             print(f"[VISION] Rate limit (429) - waiting {retry_delay:.1f}s before retry (attempt {attempt + 1}/{max_retries})...")
                             await asyncio.sleep(retry_delay)
                             continue
                         else:
                             print(f"[VISION] ✗ Azure Vision API rate limit - max retries reached")
-                            return self._generate_stub_commentary()
+                            self.azure_breaker.record_failure()
+                            return None
                     else:
                         print(f"[VISION] ✗ Azure Vision API error: {response.status_code} - {response.text}")
-                        return self._generate_stub_commentary()
+                        self.azure_breaker.record_failure()
+                        return None
                 except Exception as e:
-                    if attempt < max_retries - 1:
+                    if attempt < max_retries - 1 and (deadline is None or deadline.can_run(retry_delay + 1.0)):
                         print(f"[VISION] Request error (attempt {attempt + 1}/{max_retries}): {e}")
                         await asyncio.sleep(retry_delay)
                         continue
                     else:
                         raise
             
+        except asyncio.CancelledError:
+            self.azure_breaker.release()
+            raise
         except Exception as e:
+            if deadline is None or not deadline.expired():
+                self.azure_breaker.record_failure()
             print(f"[VISION] ✗ Azure Vision analysis error: {e}")
             import traceback
             traceback.print_exc()
-            return self._generate_stub_commentary()
+            return None
     
-    async def _analyze_with_claude(self, base64_image: str, context: Optional[str] = None) -> str:
+    async def _analyze_with_claude(self, base64_image: str, context: Optional[str] = None, deadline: Optional[Deadline] = None) -> Optional[str]:
+        
+        if deadline is not None and not deadline.can_run():
+            print(f"[VISION] Deadline exhausted - skipping Claude vision call")
+            return None
+        
+        if not self.claude_breaker.allow_request():
+            print(f"[VISION] Anthropic circuit open - skipping vision call")
+            return None
         
         try:
-            compressed = compress_image(base64_image, max_size=384, quality=50)
+            profile = get_profile()
+            compressed = compress_image(base64_image, max_size=profile.claude_image_size, quality=profile.claude_image_quality)
             
             prompt = 
             
             if context:
                 prompt = f"CONTEXT: {context}\n\n{prompt}"
             
-            message = self.claude_client.messages.create(
+            message = await get_scheduler("llm").run(lambda: self.claude_client.messages.create(
                 model="claude-3-haiku-20240307",
                 max_tokens=300,
+                timeout=stage_timeout(deadline, 600.0),
                 messages=[{
                     "role": "user",
                     "content": [
@@ -340,15 +428,21 @@ class VisionAnalyzer:
                         }
                     ]
                 }]
-            )
+            ))
             
+            self.claude_breaker.record_success()
             commentary = message.content[0].text.strip()
             print(f"[VISION] ✓ Claude Vision analysis: {commentary[:60]}...")
             return commentary
             
+        except asyncio.CancelledError:
+            self.claude_breaker.release()
+            raise
         except Exception as e:
+            if deadline is None or not deadline.expired():
+                self.claude_breaker.record_failure()
             print(f"[VISION] ✗ Claude Vision analysis error: {e}")
-            return self._generate_stub_commentary()
+            return None
     
     async def extract_positions(self, base64_image: str) -> Dict[str, Any]:
         
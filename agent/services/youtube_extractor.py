@@ -3,12 +3,40 @@ import yt_dlp
 import cv2
 import base64
 import asyncio
-from typing import Optional
+import re
+import shutil
+import subprocess
+import threading
+import time
+from typing import Optional, Tuple, Dict, Any
 import logging
+import os
+import numpy as np
+from services.circuit_breaker import get_breaker
+from services.deadline import Deadline
+from services.priority_scheduler import get_scheduler
+from services.quality_profiles import get_profile
+from services.live_ingest import get_live_ingest
+from services.proxy_store import get_proxy_store
+from services.video_source import get_video_library
 
 logger = logging.getLogger(__name__)
 
 
+SEEK_EXACT = "exact"
+SEEK_FAST = "fast"
+SEEK_MODES = (SEEK_EXACT, SEEK_FAST)
+
+FAST_SEEK_TOLERANCE = float(os.getenv("FAST_SEEK_TOLERANCE_SECONDS", "1.0"))
+
+_PTS_TIME = re.compile(r"pts_time:\s*([0-9.]+)")
+
+STREAM_URL_TTL = float(os.getenv("STREAM_URL_TTL_SECONDS", "1800"))
+
+_stream_urls: Dict[str, Tuple[float, str]] = {}
+_stream_urls_lock = threading.Lock()
+
+
 class YouTubeFrameExtractor:
     
     
@@ -21,22 +49,109 @@ class YouTubeFrameExtractor:
             'no_warnings': True,
             'extract_flat': False,
         }
+        self.breaker = get_breaker("youtube_frames")
+    
+    async def extract_frame(self, video_url_or_id: str, timestamp: float, deadline: Optional[Deadline] = None, seek_mode: str = SEEK_EXACT) -> Optional[str]:
+        
+        frame, _ = await self.extract_frame_at(video_url_or_id, timestamp, deadline=deadline, seek_mode=seek_mode)
+        return frame
     
-    async def extract_frame(self, video_url_or_id: str, timestamp: float) -> Optional[str]:
+    async def extract_frame_at(
+        self,
+        video_url_or_id: str,
+        timestamp: float,
+        deadline: Optional[Deadline] = None,
+        seek_mode: str = SEEK_EXACT,
+        frame_info: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Optional[str], float]:
+        
+        if deadline is not None and not deadline.can_run():
+            logger.info(f"Deadline exhausted - skipping frame extraction at {timestamp}s")
+            return None, timestamp
+        
+        tolerance = FAST_SEEK_TOLERANCE if seek_mode == SEEK_FAST else 0.0
+        profile = get_profile()
+        
+        local_source = get_video_library().resolve(video_url_or_id)
+        if local_source is not None:
+            return await get_scheduler("decode").run(
+                self._read_local_sync,
+                local_source,
+                timestamp,
+                profile.frame_max_size,
+                profile.frame_jpeg_quality,
+                tolerance
+            )
+        
+        live_frame = get_live_ingest().latest_frame(video_url_or_id)
+        if live_frame is not None:
+            if frame_info is not None:
+                frame_info["clock"] = "live"
+            return live_frame[1], live_frame[0]
+        
+        proxies = get_proxy_store()
+        if proxies.covers(video_url_or_id, profile.frame_max_size):
+            proxy_frame = await get_scheduler("decode").run(
+                proxies.read_frame,
+                video_url_or_id,
+                timestamp,
+                profile.frame_max_size,
+                profile.frame_jpeg_quality,
+                tolerance
+            )
+            if proxy_frame is not None:
+                return proxy_frame
+        proxies.record_access(video_url_or_id)
+        
+        if not self.breaker.allow_request():
+            logger.info(f"YouTube circuit open - skipping frame extraction at {timestamp}s")
+            return None, timestamp
         
         try:
 
-            loop = asyncio.get_event_loop()
-            frame = await loop.run_in_executor(
-                None, 
-                self._extract_frame_sync, 
-                video_url_or_id, 
-                timestamp
-            )
-            return frame
+            future = self._extract_frame_scheduled(video_url_or_id, timestamp, tolerance)
+            if deadline is not None:
+                return await asyncio.wait_for(future, timeout=deadline.remaining())
+            return await future
+        except asyncio.TimeoutError:
+            self.breaker.release()
+            logger.warning(f"Frame extraction at {timestamp}s ran past request deadline")
+            return None, timestamp
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
         except Exception as e:
+            self.breaker.record_failure()
             logger.error(f"Frame extraction error: {e}")
-            return None
+            return None, timestamp
+    
+    async def _extract_frame_scheduled(self, video_url_or_id: str, timestamp: float, tolerance: float = 0.0) -> Tuple[Optional[str], float]:
+        
+        logger.info(f"Extracting frame from {video_url_or_id[:50]}... at {timestamp}s")
+        stream_url = await get_scheduler("resolve").run(self.resolve_stream_url, video_url_or_id)
+        if not stream_url:
+            return None, timestamp
+        profile = get_profile()
+        if tolerance > 0 and shutil.which("ffmpeg"):
+            frame, actual = await get_scheduler("decode").run(
+                self._read_keyframe_sync,
+                stream_url,
+                timestamp,
+                profile.frame_max_size,
+                profile.frame_jpeg_quality,
+                tolerance
+            )
+            if frame is not None and abs(actual - timestamp) <= tolerance:
+                return frame, actual
+            logger.info(f"No frame within {tolerance:g}s of {timestamp}s - falling back to exact seek")
+        frame = await get_scheduler("decode").run(
+            self._read_frame_sync,
+            stream_url,
+            timestamp,
+            profile.frame_max_size,
+            profile.frame_jpeg_quality
+        )
+        return frame, timestamp
     
     async def extract_frames_range(self, video_url_or_id: str, start_time: float, end_time: float, sample_interval: float = 1.0) -> list[tuple[float, Optional[str]]]:
         
@@ -78,53 +193,104 @@ class YouTubeFrameExtractor:
         frames.sort(key=lambda x: x[0])
         return frames
     
-    def _extract_frame_sync(self, video_url_or_id: str, timestamp: float) -> Optional[str]:
+    def resolve_stream_url(self, video_url_or_id: str) -> Optional[str]:
         
-        cap = None
-        try:
+        local_source = get_video_library().resolve(video_url_or_id)
+        if local_source is not None:
+            return local_source.path
 
-            if video_url_or_id.startswith('http://') or video_url_or_id.startswith('https://'):
-                video_url = video_url_or_id
-            else:
+        if video_url_or_id.startswith('http://') or video_url_or_id.startswith('https://'):
+            video_url = video_url_or_id
+        else:
 
-                video_url = f"https://www.youtube.com/watch?v={video_url_or_id}"
-            logger.info(f"Extracting frame from {video_url[:50]}... at {timestamp}s")
-            
+            video_url = f"https://www.youtube.com/watch?v={video_url_or_id}"
+        
+        with _stream_urls_lock:
+            cached = _stream_urls.get(video_url_or_id)
+        if cached is not None and time.monotonic() - cached[0] < STREAM_URL_TTL:
+            return cached[1]
+        is_live = False
 
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                try:
-                    info = ydl.extract_info(video_url, download=False)
-                    if not info or 'url' not in info:
-                        logger.error(f"Failed to get stream URL for {video_url[:50]}...")
-                        return None
-                    stream_url = info['url']
-                    
-
-                    if stream_url and ('.m3u8' in stream_url or 'manifest' in stream_url.lower()):
-                        logger.warning(f"HLS stream detected (OpenCV may fail), trying alternative format...")
-
-                        formats = info.get('formats', [])
-                        for fmt in formats:
-                            fmt_url = fmt.get('url', '')
-                            if fmt_url and '.m3u8' not in fmt_url and 'manifest' not in fmt_url.lower():
-
-                                if fmt.get('vcodec') != 'none':
-                                    stream_url = fmt_url
-                                    logger.info(f"Using non-HLS format: {fmt.get('format_id', 'unknown')}")
-                                    break
-                except Exception as e:
-                    logger.error(f"yt-dlp extraction error: {e}")
+        with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
+            try:
+                info = ydl.extract_info(video_url, download=False)
+                self.breaker.record_success()
+                if info:
+                    is_live = bool(info.get('is_live'))
+                    get_live_ingest().mark_live(video_url_or_id, is_live)
+                if not info or 'url' not in info:
+                    logger.error(f"Failed to get stream URL for {video_url[:50]}...")
                     return None
-            
-            if not stream_url:
-                logger.error(f"No valid stream URL found for {video_url[:50]}...")
+                stream_url = info['url']
+                
+
+                if stream_url and ('.m3u8' in stream_url or 'manifest' in stream_url.lower()):
+                    logger.warning(f"HLS stream detected (OpenCV may fail), trying alternative format...")
+
+                    formats = info.get('formats', [])
+                    for fmt in formats:
+                        fmt_url = fmt.get('url', '')
+                        if fmt_url and '.m3u8' not in fmt_url and 'manifest' not in fmt_url.lower():
+
+                            if fmt.get('vcodec') != 'none':
+                                stream_url = fmt_url
+                                logger.info(f"Using non-HLS format: {fmt.get('format_id', 'unknown')}")
+                                break
+            except Exception as e:
+                self.breaker.record_failure()
+                logger.error(f"yt-dlp extraction error: {e}")
                 return None
-            
+        
+        if not stream_url:
+            logger.error(f"No valid stream URL found for {video_url[:50]}...")
+            return None
+        if not is_live:
+            now = time.monotonic()
+            with _stream_urls_lock:
+                if len(_stream_urls) >= 1024:
+                    for key in [k for k, (resolved_at, _) in _stream_urls.items() if now - resolved_at >= STREAM_URL_TTL]:
+                        del _stream_urls[key]
+                _stream_urls[video_url_or_id] = (now, stream_url)
+        return stream_url
+    
+    @staticmethod
+    def encode_frame(frame, max_size: int = 800, quality: int = 78) -> Optional[str]:
+        
 
+        height, width = frame.shape[:2]
+        aspect_ratio = width / height
+        
+
+        if aspect_ratio > 1:
+
+            new_width = max_size
+            new_height = int(max_size / aspect_ratio)
+        else:
+
+            new_height = max_size
+            new_width = int(max_size * aspect_ratio)
+        
+        frame_resized = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+        
+
+        encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+        success, buffer = cv2.imencode('.jpg', frame_resized, encode_param)
+        
+        if not success:
+            logger.error("Failed to encode frame as JPEG")
+            return None
+        
+
+        return base64.b64encode(buffer).decode('utf-8')
+    
+    def _read_frame_sync(self, stream_url: str, timestamp: float, max_size: int = 800, quality: int = 78) -> Optional[str]:
+        
+        cap = None
+        try:
             cap = cv2.VideoCapture(stream_url)
             
             if not cap.isOpened():
-                logger.error(f"Failed to open video stream for {video_url[:50]}... (URL: {stream_url[:100]}...)")
+                logger.error(f"Failed to open video stream (URL: {stream_url[:100]}...)")
                 return None
             
 
@@ -134,38 +300,13 @@ class YouTubeFrameExtractor:
             success, frame = cap.read()
             
             if not success or frame is None:
-                logger.warning(f"Failed to read frame at {timestamp}s for {video_url[:50]}...")
-                return None
-            
-
-            height, width = frame.shape[:2]
-            aspect_ratio = width / height
-            
-
-            max_size = 800
-            if aspect_ratio > 1:
-
-                new_width = max_size
-                new_height = int(max_size / aspect_ratio)
-            else:
-
-                new_height = max_size
-                new_width = int(max_size * aspect_ratio)
-            
-            frame_resized = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
-            
-
-            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 78]
-            success, buffer = cv2.imencode('.jpg', frame_resized, encode_param)
-            
-            if not success:
-                logger.error("Failed to encode frame as JPEG")
+                logger.warning(f"Failed to read frame at {timestamp}s")
                 return None
             
 
-            base64_image = base64.b64encode(buffer).decode('utf-8')
-            
-            logger.info(f"Successfully extracted frame from {video_url[:50]}... at {timestamp}s")
+            base64_image = self.encode_frame(frame, max_size, quality)
+            if base64_image:
+                logger.info(f"Successfully extracted frame at {timestamp}s")
             return base64_image
             
         except Exception as e:
@@ -174,3 +315,49 @@ class YouTubeFrameExtractor:
         finally:
             if cap is not None:
                 cap.release()
+    
+    def _read_local_sync(self, source, timestamp: float, max_size: int = 800, quality: int = 78, tolerance: float = 0.0) -> Tuple[Optional[str], float]:
+        
+        try:
+            frame, actual = source.read_frame(timestamp, tolerance)
+            if frame is None:
+                logger.warning(f"Failed to read frame at {timestamp}s from {source.path}")
+                return None, timestamp
+            return self.encode_frame(frame, max_size, quality), actual
+        except Exception as e:
+            logger.error(f"Local extraction error: {e}")
+            return None, timestamp
+    
+    def _read_keyframe_sync(self, stream_url: str, timestamp: float, max_size: int = 800, quality: int = 78, tolerance: float = FAST_SEEK_TOLERANCE) -> Tuple[Optional[str], float]:
+        
+        cmd = [
+            'ffmpeg',
+            '-hide_banner',
+            '-loglevel', 'info',
+            '-noaccurate_seek',
+            '-ss', str(timestamp),
+            '-copyts',
+            '-i', stream_url,
+            '-frames:v', '1',
+            '-vf', f'select=gte(t\\,{max(0.0, timestamp - tolerance):.3f}),showinfo',
+            '-f', 'image2pipe',
+            '-vcodec', 'mjpeg',
+            '-q:v', '2',
+            'pipe:1'
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, timeout=15, check=False)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Keyframe seek at {timestamp}s timed out")
+            return None, timestamp
+        if result.returncode != 0 or not result.stdout:
+            logger.warning(f"Keyframe seek at {timestamp}s failed: {result.stderr.decode(errors='ignore')[-200:]}")
+            return None, timestamp
+        
+        match = _PTS_TIME.search(result.stderr.decode(errors='ignore'))
+        actual = float(match.group(1)) if match else timestamp
+        frame = cv2.imdecode(np.frombuffer(result.stdout, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return None, timestamp
+        logger.info(f"Keyframe seek for {timestamp}s landed on {actual:.2f}s")
+        return self.encode_frame(frame, max_size, quality), actual
@@ -0,0 +1,42 @@
+import threading
+
+from services.analysis_store import AnalysisStore
+
+
+def test_writes_are_batched_and_ranked(tmp_path):
+    store = AnalysisStore(str(tmp_path / "store.db"))
+    for i in range(200):
+        store.upsert("v", i % 20, commentary=f"c{i}", source="captions")
+    store.upsert("v", 3, commentary="vision", source="vision")
+    store.upsert("v", 3, commentary="caption", source="captions", caption="x")
+    store.flush()
+    row = store.get("v", 3)
+    assert (row["commentary"], row["source"], row["caption"]) == ("vision", "vision", "x")
+    assert store.stats()["rows"] == 20
+    assert store.stats()["batches"] < 202
+    assert [r["second"] for r in store.range("v", 5, 7)] == [5, 6, 7]
+    assert store.nearest("v", 30.0, max_distance=2) is None
+    store.close()
+
+
+def test_reads_do_not_wait_for_a_commit(tmp_path):
+    store = AnalysisStore(str(tmp_path / "store.db"))
+    store.upsert("v", 1, commentary="c", source="captions")
+    store.flush()
+    writer = store._db
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("UPDATE analysis_timeline SET caption = 'pending'")
+    done = threading.Event()
+    threading.Thread(target=lambda: (store.get("v", 1), done.set())).start()
+    assert done.wait(1.0)
+    assert store.get("v", 1)["caption"] is None
+    writer.commit()
+    store.close()
+
+
+def test_memory_store_still_serves_reads():
+    store = AnalysisStore(":memory:")
+    store.upsert("v", 1, commentary="c", source="captions")
+    store.flush()
+    assert store.nearest("v", 1.0)["commentary"] == "c"
+    store.close()
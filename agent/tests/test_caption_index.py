@@ -0,0 +1,38 @@
+import pytest
+
+from services.caption_index import CaptionIndex, parse_event_query, tokenize
+
+
+def test_tokenize_folds_synonyms_and_compounds():
+    assert tokenize("Silva netted a free kick") == ["silva", "goal", "a", "freekick"]
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("when was the first goal", (["goal"], 0)),
+    ("When did Silva score his second?", (["silva", "goal"], 1)),
+    ("show me the penalty", (["penalty"], None)),
+    ("can you take me to the last yellow card", (["yellow", "card"], -1)),
+])
+def test_event_queries(message, expected):
+    assert parse_event_query(message) == expected
+
+
+@pytest.mark.parametrize("message", [
+    "Where is the ball right now?",
+    "why did he pass when he could shoot",
+    "when did the manager arrive at the club",
+    "what tactics are they using",
+])
+def test_non_event_questions_fall_through(message):
+    assert parse_event_query(message) is None
+
+
+def test_find_clusters_nearby_cues():
+    index = CaptionIndex([
+        {"start": 1325.0, "duration": 3.0, "text": "GOAL! Silva scores with a header"},
+        {"start": 1331.0, "duration": 3.0, "text": "what a goal that is"},
+        {"start": 4810.0, "duration": 3.0, "text": "Silva again, scored!"},
+    ])
+    occurrences = index.find(["silva", "goal"])
+    assert [o["timestamp"] for o in occurrences] == [1325.0, 4810.0]
+    assert index.find(["ramos", "goal"]) == []
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from services.caption_extractor import YouTubeCaptionExtractor
+from services.circuit_breaker import CircuitBreaker
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    return breaker
+
+
+def test_released_probe_frees_the_half_open_slot():
+    breaker = half_open_breaker()
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_cancelled_probe_does_not_reopen_the_circuit():
+    extractor = YouTubeCaptionExtractor()
+    extractor.breaker = half_open_breaker()
+    extractor._fetch_captions_sync = lambda video_id: time.sleep(0.3) or []
+
+    async def cancel_probe():
+        task = asyncio.create_task(extractor.fetch_captions("cancelled"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_probe())
+    assert extractor.breaker.state == CircuitBreaker.HALF_OPEN
+    assert extractor.breaker.total_failures == 1
+    assert not extractor.breaker.is_open()
+    assert extractor.breaker.allow_request()
@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from scripts.benchmark_dedup import corpus, parity
+from services.commentary_deduplicator import CommentaryDeduplicator, DeduplicatorTable
+
+REFERENCE_RATIO = 0.85
+MIN_AGREEMENT = 0.92
+MAX_DISAGREEMENT_SKEW = 0.05
+
+
+@pytest.mark.parametrize("seed", [7, 23])
+def test_parity_with_sequence_matcher_threshold(seed):
+    lines = corpus(400, random.Random(seed))
+    agree, extra_skips, missed_skips = parity(lines, REFERENCE_RATIO, None, 10)
+    assert agree / len(lines) >= MIN_AGREEMENT
+    assert abs(extra_skips - missed_skips) / len(lines) <= MAX_DISAGREEMENT_SKEW
+
+
+def test_repeats_are_skipped_and_new_lines_kept():
+    deduplicator = CommentaryDeduplicator()
+    deduplicator.add_commentary("Saka picks it up in midfield and drives forward at the defence", 1.0)
+    assert deduplicator.should_skip("Saka picks it up in midfield and drives forward at the defence")
+    assert deduplicator.should_skip("Saka picks it up in midfield and drives forward at the defence here")
+    assert not deduplicator.should_skip("The keeper comes out to claim it ahead of Kane")
+    assert deduplicator.should_skip("   ")
+
+
+def test_explicit_zero_threshold_is_honoured():
+    deduplicator = CommentaryDeduplicator(similarity_threshold=0.0)
+    assert deduplicator.threshold == 0.0
+    deduplicator.add_commentary("anything at all", 1.0)
+    assert deduplicator.should_skip("completely different words")
+
+
+def test_sessions_are_isolated_and_bounded():
+    table = DeduplicatorTable(max_sessions=2, idle_seconds=60)
+    table.get("a").add_commentary("Corner to the attacking side after Son forces a deflection", 1.0)
+    assert not table.get("b").should_skip("Corner to the attacking side after Son forces a deflection")
+    table.get("c")
+    assert "a" not in table.sessions
+    assert table.evicted == 1
@@ -0,0 +1,51 @@
+import pytest
+
+from services.event_timeline import EventTimeline, classify
+
+
+def cue(start, text):
+    return {"start": start, "duration": 3.0, "text": text}
+
+
+@pytest.mark.parametrize("text", [
+    "GOAL! Silva scores with a header from the corner",
+    "what a goal that is",
+    "and it's in the back of the net",
+    "Ramos makes it 2-1",
+])
+def test_goal_cues(text):
+    assert classify(text) == "goal"
+
+
+@pytest.mark.parametrize("text", [
+    "they really need a goal here",
+    "a shot on goal",
+    "great goal from Messi earlier",
+    "remember that goal last season",
+    "the goal kick is taken short",
+    "that goal is ruled out for offside",
+])
+def test_goal_false_positives(text):
+    assert classify(text) != "goal"
+
+
+def test_shot_on_goal_is_a_shot():
+    assert classify("a shot on goal") == "shot"
+
+
+def test_merge_window_does_not_chain():
+    timeline = EventTimeline.build([cue(0, "GOAL!"), cue(50, "what a goal"), cue(100, "he scores again"), cue(130, "scored!")])
+    assert [event["videoTimestamp"] for event in timeline.to_list("goal")] == [0.0, 100.0]
+
+
+def test_counts_until():
+    timeline = EventTimeline.build([
+        cue(600, "that's a yellow card, he's booked"),
+        cue(1325, "GOAL! Silva scores"),
+        cue(2935, "it's in the back of the net"),
+        cue(2950, "patient build-up from the back here"),
+    ])
+    assert timeline.count("goal") == 2
+    assert timeline.count("goal", until=2000) == 1
+    assert timeline.to_list("card")[0]["title"] == "Yellow card"
+    assert timeline.cues == 4
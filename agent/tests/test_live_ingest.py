@@ -0,0 +1,109 @@
+import http.server
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from services.live_ingest import LiveIngestManager, LiveIngestWorker
+
+
+def make_worker(video_id="live", resolve=lambda: None, sample_interval=1.0, buffer_seconds=5.0):
+    return LiveIngestWorker(video_id, resolve=resolve, encode=lambda frame: "jpeg", sample_interval=sample_interval, buffer_seconds=buffer_seconds)
+
+
+def test_window_keeps_spacing_and_latest_frame():
+    worker = make_worker()
+    worker.frames.extend((position / 2, f"f{position}") for position in range(21))
+    window = worker.window(3.0, 1.0)
+    positions = [position for position, _ in window]
+    assert positions[0] >= 7.0 and positions[-1] == 10.0
+    assert all(b - a >= 0.5 for a, b in zip(positions, positions[1:]))
+    assert worker.latest() == (10.0, "f20")
+
+
+def test_empty_worker_has_no_frames():
+    worker = make_worker()
+    assert worker.latest() is None
+    assert worker.window(5.0, 1.0) == []
+
+
+def test_manager_caps_workers_and_ignores_vod():
+    manager = LiveIngestManager(max_workers=1, idle_seconds=60, sample_interval=1.0, buffer_seconds=5.0)
+    worker = make_worker("first")
+    worker.thread = type("Alive", (), {"is_alive": lambda self: True})()
+    with manager._lock:
+        manager.live_videos["first"] = True
+        manager.workers["first"] = worker
+    assert manager.worker_for("first") is worker
+    assert manager.worker_for("vod") is None
+    manager.mark_live("second", True)
+    assert manager.worker_for("second") is None
+    assert manager.rejected == 1
+
+
+def test_idle_workers_are_reaped():
+    manager = LiveIngestManager(max_workers=2, idle_seconds=1.0, sample_interval=1.0, buffer_seconds=5.0)
+    worker = make_worker("idle")
+    worker.thread = type("Alive", (), {"is_alive": lambda self: True})()
+    worker.last_access = time.monotonic() - 5
+    manager.workers["idle"] = worker
+    with manager._lock:
+        manager._reap_locked()
+    assert not manager.workers
+    assert worker._stop.is_set()
+
+
+@pytest.fixture
+def stream_server(tmp_path):
+    cv2 = pytest.importorskip("cv2")
+    writer = cv2.VideoWriter(str(tmp_path / "live.avi"), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("OpenCV cannot write test video")
+    for index in range(80):
+        writer.write(np.full((48, 64, 3), index * 3 % 255, dtype=np.uint8))
+    writer.release()
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        requests = 0
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(tmp_path), **kwargs)
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            type(self).requests += 1
+            if type(self).requests == 1:
+                self.send_error(503)
+                return
+            super().do_GET()
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/live.avi", Handler
+    server.shutdown()
+    server.server_close()
+
+
+def test_ring_buffer_from_http_stream_with_reconnects(stream_server):
+    url, handler = stream_server
+    worker = make_worker(resolve=lambda: url, sample_interval=1.0, buffer_seconds=5.0)
+    worker.reconnect_seconds = 0.05
+    worker.start()
+    try:
+        deadline = time.monotonic() + 30
+        while worker.decoded < 15 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        worker.stop()
+        worker.thread.join(timeout=10)
+    assert worker.decoded >= 15
+    assert worker.reconnects >= 2
+    assert handler.requests >= 3
+    start, end = worker.stats()["buffered_span"]
+    assert end >= 14.0
+    assert end - start <= 5.0 + 1.0
+    positions = [position for position, _ in worker.frames]
+    assert all(b - a >= 0.9 for a, b in zip(positions, positions[1:]))
@@ -0,0 +1,84 @@
+import asyncio
+
+from services.prefetch_scheduler import PrefetchScheduler
+
+
+class FakeCache:
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, expire=None):
+        self.values[key] = value
+
+
+class SlowPipeline:
+
+    store = None
+
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def analyze(self, video_id, timestamp, deadline):
+        await self.release.wait()
+        return {"source": "vision", "commentary": f"{video_id}@{timestamp:g}"}
+
+
+def make_scheduler(pipeline):
+    scheduler = PrefetchScheduler(FakeCache(), pipeline, orchestrator=None)
+    scheduler.enabled = True
+    scheduler.lookahead = 10
+    scheduler.step = 5
+    return scheduler
+
+
+def test_shared_prefetch_survives_until_last_viewer_leaves():
+    async def run():
+        pipeline = SlowPipeline()
+        scheduler = make_scheduler(pipeline)
+        scheduler.record("a", "match", 0.0)
+        scheduler.record("b", "match", 0.0)
+        shared = dict(scheduler.in_progress)
+        assert set(shared) == {("analyze", "match", 5), ("analyze", "match", 10)}
+        assert all(count == 2 for count in scheduler.watchers.values())
+
+        scheduler.record("a", "match", 300.0)
+        await asyncio.sleep(0)
+        assert not any(task.cancelled() for task in shared.values())
+        assert all(scheduler.watchers[key] == 1 for key in shared)
+
+        scheduler.record("b", "match", 600.0)
+        await asyncio.sleep(0)
+        assert all(task.cancelled() for task in shared.values())
+        assert not any(key in scheduler.in_progress for key in shared)
+
+        pipeline.release.set()
+        await asyncio.gather(*scheduler.in_progress.values())
+        assert not scheduler.in_progress and not scheduler.watchers
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert scheduler.cancelled == 2
+    assert scheduler.completed == 4
+
+
+def test_restarted_target_is_not_removed_by_the_cancelled_task():
+    async def run():
+        scheduler = make_scheduler(SlowPipeline())
+        scheduler.record("a", "match", 0.0)
+        first = scheduler.in_progress[("analyze", "match", 5)]
+        scheduler.record("a", "match", 300.0)
+        scheduler.record("b", "match", 0.0)
+        second = scheduler.in_progress[("analyze", "match", 5)]
+        assert second is not first
+        await asyncio.sleep(0)
+        assert first.cancelled()
+        assert scheduler.in_progress[("analyze", "match", 5)] is second
+        for task in scheduler.in_progress.values():
+            task.cancel()
+        await asyncio.gather(*scheduler.in_progress.values(), return_exceptions=True)
+
+    asyncio.run(run())
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from services.proxy_store import ProxyStore
+from services.youtube_extractor import YouTubeFrameExtractor
+
+
+@pytest.fixture
+def source_video(tmp_path, monkeypatch):
+    cv2 = pytest.importorskip("cv2")
+    path = str(tmp_path / "source.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for index in range(40):
+        writer.write(np.full((48, 64, 3), index * 5, dtype=np.uint8))
+    writer.release()
+    monkeypatch.setattr(YouTubeFrameExtractor, "resolve_stream_url", lambda self, video_id: path)
+    return path
+
+
+def test_build_writes_proxy_files(tmp_path, source_video):
+    store = ProxyStore(directory=str(tmp_path / "proxies"))
+    meta = store._build("match", None)
+    assert meta["frames"] >= 10
+    assert sorted(p.suffix for p in (tmp_path / "proxies").iterdir()) == [".idx", ".json", ".mjpg"]
+
+
+def test_failed_build_removes_temporary_files(tmp_path, source_video):
+    store = ProxyStore(directory=str(tmp_path / "proxies"))
+    encoded = []
+
+    def failing_encode(frame):
+        if len(encoded) == 3:
+            raise RuntimeError("encoder crashed")
+        encoded.append(frame)
+        return b"jpeg"
+
+    store._encode = failing_encode
+    with pytest.raises(RuntimeError):
+        store._build("match", None)
+    assert list((tmp_path / "proxies").iterdir()) == []
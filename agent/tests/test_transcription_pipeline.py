@@ -0,0 +1,155 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+from services.audio_extractor import AudioExtractor
+from services.transcription_pipeline import SAMPLE_RATE, TICKS_PER_SECOND, TranscriptionPipeline
+
+ENDPOINT = "https://speech.test/recognize"
+
+
+class FakeAudio(AudioExtractor):
+
+    def __init__(self, seconds, truncate_at=None):
+        super().__init__()
+        self.azure_speech_key = "test-key"
+        self.azure_speech_endpoint = ENDPOINT
+        self.seconds = seconds
+        self.truncate_at = truncate_at
+
+    async def stream_audio_segment(self, video_id, start, end, sample_rate=SAMPLE_RATE, audio_format="s16le", status=None):
+        first = int(round(start * sample_rate))
+        last = min(int(round(end * sample_rate)), self.seconds * sample_rate)
+        if self.truncate_at is not None:
+            last = min(last, int(self.truncate_at * sample_rate))
+        samples = (np.arange(first, last) // sample_rate + 1).astype(np.int16)
+        pcm = samples.tobytes()
+        for offset in range(0, len(pcm), 32000):
+            yield pcm[offset:offset + 32000]
+        if status is not None and self.truncate_at is None:
+            status["complete"] = True
+
+
+class FakeSpeechService:
+
+    def __init__(self, with_words=True, latency=0.02, fail_requests=()):
+        self.with_words = with_words
+        self.latency = latency
+        self.fail_requests = set(fail_requests)
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        assert str(request.url).startswith(ENDPOINT)
+        assert request.headers["Ocp-Apim-Subscription-Key"] == "test-key"
+        assert request.headers["Content-Type"].startswith("audio/wav")
+        assert request.url.params["format"] == "detailed"
+        assert request.url.params["language"] == "en-US"
+        self.requests += 1
+        if self.requests in self.fail_requests:
+            return httpx.Response(500, text="overloaded")
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        audio = await request.aread()
+        assert audio[:4] == b"RIFF" and audio[8:12] == b"WAVE"
+        samples = np.frombuffer(audio[44:], dtype=np.int16)
+        words = [(i, f"w{int(samples[i * SAMPLE_RATE]) - 1}") for i in range(len(samples) // SAMPLE_RATE)]
+        if not words:
+            return httpx.Response(200, json={"RecognitionStatus": "InitialSilenceTimeout"})
+        best = {"Display": " ".join(word for _, word in words)}
+        if self.with_words:
+            best["Words"] = [
+                {"Word": word, "Offset": int((i + 0.1) * TICKS_PER_SECOND), "Duration": int(0.8 * TICKS_PER_SECOND)}
+                for i, word in words
+            ]
+        return httpx.Response(200, json={
+            "RecognitionStatus": "Success",
+            "Offset": int(0.1 * TICKS_PER_SECOND),
+            "Duration": int((len(words) - 0.2) * TICKS_PER_SECOND),
+            "DisplayText": best["Display"],
+            "NBest": [best],
+        })
+
+
+def make_pipeline(audio, speech, **kwargs):
+    return TranscriptionPipeline(audio_extractor=audio, transport=httpx.MockTransport(speech), **kwargs)
+
+
+def spoken(segments):
+    return [int(word[1:]) for segment in segments for word in segment["text"].split()]
+
+
+def test_chunk_grid_covers_range_with_overlap():
+    pipeline = TranscriptionPipeline(audio_extractor=FakeAudio(0), chunk_seconds=10, overlap_seconds=2)
+    assert pipeline.chunk_indexes(5.0, 30.0) == [0, 1, 2, 3]
+    assert [pipeline.chunk_start(i) for i in (0, 1, 2)] == [0.0, 8.0, 16.0]
+    assert pipeline.owned_span(0) == (0.0, 9.0)
+    assert pipeline.owned_span(1) == (9.0, 17.0)
+
+
+def test_overlap_must_be_shorter_than_chunk():
+    with pytest.raises(ValueError):
+        TranscriptionPipeline(audio_extractor=FakeAudio(0), chunk_seconds=5, overlap_seconds=5)
+
+
+@pytest.mark.parametrize("with_words", [True, False])
+def test_stitched_words_are_contiguous_and_unique(with_words):
+    pipeline = make_pipeline(FakeAudio(60), FakeSpeechService(with_words=with_words), chunk_seconds=10, overlap_seconds=2, concurrency=3)
+    segments = asyncio.run(pipeline.transcribe("match", 5.0, 55.0))
+    words = spoken(segments)
+    assert words == list(range(words[0], words[-1] + 1))
+    assert words[0] <= 5 and words[-1] >= 54
+    for segment in segments:
+        first = int(segment["text"].split()[0][1:])
+        assert abs(segment["start"] - (first + 0.1)) < 0.5
+
+
+def test_uploads_are_concurrent_but_capped():
+    speech = FakeSpeechService(latency=0.05)
+    pipeline = make_pipeline(FakeAudio(90), speech, chunk_seconds=10, overlap_seconds=2, concurrency=3)
+    asyncio.run(pipeline.transcribe("match", 0.0, 90.0))
+    assert speech.requests == len(pipeline.chunk_indexes(0.0, 90.0))
+    assert 1 < speech.max_active <= 3
+
+
+def test_cached_chunks_are_reused():
+    speech = FakeSpeechService()
+    pipeline = make_pipeline(FakeAudio(60), speech, chunk_seconds=10, overlap_seconds=2)
+    asyncio.run(pipeline.transcribe("match", 0.0, 60.0))
+    before = speech.requests
+    words = spoken(asyncio.run(pipeline.transcribe("match", 20.0, 40.0)))
+    assert speech.requests == before
+    assert words[0] <= 20 and words[-1] >= 39
+
+
+def test_failed_upload_is_not_cached():
+    speech = FakeSpeechService(fail_requests={2})
+    pipeline = make_pipeline(FakeAudio(30), speech, chunk_seconds=10, overlap_seconds=2, concurrency=1)
+    asyncio.run(pipeline.transcribe("match", 0.0, 30.0))
+    assert pipeline.failures == 1
+    assert ("match", "en-US", 1) not in pipeline.cache
+    before = speech.requests
+    words = spoken(asyncio.run(pipeline.transcribe("match", 8.0, 18.0)))
+    assert speech.requests == before + 1
+    assert words[0] <= 8 and words[-1] >= 17
+
+
+def test_truncated_stream_leaves_missing_chunks_uncached():
+    audio = FakeAudio(60, truncate_at=21.0)
+    speech = FakeSpeechService()
+    pipeline = make_pipeline(audio, speech, chunk_seconds=10, overlap_seconds=2)
+    words = spoken(asyncio.run(pipeline.transcribe("match", 0.0, 40.0)))
+    assert words[-1] < 21
+    cached = {index for _, _, index in pipeline.cache}
+    assert cached == {0, 1}
+    audio.truncate_at = None
+    words = spoken(asyncio.run(pipeline.transcribe("match", 0.0, 40.0)))
+    assert words == list(range(words[0], words[-1] + 1))
+    assert words[-1] >= 39
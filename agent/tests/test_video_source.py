@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from services.video_source import LocalVideoLibrary
+
+
+def test_library_listing_hides_filesystem_paths(tmp_path):
+    cv2 = pytest.importorskip("cv2")
+    (tmp_path / "2024").mkdir()
+    path = tmp_path / "2024" / "final.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 24))
+    for _ in range(25):
+        writer.write(np.zeros((24, 32, 3), dtype=np.uint8))
+    writer.release()
+
+    videos = LocalVideoLibrary([str(tmp_path)]).list_videos()
+    assert videos == [{"videoId": "local:2024/final.avi", "name": "final.avi", "duration": 2.5}]
+    assert str(tmp_path) not in repr(videos)
@@ -0,0 +1,50 @@
+import asyncio
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from services.circuit_breaker import CircuitBreaker
+from services.deadline import Deadline
+from services.youtube_extractor import YouTubeFrameExtractor
+
+
+def test_deadline_timeout_releases_the_half_open_probe():
+    extractor = YouTubeFrameExtractor()
+    extractor.breaker = CircuitBreaker("test_frames", failure_threshold=1, recovery_timeout=0.05)
+    extractor.breaker.record_failure()
+    time.sleep(0.06)
+
+    async def slow_extract(video_url_or_id, timestamp, tolerance=0.0):
+        await asyncio.sleep(1.0)
+        return "frame", timestamp
+
+    extractor._extract_frame_scheduled = slow_extract
+    frame, _ = asyncio.run(extractor.extract_frame_at("slow", 5.0, deadline=Deadline(0.3)))
+    assert frame is None
+    assert extractor.breaker.state == CircuitBreaker.HALF_OPEN
+    assert extractor.breaker.total_failures == 1
+    assert extractor.breaker.allow_request()
+
+
+@pytest.fixture
+def long_gop_video(tmp_path):
+    if not shutil.which("ffmpeg"):
+        pytest.skip("ffmpeg not installed")
+    path = tmp_path / "gop.mp4"
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", "testsrc=size=160x120:rate=25",
+         "-t", "30", "-g", "100", "-c:v", "mpeg4", str(path)],
+        check=True
+    )
+    return str(path)
+
+
+@pytest.mark.parametrize("timestamp", [8.3, 10.5, 29.5])
+def test_fast_seek_decodes_forward_into_the_tolerance_window(long_gop_video, timestamp):
+    pytest.importorskip("cv2")
+    frame, actual = YouTubeFrameExtractor()._read_keyframe_sync(long_gop_video, timestamp, tolerance=1.0)
+    assert frame is not None
+    assert timestamp - 1.0 <= actual <= timestamp
+